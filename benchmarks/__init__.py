@@ -0,0 +1,7 @@
+"""Benchmarks of the kytos command line.
+
+Run them with ``python setup.py bench`` or ``python -m benchmarks``. They use
+a local stand-in for the NApps Server and the Kytos API (see
+:mod:`benchmarks.server`) and synthetic NApps (see :mod:`benchmarks.napps`),
+so no network access is needed.
+"""
@@ -0,0 +1,131 @@
+"""Run the kytos benchmarks with "python -m benchmarks".
+
+Usage: benchmarks [options] [<benchmark>...]
+
+Options:
+  --napps=<n>        Installed, local and published NApps [default: 50]
+  --files=<n>        Extra modules in each NApp [default: 10]
+  --fanout=<n>       Dependencies of the remote NApp installed [default: 8]
+  --repeat=<n>       Timed runs of each benchmark [default: 5]
+  --save=<file>      Save the results as JSON.
+  --compare=<file>   Compare with results saved before.
+  --threshold=<pct>  Slowdown that fails the comparison [default: 50]
+  -h, --help         Show this screen.
+
+The fastest of the timed runs is compared, as it is the least affected by
+other processes. Differences under 2 ms are ignored, as they are mostly
+noise. Exit with status 1 if any benchmark is
+slower than the saved results by more than the threshold.
+"""
+import io
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from docopt import docopt
+
+from benchmarks.suite import BENCHMARKS, Environment
+
+#: Smallest difference (seconds) that can be a regression.
+NOISE_FLOOR = 0.002
+
+
+def measure(function, env, repeat):
+    """Time a benchmark.
+
+    Returns:
+        list: Duration of each timed run in seconds.
+
+    Raises:
+        ImportError: If an optional dependency of the benchmark is missing.
+
+    """
+    prepared = function(env)
+    reset, run = prepared if isinstance(prepared, tuple) else (None, prepared)
+    times = []
+    for _ in range(repeat + 1):  # The first run is a warm-up
+        if reset:
+            reset()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times[1:]
+
+
+def compare(results, baseline, threshold):
+    """Print the results next to the baseline and return the regressions."""
+    regressions = []
+    row = '{:<24} {:>10} {:>10} {:>10} {:>8}'
+    print(row.format('Benchmark', 'Min ms', 'Median ms', 'Before ms',
+                     'Change'))
+    for name, result in results.items():
+        before = baseline.get(name, {}).get('min')
+        change = ''
+        if before:
+            ratio = result['min'] / before - 1
+            change = '{:+.1%}'.format(ratio)
+            if ratio * 100 > threshold and \
+                    result['min'] - before > NOISE_FLOOR:
+                regressions.append(name)
+                change += ' !'
+        print(row.format(name, '{:.1f}'.format(result['min'] * 1000),
+                         '{:.1f}'.format(result['median'] * 1000),
+                         '{:.1f}'.format(before * 1000) if before else '-',
+                         change))
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmarks and compare them with saved results."""
+    args = docopt(__doc__, argv=argv)
+    names = set(args['<benchmark>'])
+    unknown = names - {function.__name__ for function in BENCHMARKS}
+    if unknown:
+        sys.exit('Unknown benchmark(s): ' + ', '.join(sorted(unknown)))
+
+    logging.basicConfig(level=logging.WARNING)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='kytos-bench-') as root, \
+            Environment(root, int(args['--napps']), int(args['--files']),
+                        int(args['--fanout'])) as env:
+        for function in BENCHMARKS:
+            if names and function.__name__ not in names:
+                continue
+            try:
+                with redirect_stdout(io.StringIO()):
+                    times = measure(function, env, int(args['--repeat']))
+            except ImportError as exception:
+                print('{}: skipped ({}).'.format(function.__name__,
+                                                 exception))
+                continue
+            results[function.__name__] = {
+                'median': statistics.median(times), 'min': min(times),
+                'runs': len(times)}
+
+    baseline = {}
+    if args['--compare']:
+        with open(args['--compare']) as saved:
+            baseline = json.load(saved)['benchmarks']
+    regressions = compare(results, baseline, float(args['--threshold']))
+
+    if args['--save']:
+        with open(args['--save'], 'w') as saved:
+            json.dump({'python': platform.python_version(),
+                       'machine': platform.platform(),
+                       'options': {name.lstrip('-'): args[name] for name in
+                                   ('--napps', '--files', '--fanout')},
+                       'benchmarks': results}, saved, indent=2,
+                      sort_keys=True)
+    if regressions:
+        print('Slower than before by more than {}%: {}'.format(
+            args['--threshold'], ', '.join(regressions)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
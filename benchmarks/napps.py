@@ -0,0 +1,79 @@
+"""Synthetic NApps of configurable size."""
+import json
+from pathlib import Path
+
+MAIN_TEMPLATE = '''"""Main module of {user}/{name}."""
+from kytos.core import KytosNApp, rest
+
+from napps.{user}.{name} import settings
+
+
+class Main(KytosNApp):
+    """Synthetic NApp."""
+
+    def setup(self):
+        """Start the NApp."""
+
+    def execute(self):
+        """Run once."""
+
+    def shutdown(self):
+        """Stop the NApp."""
+{endpoints}
+'''
+
+ENDPOINT_TEMPLATE = '''
+    @rest('v1/resource_{index}/<item_id>', methods=['GET', 'POST'])
+    def resource_{index}(self, item_id):
+        """Handle resource {index}.
+
+        Return the state of an item.
+        """
+        return settings.VALUE, item_id
+'''
+
+
+def make_napp(root, user, name, version='1.0', dependencies=(), files=10,
+              file_size=4096, endpoints=5):
+    """Write a NApp into ``root/user/name`` and return its metadata.
+
+    Args:
+        root (pathlib.Path): Where the NApp folder is created.
+        user (str): NApp username.
+        name (str): NApp name.
+        version (str): NApp version.
+        dependencies (list): ``user/napp`` strings.
+        files (int): Number of extra modules.
+        file_size (int): Approximate size of each extra module, in bytes.
+        endpoints (int): Number of ``@rest`` endpoints in ``main.py``.
+
+    Returns:
+        dict: Content of the NApp kytos.json.
+
+    """
+    folder = Path(root) / user / name
+    (folder / 'lib').mkdir(parents=True, exist_ok=True)
+    metadata = {'username': user, 'name': name, 'version': version,
+                'description': 'Synthetic NApp {}/{}'.format(user, name),
+                'napp_dependencies': list(dependencies), 'license': 'MIT',
+                'tags': ['benchmark', name], 'url': ''}
+    (folder / 'kytos.json').write_text(json.dumps(metadata, indent=2))
+    (folder / '__init__.py').write_text('')
+    (folder / 'settings.py').write_text('VALUE = 42\n')
+    (folder / 'README.rst').write_text(metadata['description'] + '\n')
+    (folder / 'main.py').write_text(MAIN_TEMPLATE.format(
+        user=user, name=name, endpoints=''.join(
+            ENDPOINT_TEMPLATE.format(index=index)
+            for index in range(endpoints))))
+    (folder / 'lib' / '__init__.py').write_text('')
+    line = '# {}\n'.format('x' * 70)
+    for index in range(files):
+        (folder / 'lib' / 'module_{}.py'.format(index)).write_text(
+            line * max(1, file_size // len(line)))
+    return metadata
+
+
+def make_napps(root, user, count, **kwargs):
+    """Write ``count`` NApps named ``napp_<i>`` and return their metadata."""
+    return [make_napp(root, user, 'napp_{}'.format(index), **kwargs)
+            for index in range(count)]
@@ -0,0 +1,153 @@
+"""Local stand-in for the NApps Server and the Kytos API."""
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    """Serve the endpoints used by the kytos command line.
+
+    NApps Server::
+
+        GET /api/napps/                       catalog
+        GET /api/napps/<user>/<napp>/         NApp metadata
+        GET /repo/<user>/<napp>-<ver>.napp    package
+
+    Kytos::
+
+        GET /api/kytos/core/config/           NApps folders
+        GET /api/kytos/core/reload/<...>      reload NApps
+
+    Catalog and packages are sent with ETags and answer ``If-None-Match``,
+    like the real servers.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, enabled, installed):
+        """Listen on a free port of 127.0.0.1.
+
+        Args:
+            enabled (str): Enabled NApps folder reported by Kytos.
+            installed (str): Installed NApps folder reported by Kytos.
+
+        """
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.paths = {'napps': str(enabled), 'installed_napps': str(installed)}
+        self.napps = {}
+        self.packages = {}
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL, e.g. ``http://127.0.0.1:12345/``."""
+        return 'http://127.0.0.1:{}/'.format(self.server_port)
+
+    def add_napp(self, metadata, package):
+        """Publish a NApp.
+
+        Args:
+            metadata (dict): Content of its kytos.json.
+            package (bytes): Its .napp package, served as the latest version
+                and as ``metadata['version']``.
+
+        """
+        key = (metadata['username'], metadata['name'])
+        self.napps[key] = metadata
+        self.packages[key] = package
+
+    def start(self):
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Route requests to the data of the :class:`StandInServer`."""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately: without TCP_NODELAY, delayed
+    # ACKs would add ~40 ms to every keep-alive request
+    disable_nagle_algorithm = True
+
+    ROUTES = [
+        (re.compile(r'^/api/napps/$'), '_catalog'),
+        (re.compile(r'^/api/napps/([^/]+)/([^/]+)/$'), '_metadata'),
+        (re.compile(r'^/repo/([^/]+)/(.+)-([^-]+)\.napp$'), '_package'),
+        (re.compile(r'^/api/kytos/core/config/$'), '_config'),
+        (re.compile(r'^/api/kytos/core/reload/.+$'), '_reload'),
+    ]
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer a GET request."""
+        self.server.requests += 1
+        # Some requests have a body (e.g. "[]"), which must be consumed to
+        # keep the connection usable
+        self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        for pattern, method in self.ROUTES:
+            match = pattern.match(self.path)
+            if match:
+                getattr(self, method)(*match.groups())
+                return
+        self._send(404, b'')
+
+    def _catalog(self):
+        napps = [self.server.napps[key] for key in sorted(self.server.napps)]
+        self._send_json({'napps': napps})
+
+    def _metadata(self, user, napp):
+        metadata = self.server.napps.get((user, napp))
+        if metadata is None:
+            self._send(404, b'')
+        else:
+            self._send_json(metadata)
+
+    def _package(self, user, napp, version):
+        metadata = self.server.napps.get((user, napp))
+        if metadata is None or version not in ('latest', metadata['version']):
+            self._send(404, b'')
+        else:
+            self._send(200, self.server.packages[(user, napp)],
+                       'application/octet-stream')
+
+    def _config(self):
+        self._send_json(self.server.paths)
+
+    def _reload(self):
+        self._send_json({})
+
+    def _send_json(self, data):
+        self._send(200, json.dumps(data).encode('utf-8'), 'application/json')
+
+    def _send(self, status, body, content_type=None):
+        etag = '"{}"'.format(hashlib.sha256(body).hexdigest()[:16])
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if status in (200, 304):
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
@@ -0,0 +1,276 @@
+"""Benchmarks of the kytos command line and the modules behind it.
+
+Every benchmark is a function decorated with :func:`benchmark`. It receives
+the :class:`Environment`, prepares what it needs and returns the callable to
+be timed, or a ``(reset, run)`` tuple if the state must be restored before
+each timed run (e.g. uninstalling the NApps that ``run`` installs). Only
+``run`` is timed.
+"""
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.napps import make_napp, make_napps
+from benchmarks.server import StandInServer
+
+#: Root of the kytos-utils source tree.
+SOURCE_ROOT = Path(__file__).resolve().parent.parent
+
+BENCHMARKS = []
+
+
+def benchmark(function):
+    """Register a benchmark."""
+    BENCHMARKS.append(function)
+    return function
+
+
+class Environment:
+    """Folders, config and stand-in server shared by the benchmarks.
+
+    Layout of ``root``::
+
+        kytosrc        config file pointing to the stand-in server
+        installed/     installed NApps: "bench/napp_<i>"
+        enabled/       enabled NApps
+        src/           local NApps: "local/napp_<i>"
+        cache/         package cache, NApps catalog and OpenAPI cache
+
+    The stand-in server publishes the "bench" NApps and "remote/root", which
+    depends on ``fanout`` NApps "remote/dep_<i>".
+    """
+
+    def __init__(self, root, napps=50, files=10, fanout=8):
+        """Describe an environment to be created in ``root``.
+
+        Args:
+            root (str): Empty folder.
+            napps (int): Number of installed, local and published NApps.
+            files (int): Number of extra modules of each NApp.
+            fanout (int): Number of dependencies of "remote/root".
+
+        """
+        self.root = Path(root)
+        self.napps = napps
+        self.files = files
+        self.fanout = fanout
+        self.config_file = self.root / 'kytosrc'
+        self.installed = self.root / 'installed'
+        self.enabled = self.root / 'enabled'
+        self.src = self.root / 'src'
+        self.cache = self.root / 'cache'
+        self.server = None
+
+    def __enter__(self):
+        """Create the folders and config, and start the stand-in server."""
+        for folder in self.installed, self.enabled, self.src:
+            folder.mkdir(parents=True)
+        self.server = StandInServer(self.enabled, self.installed)
+        self.server.start()
+        self._write_config()
+
+        from kytos.utils.config import set_config_file
+        set_config_file(str(self.config_file))
+
+        make_napps(self.installed, 'bench', self.napps, files=self.files)
+        make_napps(self.src, 'local', self.napps, files=self.files)
+        (self.installed / 'bench' / '__init__.py').touch()
+        self._publish()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.stop()
+
+    @property
+    def env(self):
+        """Environment variables of ``kytos`` processes."""
+        env = dict(os.environ, HOME=str(self.root),
+                   KYTOS_AGENT_SOCKET=str(self.root / 'agent.sock'))
+        env['PYTHONPATH'] = os.pathsep.join(
+            filter(None, [str(SOURCE_ROOT), env.get('PYTHONPATH')]))
+        return env
+
+    def remove(self, user):
+        """Disable and uninstall all NApps of ``user``."""
+        from kytos.utils.napps import NAppsManager
+
+        mgr = NAppsManager()
+        napps = [napp for napp in mgr.get_installed() if napp[0] == user]
+        mgr.disable_napps(napps)
+        for napp in napps:
+            mgr.set_napp(*napp)
+            mgr.uninstall()
+
+    def _write_config(self):
+        url = self.server.url
+        self.config_file.write_text('\n'.join([
+            '[napps]',
+            'api = {}api/'.format(url),
+            'repo = {}repo'.format(url),
+            'cache_dir = {}'.format(self.cache / 'napps'),
+            'catalog_file = {}'.format(self.cache / 'catalog.json'),
+            '',
+            '[kytos]',
+            'api = {}'.format(url),
+            '',
+            '[http]',
+            'retries = 0',
+            '']))
+
+    def _publish(self):
+        """Build the packages published by the stand-in server."""
+        from kytos.utils.napps import NAppsManager
+
+        packages = self.root / 'packages'
+        published = [make_napp(packages, 'remote', 'dep_{}'.format(index),
+                               files=self.files)
+                     for index in range(self.fanout)]
+        published.append(make_napp(
+            packages, 'remote', 'root', files=self.files,
+            dependencies=['remote/{}'.format(meta['name'])
+                          for meta in published]))
+        for meta in published:
+            folder = packages / meta['username'] / meta['name']
+            with NAppsManager.build_napp_package(meta['name'],
+                                                 str(folder)) as package:
+                self.server.add_napp(meta, package.read())
+        for index in range(self.napps):
+            meta = make_napp(packages, 'bench', 'napp_{}'.format(index),
+                             files=0)
+            self.server.add_napp(meta, b'')
+
+
+def _kytos(*argv):
+    """Run a command as ``kytos <argv>`` in this process."""
+    from kytos.cli.commands.napps.parser import parse
+
+    try:
+        parse(list(argv))
+    except SystemExit as exception:
+        if exception.code:
+            raise RuntimeError('kytos {} exited with {}'.format(
+                ' '.join(argv), exception.code)) from exception
+
+
+@benchmark
+def cli_import(env):
+    """Import time of "kytos napps" in a new interpreter."""
+    cmd = [sys.executable, '-c', 'import kytos.cli.commands.napps.parser']
+    return lambda: subprocess.run(cmd, env=env.env, check=True)
+
+
+@benchmark
+def cli_napps_list(env):
+    """Run a whole "kytos napps list" process."""
+    cmd = [sys.executable, str(SOURCE_ROOT / 'bin' / 'kytos'), '-c',
+           str(env.config_file), 'napps', 'list']
+    return lambda: subprocess.run(cmd, env=env.env, check=True,
+                                  stdout=subprocess.DEVNULL)
+
+
+@benchmark
+def napps_list(_env):
+    """List the installed NApps, checking whether their folders changed."""
+    from kytos.utils.napps import NAppsManager
+
+    def reset():
+        for index in NAppsManager.shared_indexes():
+            index.refresh()
+
+    return reset, lambda: _kytos('napps', 'list')
+
+
+@benchmark
+def napps_search(_env):
+    """Search the (cached) NApps catalog."""
+    _kytos('napps', 'search', '--refresh', 'napp')
+    return lambda: _kytos('napps', 'search', 'napp_1')
+
+
+@benchmark
+def install_local(env):
+    """Install and enable all local NApps."""
+    napps = ['local/napp_{}'.format(index) for index in range(env.napps)]
+    cwd = os.getcwd()
+
+    def run():
+        os.chdir(str(env.src))
+        try:
+            _kytos('napps', 'install', *napps)
+        finally:
+            os.chdir(cwd)
+
+    return lambda: env.remove('local'), run
+
+
+@benchmark
+def install_remote(env):
+    """Download and install a NApp and its dependencies."""
+    from kytos.utils.napps import NAppsManager
+
+    def reset():
+        env.remove('remote')
+        NAppsManager().cache.prune(0)
+
+    return reset, lambda: _kytos('napps', 'install', 'remote/root')
+
+
+@benchmark
+def install_remote_cached(env):
+    """Install a NApp and its dependencies from revalidated packages."""
+    return (lambda: env.remove('remote'),
+            lambda: _kytos('napps', 'install', 'remote/root'))
+
+
+@benchmark
+def enable_all(_env):
+    """Enable all installed NApps."""
+    return (lambda: _kytos('napps', 'disable', 'all'),
+            lambda: _kytos('napps', 'enable', 'all'))
+
+
+@benchmark
+def disable_all(_env):
+    """Disable all enabled NApps."""
+    return (lambda: _kytos('napps', 'enable', 'all'),
+            lambda: _kytos('napps', 'disable', 'all'))
+
+
+@benchmark
+def reload_napps(env):
+    """Ask Kytos to reload each installed NApp."""
+    _kytos('napps', 'enable', 'all')
+    napps = ['bench/napp_{}'.format(index) for index in range(env.napps)]
+    return lambda: _kytos('napps', 'reload', *napps)
+
+
+@benchmark
+def build_napp_package(env):
+    """Build the package of a NApp."""
+    from kytos.utils.napps import NAppsManager
+
+    folder = str(env.src / 'local' / 'napp_0')
+
+    def run():
+        NAppsManager.build_napp_package('napp_0', folder).close()
+
+    return run
+
+
+@benchmark
+def openapi_render_template(env):
+    """Render openapi.yml of a NApp, parsing its modules."""
+    # Needs kytos.core (the controller)
+    from kytos.utils.openapi import OpenAPI
+    from kytos.utils.settings import SKEL_PATH
+
+    folder = env.src / 'local' / 'napp_0'
+    template = SKEL_PATH / 'napp-structure/username/napp'
+    cache = env.cache / 'openapi'
+
+    def reset():
+        shutil.rmtree(str(cache), ignore_errors=True)
+
+    return reset, lambda: OpenAPI(folder, template, cache).render_template()
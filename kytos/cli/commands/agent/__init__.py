@@ -0,0 +1 @@
+"""AGENT CLI Commands."""
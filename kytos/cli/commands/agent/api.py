@@ -0,0 +1,85 @@
+"""Translate cli commands to non-cli code."""
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from kytos.utils.agent import Agent, request
+from kytos.utils.config import get_config_file
+
+LOG = logging.getLogger(__name__)
+
+#: Seconds to wait for the agent to start or stop.
+WAIT_TIMEOUT = 10
+
+
+class AgentAPI:
+    """An API for the command-line interface."""
+
+    @classmethod
+    def start(cls, args):
+        """Start the agent in background or in this process."""
+        status = cls._status()
+        if status:
+            LOG.info('Kytos agent already running (pid %d).', status['pid'])
+            return
+        # Given with "kytos --config", which the agent doesn't parse
+        config_file = os.path.abspath(os.path.expanduser(get_config_file()))
+        if args['--foreground']:
+            try:
+                Agent(config_file=config_file).serve_forever()
+            except KeyboardInterrupt:
+                pass
+            return
+
+        log_file = os.path.expanduser('~/.kytos/agent.log')
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        with open(log_file, 'a') as log:
+            subprocess.Popen([sys.executable, '-m', 'kytos.utils.agent',
+                              '--config', config_file],
+                             stdin=subprocess.DEVNULL, stdout=log,
+                             stderr=log, cwd='/', start_new_session=True)
+        deadline = time.time() + WAIT_TIMEOUT
+        while time.time() < deadline:
+            status = cls._status()
+            if status:
+                LOG.info('Kytos agent started (pid %d).', status['pid'])
+                return
+            time.sleep(0.05)
+        LOG.error('Kytos agent did not start. See %s.', log_file)
+        sys.exit(1)
+
+    @classmethod
+    def stop(cls, args):  # pylint: disable=unused-argument
+        """Stop the agent."""
+        status = cls._status()
+        if not status:
+            LOG.info('Kytos agent is not running.')
+            return
+        request({'command': 'stop'})
+        deadline = time.time() + WAIT_TIMEOUT
+        while cls._status() and time.time() < deadline:
+            time.sleep(0.05)
+        LOG.info('Kytos agent stopped.')
+
+    @classmethod
+    def status(cls, args):  # pylint: disable=unused-argument
+        """Show whether the agent is running."""
+        status = cls._status()
+        if not status:
+            print('Kytos agent is not running.')
+            sys.exit(1)
+        uptime = int(time.time() - status['started'])
+        print('Kytos agent running (pid {}) on {}, up {} s, {} commands '
+              'served.'.format(status['pid'], status['socket'], uptime,
+                               status['requests']))
+
+    @staticmethod
+    def _status():
+        """Return the agent status or None if it is not running."""
+        try:
+            return request({'command': 'status'})
+        except OSError:
+            # Includes connections reset by an agent that is stopping
+            return None
@@ -0,0 +1,43 @@
+"""kytos - The kytos command line.
+
+You are at the "agent" command.
+
+Usage:
+       kytos agent start [--foreground]
+       kytos agent stop
+       kytos agent status
+       kytos agent -h | --help
+
+Options:
+
+  -h, --help      Show this screen.
+  --foreground    Run the agent in this process instead of in background.
+
+Common agent subcommands:
+
+  start         Start an agent that keeps kytos warm in memory and runs
+                "kytos napps" commands for the command line.
+  stop          Stop the agent.
+  status        Show whether the agent is running.
+
+"""
+from docopt import docopt
+
+from kytos.cli.commands.agent.api import AgentAPI
+from kytos.utils.exceptions import KytosException
+
+
+def parse(argv):
+    """Parse cli args."""
+    args = docopt(__doc__, argv=argv)
+    try:
+        call(argv[1], args)
+    except KytosException as exception:
+        print("Error parsing args: {}".format(exception))
+        exit()
+
+
+def call(subcommand, args):
+    """Call a subcommand passing the args."""
+    func = getattr(AgentAPI, subcommand)
+    func(args)
@@ -1,17 +1,41 @@
 """Translate cli commands to non-cli code."""
 import json
 import logging
-import os
-import re
-from urllib.error import HTTPError, URLError
-
-import requests
+import lzma
+import shutil
+import sys
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
 
 from kytos.utils.exceptions import KytosException
 from kytos.utils.napps import NAppsManager
+from kytos.utils.profiling import span
+from kytos.utils.resolver import DependencyResolver, installable
 
 LOG = logging.getLogger(__name__)
 
+#: Errors of a NApp installation that must not stop the other ones, e.g. a
+#: corrupted package or one whose files don't match its manifest.
+INSTALL_ERRORS = (tarfile.TarError, lzma.LZMAError, OSError, KytosException)
+
+
+def try_install(napp_id, function, *args):
+    """Call ``function(*args)`` and return whether it succeeded.
+
+    NApps Server errors and :data:`INSTALL_ERRORS` are logged instead of
+    raised, so that the other NApps are still installed.
+    """
+    import requests
+
+    try:
+        function(*args)
+        return True
+    except requests.exceptions.RequestException as exception:
+        LOG.error('    %s: NApps Server error: %s', napp_id, exception)
+    except INSTALL_ERRORS as exception:
+        LOG.error('    %s: %s', napp_id, exception)
+    return False
+
 
 class NAppsAPI:
     """An API for the command-line interface.
@@ -29,12 +53,19 @@ class NAppsAPI:
         if args['all']:
             napps = mgr.get_enabled()
         else:
-            napps = args['<napp>']
+            napps = [napp[:2] for napp in args['<napp>']]
 
+        enabled = set(mgr.get_enabled())
         for napp in napps:
-            mgr.set_napp(*napp)
-            LOG.info('NApp %s:', mgr.napp_id)
-            cls.disable_napp(mgr)
+            if napp not in enabled:
+                LOG.error("NApp %s/%s isn't enabled.", *napp)
+        try:
+            disabled = mgr.disable_napps(napps)
+        except PermissionError as exception:
+            LOG.error('  %s', exception)
+            return
+        for napp in disabled:
+            LOG.info('NApp %s/%s: Disabled.', *napp)
 
     @staticmethod
     def disable_napp(mgr):
@@ -56,7 +87,7 @@ class NAppsAPI:
         else:
             napps = args['<napp>']
 
-        cls.enable_napps(napps)
+        cls.enable_napps(napps, mgr)
 
     @classmethod
     def enable_napp(cls, mgr):
@@ -70,17 +101,26 @@ class NAppsAPI:
             LOG.error('  %s', exception)
 
     @classmethod
-    def enable_napps(cls, napps):
-        """Enable a list of NApps.
+    def enable_napps(cls, napps, mgr=None):
+        """Enable a list of NApps at once.
 
         Args:
             napps (list): List of NApps.
+            mgr (NAppsManager): Manager to use, if already created.
         """
-        mgr = NAppsManager()
+        mgr = mgr or NAppsManager()
+        napps = [napp[:2] for napp in napps]
+        enabled = set(mgr.get_enabled())
+        try:
+            mgr.enable_napps(napps)
+        except (FileNotFoundError, PermissionError) as exception:
+            LOG.error('  %s', exception)
+            return
         for napp in napps:
-            mgr.set_napp(*napp)
-            LOG.info('NApp %s:', mgr.napp_id)
-            cls.enable_napp(mgr)
+            if napp in enabled:
+                LOG.info('NApp %s/%s: Already enabled.', *napp)
+            else:
+                LOG.info('NApp %s/%s: Enabled.', *napp)
 
     @classmethod
     def create(cls, args):  # pylint: disable=unused-argument
@@ -121,87 +161,126 @@ class NAppsAPI:
     @classmethod
     def install(cls, args):
         """Install local or remote NApps."""
-        cls.install_napps(args['<napp>'])
+        cls.install_napps(args['<napp>'], offline=args['--offline'])
 
     @classmethod
-    def install_napps(cls, napps):
-        """Install local or remote NApps.
+    def install_napps(cls, napps, offline=False):
+        """Install local or remote NApps and their dependencies.
 
-        This method is recursive, it will install each napps and your
-        dependencies.
+        The whole dependency graph is resolved before installing anything.
+        Then, NApps that don't depend on each other are installed
+        concurrently, one level at a time, and enabled in dependency order.
+        NApps depending on one that could not be installed are skipped.
+
+        Args:
+            napps (list): (user, napp, version) tuples.
+            offline (bool): Install packages only from the local cache.
         """
         mgr = NAppsManager()
-        for napp in napps:
-            mgr.set_napp(*napp)
-            LOG.info('  NApp %s:', mgr.napp_id)
-
-            if not mgr.is_installed():
-                try:
-                    cls.install_napp(mgr)
-                    if not mgr.is_enabled():
-                        cls.enable_napp(mgr)
-                        napp_dependencies = mgr.dependencies()
-                        if napp_dependencies:
-                            LOG.info('Installing Dependencies:')
-                            cls.install_napps(napp_dependencies)
-                    else:
-                        LOG.warning('  Napp already enabled.')
-                except KytosException:
-                    continue
-            else:
-                LOG.warning('  Napp already enabled.')
+        mgr.offline = offline
+        installed = set(mgr.get_installed())
+        for user, name, _ in napps:
+            if (user, name) in installed:
+                LOG.warning('  NApp %s/%s already installed.', user, name)
+
+        resolver = DependencyResolver(mgr.get_metadata, exclude=installed,
+                                      max_workers=mgr.workers)
+        try:
+            with span('resolve'):
+                levels = resolver.resolve(napps)
+        except KytosException as exception:
+            LOG.error('  %s', exception)
+            return
+
+        # Dependents of NApps not found or not installed are skipped
+        failed = set(resolver.missing)
+        with ThreadPoolExecutor(max_workers=mgr.workers) as pool:
+            for level in levels:
+                level = installable(level, resolver.graph, failed)
+                managers = [mgr.for_napp(*napp) for napp in level]
+                results = list(pool.map(cls._try_install_napp, managers))
+                failed.update(napp[:2] for napp, success in
+                              zip(level, results) if not success)
+                cls.enable_napps([napp for napp, success in
+                                  zip(level, results) if success], mgr)
+
+    @classmethod
+    def _try_install_napp(cls, mgr):
+        """Install a NApp and return whether it succeeded."""
+        try:
+            with span('install', napp=mgr.napp_id):
+                cls.install_napp(mgr)
+            return True
+        except KytosException:
+            return False
 
     @classmethod
     def install_napp(cls, mgr):
         """Install a NApp.
 
         Raises:
-            KytosException: If a NApp hasn't been found.
+            KytosException: If a NApp hasn't been found or its package is
+                invalid.
 
         """
+        import requests
+
         try:
-            LOG.info('    Searching local NApp...')
+            LOG.info('    %s: Searching local NApp...', mgr.napp_id)
             mgr.install_local()
-            LOG.info('    Found and installed.')
+            LOG.info('    %s: Found and installed.', mgr.napp_id)
+            return
         except FileNotFoundError:
-            LOG.info('    Not found. Downloading from NApps Server...')
-            try:
-                mgr.install_remote()
-                LOG.info('    Downloaded and installed.')
-                return
-            except HTTPError as exception:
-                if exception.code == 404:
-                    LOG.error('    NApp not found.')
-                else:
-                    LOG.error('    NApps Server error: %s', exception)
-            except URLError as exception:
-                LOG.error('    NApps Server error: %s', str(exception.reason))
-            raise KytosException("NApp not found.")
+            LOG.info('    %s: Not found. Downloading from NApps Server...',
+                     mgr.napp_id)
+        except OSError as exception:
+            LOG.error('    %s: %s', mgr.napp_id, exception)
+            raise KytosException('Could not install {}.'.format(
+                mgr.napp_id)) from exception
+
+        try:
+            mgr.install_remote()
+            LOG.info('    %s: Downloaded and installed.', mgr.napp_id)
+            return
+        except requests.HTTPError as exception:
+            if exception.response.status_code == 404:
+                LOG.error('    %s: NApp not found.', mgr.napp_id)
+            else:
+                LOG.error('    %s: NApps Server error: %s', mgr.napp_id,
+                          exception)
+        except requests.exceptions.RequestException as exception:
+            LOG.error('    %s: NApps Server error: %s', mgr.napp_id,
+                      exception)
+        except INSTALL_ERRORS as exception:
+            LOG.error('    %s: %s', mgr.napp_id, exception)
+        raise KytosException('Could not install {}.'.format(mgr.napp_id))
 
     @classmethod
     def search(cls, args):
         """Search for NApps in NApps server matching a pattern."""
-        safe_shell_pat = re.escape(args['<pattern>']).replace(r'\*', '.*')
-        pat_str = '.*{}.*'.format(safe_shell_pat)
-        pattern = re.compile(pat_str, re.IGNORECASE)
-        remote_json = NAppsManager.search(pattern)
-        remote = set()
+        mgr = NAppsManager()
+        remote_json = mgr.search(args['<pattern>'], refresh=args['--refresh'],
+                                 offline=args['--offline'])
+        remote = []
         for napp in remote_json:
             # WARNING: This will be changed in future versions, when 'author'
             # will be removed.
             username = napp.get('username', napp.get('author'))
-            remote.add(((username, napp.get('name')), napp.get('description')))
+            remote.append(((username, napp.get('name')),
+                           napp.get('description') or ''))
 
-        cls._print_napps(remote)
+        cls._print_napps(remote, mgr, sort=False)
 
     @classmethod
-    def _print_napps(cls, napp_list):
+    def _print_napps(cls, napp_list, mgr=None, sort=True):
         """Format the NApp list to be printed."""
-        mgr = NAppsManager()
-        enabled = mgr.get_enabled()
-        installed = mgr.get_installed()
+        mgr = mgr or NAppsManager()
+        enabled = set(mgr.get_enabled())
+        installed = set(mgr.get_installed())
         napps = []
-        for napp, desc in sorted(napp_list):
+        if sort:
+            napp_list = sorted(napp_list)
+        for napp, desc in napp_list:
             status = 'i' if napp in installed else '-'
             status += 'e' if napp in enabled else '-'
             status = '[{}]'.format(status)
@@ -242,8 +321,8 @@ class NAppsAPI:
         stat_w = 6  # We already know the size of Status col
         name_w = max(len(n[1]) for n in napps)
         desc_w = max(len(n[2]) for n in napps)
-        term_w = os.popen('stty size', 'r').read().split()[1]
-        remaining = max(0, int(term_w) - stat_w - name_w - 6)
+        term_w = shutil.get_terminal_size().columns
+        remaining = max(0, term_w - stat_w - name_w - 6)
         desc_w = min(desc_w, remaining)
         widths = (stat_w, name_w, desc_w)
 
@@ -260,6 +339,8 @@ class NAppsAPI:
     @staticmethod
     def delete(args):
         """Delete NApps from server."""
+        import requests
+
         mgr = NAppsManager()
         for napp in args['<napp>']:
             mgr.set_napp(*napp)
@@ -282,19 +363,33 @@ class NAppsAPI:
 
     @classmethod
     def reload(cls, args):
-        """Reload NApps code."""
+        """Reload NApps code.
+
+        Exit with status 1 if any NApp could not be reloaded.
+        """
         LOG.info('Reloading NApps...')
         mgr = NAppsManager()
+        napps = None if args['all'] else args['<napp>']
+        cls.reload_napps(mgr, napps)
 
-        try:
-            if args['all']:
-                mgr.reload(None)
-            else:
-                napps = args['<napp>']
-                mgr.reload(napps)
+    @staticmethod
+    def reload_napps(mgr, napps):
+        """Reload NApps and log the results.
 
-            LOG.info('\tReloaded.')
-        except requests.HTTPError as exception:
-            if exception.response.status_code != 200:
-                msg = json.loads(exception.response.content)
-                LOG.error('\tServer error: %s - ', msg['error'])
+        Exit with status 1 if any NApp could not be reloaded.
+        """
+        report = mgr.reload(napps)
+
+        for result in report:
+            if result['ok']:
+                LOG.info('\t%s: Reloaded (%.3fs).', result['napp'],
+                         result['seconds'])
+            else:
+                LOG.error('\t%s: Failed (%s, %.3fs): %s', result['napp'],
+                          result['status'] or 'unreachable',
+                          result['seconds'], result['error'])
+
+        failed = [result for result in report if not result['ok']]
+        if failed:
+            LOG.error('%d of %d reload(s) failed.', len(failed), len(report))
+            sys.exit(1)
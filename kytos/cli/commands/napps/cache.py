@@ -0,0 +1,77 @@
+"""Translate the package cache commands to non-cli code."""
+import logging
+import sys
+import time
+
+from kytos.utils.exceptions import KytosException
+from kytos.utils.napps import NAppsManager
+
+LOG = logging.getLogger(__name__)
+
+
+class CacheAPI:
+    """Manage the package cache, mirrors and caching proxies."""
+
+    @classmethod
+    def cache(cls, args):
+        """List or prune the local cache of downloaded packages."""
+        cache = NAppsManager().cache
+        if args['prune']:
+            evicted = cache.prune(0 if args['--all'] else None)
+            LOG.info('Removed %d package(s) from the cache.', len(evicted))
+            return
+
+        entries = cache.entries()
+        if not entries:
+            print('No cached NApps found.')
+            return
+        name_w = max(len(key) for key, _ in entries)
+        row = '{:<%d} | {:>10} | {:<12} | {}' % name_w
+        print(row.format('NApp', 'Size', 'SHA-256', 'Last used'))
+        for key, entry in entries:
+            last_used = time.strftime('%Y-%m-%d %H:%M',
+                                      time.localtime(entry['last_access']))
+            print(row.format(key, entry['size'], entry['sha256'][:12],
+                             last_used))
+        total = sum({e['sha256']: e['size'] for _, e in entries}.values())
+        print('\nTotal: {} bytes in {}'.format(total, cache.path))
+
+    @classmethod
+    def mirror(cls, args):
+        """Copy the NApps catalog and packages into a local folder."""
+        import requests
+
+        try:
+            mirror, report = NAppsManager().mirror(args['<dir>'],
+                                                   args['<napp>'])
+        except (requests.exceptions.RequestException,
+                KytosException) as exception:
+            LOG.error('  %s', exception)
+            sys.exit(1)
+
+        counts = {'downloaded': 0, 'unchanged': 0}
+        for package, status in report:
+            if status in counts:
+                counts[status] += 1
+                log = LOG.info if status == 'downloaded' else LOG.debug
+                log('    %s: %s.', package, status.capitalize())
+            else:
+                LOG.error('    %s: %s', package, status)
+        failed = len(report) - sum(counts.values())
+        LOG.info('%d downloaded, %d unchanged, %d failed.',
+                 counts['downloaded'], counts['unchanged'], failed)
+        print('\nTo install from the mirror, set in ~/.kytosrc:\n\n'
+              '[napps]\napi = {}\nrepo = {}'.format(mirror.api_uri,
+                                                    mirror.repo_uri))
+        if failed:
+            sys.exit(1)
+
+    @classmethod
+    def serve_cache(cls, args):
+        """Serve a pull-through caching proxy of the NApps Server."""
+        try:
+            port = int(args['--port'])
+        except ValueError:
+            LOG.error('Invalid port: %s', args['--port'])
+            sys.exit(1)
+        NAppsManager().serve_cache(args['--host'], port)
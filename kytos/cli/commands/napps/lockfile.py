@@ -0,0 +1,89 @@
+"""Translate the lockfile commands to non-cli code."""
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from kytos.cli.commands.napps.api import try_install
+from kytos.cli.commands.napps.versions import VersionsAPI
+from kytos.utils.exceptions import KytosException
+from kytos.utils.napps import NAppsManager
+from kytos.utils.profiling import span
+
+LOG = logging.getLogger(__name__)
+
+
+class LockfileAPI:
+    """Pin NApps in a lockfile and install them from it."""
+
+    @classmethod
+    def lock(cls, args):
+        """Write a lockfile of NApps, their dependencies and hashes."""
+        import requests
+        from kytos.utils.lockfile import lock
+
+        mgr = NAppsManager()
+        napps = args['<napp>'] or None
+        try:
+            lockfile = lock(mgr, napps)
+            lockfile.save(args['--lockfile'])
+        except (requests.exceptions.RequestException, KytosException,
+                OSError) as exception:
+            LOG.error('  %s', exception)
+            sys.exit(1)
+        LOG.info('%d NApp(s) locked in %s.', len(lockfile.napps),
+                 args['--lockfile'])
+
+    @classmethod
+    def install_locked(cls, args):
+        """Install the NApps of ``--lockfile`` at their pinned versions.
+
+        No metadata is requested. All packages are fetched concurrently (or
+        taken from the local cache if their hash matches) and verified
+        before anything is installed. Then, NApps are installed from the
+        cache one level at a time and enabled, and the enabled NApps whose
+        version changed are reloaded. NApps already installed at the pinned
+        version are left untouched. With ``--offline``, only the local
+        package cache is used.
+
+        Exit with status 1 if a package can't be fetched or verified or a
+        NApp can't be installed.
+        """
+        from kytos.utils.lockfile import NAppsLockfile
+
+        path = args['--lockfile']
+        try:
+            lockfile = NAppsLockfile.load(path)
+        except (OSError, KytosException) as exception:
+            LOG.error('  %s', exception)
+            sys.exit(1)
+
+        mgr = NAppsManager()
+        mgr.offline = args['--offline']
+        levels = lockfile.install_order({napp: mgr.get_version(*napp)
+                                         for napp in mgr.get_installed()})
+        napps = [napp for level in levels for napp in level]
+        if not napps:
+            LOG.info('All NApps of %s are installed.', path)
+            return
+
+        with ThreadPoolExecutor(max_workers=mgr.workers) as pool, \
+                span('fetch'):
+            fetched = list(pool.map(
+                lambda napp: cls._try_fetch_package(
+                    mgr.for_napp(*napp[:3]), napp[3]), napps))
+        if not all(fetched):
+            LOG.error('Nothing was installed.')
+            sys.exit(1)
+        # Every package is now in the cache and verified
+        mgr.offline = True
+        failed = VersionsAPI.install_versions(mgr, levels, lockfile.graph())
+        if failed:
+            LOG.error('%d NApp(s) could not be installed.', failed)
+            sys.exit(1)
+
+    @staticmethod
+    def _try_fetch_package(mgr, sha256):
+        """Fetch and verify a package and return whether it succeeded."""
+        from kytos.utils.lockfile import fetch_package
+
+        return try_install(mgr.napp_id, fetch_package, mgr, sha256)
@@ -0,0 +1,85 @@
+"""Translate the commands about NApp modules to non-cli code."""
+import json
+import logging
+import sys
+
+from kytos.utils.napps import NAppsManager
+
+LOG = logging.getLogger(__name__)
+
+
+class ModulesAPI:
+    """Precompile the modules of NApps and profile their imports."""
+
+    @classmethod
+    def compile(cls, args):
+        """Precompile the modules of installed NApps.
+
+        Exit with status 1 if any module could not be compiled.
+        """
+        mgr = NAppsManager()
+        napps = None if args['all'] else [napp[:2] for napp in args['<napp>']]
+        try:
+            failed = mgr.compile(napps, args['--optimize'],
+                                 args['--invalidation'])
+        except (ValueError, FileNotFoundError) as exception:
+            LOG.error('  %s', exception)
+            sys.exit(1)
+        for path in failed:
+            LOG.error('  Could not compile %s.', path)
+        if failed:
+            LOG.error('%d module(s) could not be compiled.', len(failed))
+            sys.exit(1)
+        LOG.info('NApps compiled.')
+
+    @classmethod
+    def profile_load(cls, args):
+        """Measure import time and memory of enabled NApps, slowest first.
+
+        Exit with status 1 if any NApp could not be imported.
+        """
+        mgr = NAppsManager()
+        napps = [napp[:2] for napp in args['<napp>']] or None
+        try:
+            top = int(args['--top'])
+            results = mgr.profile_load(napps)
+        except (ValueError, FileNotFoundError) as exception:
+            LOG.error('  %s', exception)
+            sys.exit(1)
+        # Slowest first, then the NApps that failed
+        results.sort(key=lambda result: (result['error'] is None,
+                                         result['seconds'] or 0),
+                     reverse=True)
+        for result in results:
+            del result['imports'][top:]
+
+        if args['--json']:
+            print(json.dumps(results, indent=2))
+        else:
+            cls.print_load_profile(results)
+        if any(result['error'] for result in results):
+            sys.exit(1)
+
+    @staticmethod
+    def print_load_profile(results):
+        """Print import time, peak RSS and heaviest imports of each NApp."""
+        if not results:
+            print('No NApps found.')
+            return
+        name_w = max(len(result['napp']) for result in results)
+        row = '{:<%d} | {:>9} | {:>8} | {:>8} | {}' % name_w
+        print(row.format('NApp', 'Import ms', 'RSS MiB', '+RSS MiB',
+                         'Heaviest imports (self ms)'))
+        for result in results:
+            if result['error']:
+                print(row.format(result['napp'], '-', '-', '-',
+                                 'Error: ' + result['error']))
+                continue
+            imports = ', '.join('{} ({:.1f})'.format(
+                module['module'], module['self'] / 1000)
+                                for module in result['imports'])
+            print(row.format(result['napp'],
+                             '{:.1f}'.format(result['seconds'] * 1000),
+                             '{:.1f}'.format(result['rss'] / 1024),
+                             '{:.1f}'.format(result['rss_delta'] / 1024),
+                             imports))
@@ -8,17 +8,41 @@ Usage:
        kytos napps upload
        kytos napps delete    <napp>...
        kytos napps list
-       kytos napps install   <napp>...
+       kytos napps install   [--offline] <napp>...
+       kytos napps install   [--offline] --locked [--lockfile=<file>]
+       kytos napps lock      [--lockfile=<file>] [<napp>...]
        kytos napps uninstall <napp>...
        kytos napps enable    (all| <napp>...)
        kytos napps disable   (all| <napp>...)
        kytos napps reload    (all| <napp>...)
-       kytos napps search    <pattern>
+       kytos napps compile   [--optimize=<levels>] [--invalidation=<mode>]
+                             (all| <napp>...)
+       kytos napps outdated  [--offline]
+       kytos napps upgrade   [--offline] (all| <napp>...)
+       kytos napps versions  <napp>...
+       kytos napps switch    <napp>...
+       kytos napps rollback  <napp>...
+       kytos napps profile-load [--json] [--top=<n>] [<napp>...]
+       kytos napps search    [--refresh | --offline] <pattern>
+       kytos napps cache     (ls | prune [--all])
+       kytos napps mirror    <dir> [<napp>...]
+       kytos napps serve-cache [--host=<host>] [--port=<port>]
        kytos napps -h | --help
 
 Options:
 
-  -h, --help    Show this screen.
+  -h, --help             Show this screen.
+  --offline              Use only the local package cache or NApps catalog.
+  --refresh              Revalidate the cached NApps catalog with the server.
+  --all                  Remove all packages from the cache.
+  --host=<host>          Address of the caching proxy [default: 0.0.0.0].
+  --port=<port>          Port of the caching proxy [default: 8282].
+  --optimize=<levels>    Comma-separated optimization levels (0, 1, 2).
+  --invalidation=<mode>  timestamp, checked-hash or unchecked-hash.
+  --locked               Install the NApps pinned in the lockfile.
+  --lockfile=<file>      Lockfile of pinned NApps [default: napps.lock].
+  --json                 Print the results as JSON.
+  --top=<n>              Heaviest imports reported per NApp [default: 3].
 
 Common napps subcommands:
 
@@ -29,26 +53,49 @@ Common napps subcommands:
   list          List all NApps installed into your system.
   install       Install a local or remote NApp into a controller.
   uninstall     Remove a NApp from your controller.
+  lock          Pin NApps (the installed ones by default), their dependencies
+                and package hashes in a lockfile for "install --locked".
   enable        Enable a installed NApp.
   disable       Disable a NApp.
   reload        Reload NApps code.
+  compile       Precompile the modules of installed NApps.
+  outdated      List installed NApps with a newer version in NApps Server.
+  upgrade       Upgrade installed NApps to their latest versions.
+  versions      List the stored versions of installed NApps.
+  switch        Activate stored versions (<napp> is user/napp:version) and
+                reload the enabled NApps.
+  rollback      Activate the previously active versions and reload the
+                enabled NApps.
+  profile-load  Measure import time and memory of enabled NApps (all of
+                them by default), slowest first.
   search        Search for NApps in NApps Server.
+  cache         List or prune the local cache of downloaded NApps.
+  mirror        Copy the NApps catalog and packages (all of them, or the
+                given NApps and their dependencies) into a local folder.
+  serve-cache   Serve a caching proxy of the NApps Server for controllers
+                in the same network.
 
 """
 import re
-import sys
 
 from docopt import docopt
 
 from kytos.cli.commands.napps.api import NAppsAPI
+from kytos.cli.commands.napps.cache import CacheAPI
+from kytos.cli.commands.napps.lockfile import LockfileAPI
+from kytos.cli.commands.napps.modules import ModulesAPI
+from kytos.cli.commands.napps.versions import VersionsAPI
 from kytos.utils.exceptions import KytosException
 
+#: Classes whose methods implement the subcommands
+APIS = (NAppsAPI, CacheAPI, LockfileAPI, ModulesAPI, VersionsAPI)
+
 
 def parse(argv):
     """Parse cli args."""
     args = docopt(__doc__, argv=argv)
     try:
-        call(sys.argv[2], args)
+        call(argv[1], args)
     except KytosException as exception:
         print("Error parsing args: {}".format(exception))
         exit()
@@ -57,7 +104,10 @@ def parse(argv):
 def call(subcommand, args):
     """Call a subcommand passing the args."""
     args['<napp>'] = parse_napps(args['<napp>'])
-    func = getattr(NAppsAPI, subcommand)
+    if subcommand == 'install' and args['--locked']:
+        subcommand = 'install-locked'
+    name = subcommand.replace('-', '_')
+    func = next(getattr(api, name) for api in APIS if hasattr(api, name))
     func(args)
 
 
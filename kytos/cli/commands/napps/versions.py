@@ -0,0 +1,171 @@
+"""Translate the commands of NApp versions to non-cli code."""
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from kytos.cli.commands.napps.api import NAppsAPI, try_install
+from kytos.utils.exceptions import KytosException
+from kytos.utils.napps import NAppsManager
+from kytos.utils.profiling import span
+from kytos.utils.resolver import installable
+
+LOG = logging.getLogger(__name__)
+
+
+class VersionsAPI:
+    """Upgrade NApps and switch among their stored versions."""
+
+    @classmethod
+    def outdated(cls, args):
+        """List installed NApps with a newer version in the NApps Server."""
+        mgr = NAppsManager()
+        outdated = mgr.outdated(offline=args['--offline'])
+        if not outdated:
+            print('All NApps are up to date.')
+            return
+        name_w = max(len('{}/{}'.format(*napp[:2])) for napp in outdated)
+        row = '{:<%d} | {:<12} | {}' % max(name_w, len('NApp'))
+        print(row.format('NApp', 'Installed', 'Latest'))
+        for user, name, installed, latest in outdated:
+            print(row.format('{}/{}'.format(user, name), installed, latest))
+
+    @classmethod
+    def upgrade(cls, args):
+        """Upgrade installed NApps to their latest versions.
+
+        NApps that don't depend on each other are upgraded concurrently,
+        one level at a time, together with new dependencies, which are
+        enabled. The enabled NApps that were upgraded are then reloaded.
+        Exit with status 1 if any NApp could not be upgraded.
+        """
+        from kytos.utils.lockfile import upgrade_plan
+
+        mgr = NAppsManager()
+        mgr.offline = args['--offline']
+        napps = None if args['all'] else [napp[:2] for napp in args['<napp>']]
+        try:
+            with span('resolve'):
+                levels, graph = upgrade_plan(mgr, napps,
+                                             offline=mgr.offline)
+        except KytosException as exception:
+            LOG.error('  %s', exception)
+            sys.exit(1)
+        if not levels:
+            LOG.info('All NApps are up to date.')
+            return
+        failed = cls.install_versions(mgr, levels, graph)
+        if failed:
+            LOG.error('%d NApp(s) could not be upgraded.', failed)
+            sys.exit(1)
+
+    @classmethod
+    def install_versions(cls, mgr, levels, graph=None):
+        """Install NApp versions from the NApps Server or the cache.
+
+        NApps that don't depend on each other are installed concurrently,
+        one level at a time. NApps depending on one that could not be
+        installed are skipped. New NApps are enabled and the enabled NApps
+        whose version changed are reloaded.
+
+        Args:
+            mgr (NAppsManager): Manager of the controller.
+            levels (list): Levels of tuples starting with (user, napp,
+                version).
+            graph (dict): Dependencies of each (user, napp), used to skip
+                the dependents of failed NApps.
+
+        Returns:
+            int: Number of NApps that could not be installed or were
+                skipped.
+
+        """
+        installed = set(mgr.get_installed())
+        enabled = set(mgr.get_enabled())
+        changed, failed = [], set()
+        with ThreadPoolExecutor(max_workers=mgr.workers) as pool:
+            for level in levels:
+                level = installable(level, graph or {}, failed)
+                managers = [mgr.for_napp(*napp[:3]) for napp in level]
+                results = list(pool.map(cls._try_install_remote, managers))
+                failed.update(napp[:2] for napp, success in
+                              zip(level, results) if not success)
+                done = [napp[:2] for napp, success in zip(level, results)
+                        if success]
+                NAppsAPI.enable_napps([napp for napp in done
+                                       if napp not in installed], mgr)
+                changed.extend(napp for napp in done if napp in enabled)
+        if changed:
+            LOG.info('Reloading NApps...')
+            NAppsAPI.reload_napps(mgr, changed)
+        return len(failed)
+
+    @classmethod
+    def _try_install_remote(cls, mgr):
+        """Download and install a NApp version and return if it succeeded."""
+        return try_install(mgr.napp_id, cls._install_remote, mgr)
+
+    @staticmethod
+    def _install_remote(mgr):
+        """Download and install a NApp version."""
+        with span('upgrade', napp=mgr.napp_id):
+            LOG.info('    %s: Installing version %s...', mgr.napp_id,
+                     mgr.version)
+            mgr.install_remote()
+        LOG.info('    %s: Version %s installed.', mgr.napp_id, mgr.version)
+
+    @classmethod
+    def versions(cls, args):
+        """List the stored versions of installed NApps."""
+        mgr = NAppsManager()
+        for napp in args['<napp>']:
+            mgr.set_napp(*napp[:2])
+            versions, active = mgr.versions()
+            print('{}:'.format(mgr.napp_id))
+            if not versions:
+                print('  No stored versions.')
+            for version in versions:
+                print('  {} {}'.format('*' if version == active else ' ',
+                                       version))
+
+    @classmethod
+    def switch(cls, args):
+        """Activate stored versions of NApps and reload the enabled ones."""
+        for napp in args['<napp>']:
+            if napp[2] is None:
+                LOG.error('  Missing version of %s/%s, e.g. %s/%s:1.0.',
+                          *napp[:2], *napp[:2])
+                sys.exit(1)
+        cls.switch_versions(args['<napp>'])
+
+    @classmethod
+    def rollback(cls, args):
+        """Activate the previous versions of NApps and reload them."""
+        cls.switch_versions([napp[:2] + (None,) for napp in args['<napp>']])
+
+    @classmethod
+    def switch_versions(cls, napps):
+        """Activate versions of NApps and reload the enabled ones.
+
+        Args:
+            napps (list): (user, napp, version) tuples. If version is None,
+                the previously active version is activated.
+
+        Exit with status 1 if a version is not stored or a reload fails.
+        """
+        mgr = NAppsManager()
+        switched = []
+        for user, name, version in napps:
+            mgr.set_napp(user, name)
+            try:
+                version = mgr.switch_version(version)
+            except FileNotFoundError as exception:
+                LOG.error('  %s', exception)
+                sys.exit(1)
+            LOG.info('NApp %s: Version %s activated.', mgr.napp_id, version)
+            switched.append((user, name))
+
+        enabled = set(mgr.get_enabled())
+        to_reload = [napp for napp in switched if napp in enabled]
+        if to_reload:
+            LOG.info('Reloading NApps...')
+            NAppsAPI.reload_napps(mgr, to_reload)
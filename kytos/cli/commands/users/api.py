@@ -14,10 +14,8 @@ class UsersAPI:
     request.
     """
 
-    user_manager = UsersManager()
-
     @classmethod
     def register(cls, args):  # pylint: disable=unused-argument
         """Create a new user and register it on the Napps server."""
-        result = cls.user_manager.register()
+        result = UsersManager().register()
         print(result)
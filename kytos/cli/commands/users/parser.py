@@ -15,8 +15,6 @@ Common user subcommands:
   create        Register a new user to upload napps to Napps Server.
 
 """
-import sys
-
 from docopt import docopt
 
 from kytos.cli.commands.users.api import UsersAPI
@@ -27,7 +25,7 @@ def parse(argv):
     """Parse cli args."""
     args = docopt(__doc__, argv=argv)
     try:
-        call(sys.argv[2], args)
+        call(argv[1], args)
     except KytosException as exception:
         print("Error parsing args: {}".format(exception))
         exit()
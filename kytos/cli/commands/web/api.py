@@ -1,10 +1,10 @@
 """Translate cli commands to non-cli code."""
 import logging
-from urllib.error import HTTPError, URLError
 
 import requests
 
-from kytos.utils.config import KytosConfig
+from kytos.utils.config import get_config
+from kytos.utils.session import get_session
 
 LOG = logging.getLogger(__name__)
 
@@ -15,15 +15,16 @@ class WebAPI:  # pylint: disable=too-few-public-methods
     @classmethod
     def update(cls, args):
         """Call the method to update the Web UI."""
-        kytos_api = KytosConfig().config.get('kytos', 'api')
+        config = get_config().config
+        kytos_api = config.get('kytos', 'api')
         url = f"{kytos_api}api/kytos/core/web/update"
         version = args["<version>"]
         if version:
             url += f"/{version}"
 
         try:
-            result = requests.post(url)
-        except(HTTPError, URLError, requests.exceptions.ConnectionError):
+            result = get_session(config).post(url)
+        except requests.exceptions.RequestException:
             LOG.error("Can't connect to server: %s", kytos_api)
             return
 
@@ -15,8 +15,6 @@ Common web subcommands:
   update        Update the web-ui with the latest version
 
 """
-import sys
-
 from docopt import docopt
 
 from kytos.cli.commands.web.api import WebAPI
@@ -27,7 +25,7 @@ def parse(argv):
     """Parse cli args."""
     args = docopt(__doc__, argv=argv)
     try:
-        call(sys.argv[2], args)
+        call(argv[1], args)
     except KytosException as exception:
         print("Error parsing args: {}".format(exception))
         exit()
@@ -0,0 +1,331 @@
+"""Optional agent that runs kytos commands in a warm, long-running process.
+
+``kytos agent start`` keeps a process with every module imported, the config
+parsed, a pooled HTTP session, the kytosd paths and the NApps index in memory.
+While it runs, ``kytos`` forwards the commands listed in :data:`FORWARDED`
+over a UNIX socket instead of running them itself, so they don't pay for
+interpreter warm-up. Without the agent, or if the client uses another config
+file or environment (see :func:`context`), commands run in-process as usual.
+
+This module is imported by every ``kytos`` call, so it only imports light
+standard library modules at the top.
+"""
+import importlib
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from contextlib import redirect_stderr, redirect_stdout
+
+LOG = logging.getLogger(__name__)
+
+#: UNIX socket of the agent, unless ``KYTOS_AGENT_SOCKET`` is set.
+DEFAULT_SOCKET = '~/.kytos/agent.sock'
+#: Commands run by the agent. Interactive ones (e.g. "napps create" or
+#: "users register") always run in the client process.
+FORWARDED = {'napps': {'list', 'enable', 'disable', 'install', 'uninstall',
+                       'reload', 'search', 'cache', 'compile',
+                       'profile-load', 'versions', 'switch', 'rollback',
+                       'outdated', 'upgrade', 'lock'}}
+#: Log format of the command line, also used for output sent by the agent.
+LOG_FORMAT = '%(levelname)-5s %(message)s'
+#: Environment variables that change what a command does. Commands are only
+#: forwarded if the client and the agent have the same values.
+ENVIRONMENT = ('HOME',)
+ENVIRONMENT_PREFIXES = ('NAPPS_', 'KYTOS_')
+#: Seconds a client has to send its message.
+CLIENT_TIMEOUT = 10
+
+
+def socket_path():
+    """Return the path of the agent socket.
+
+    An environment variable is used instead of the config file, so that the
+    client doesn't need to parse the config before forwarding a command.
+    """
+    return os.path.expanduser(os.environ.get('KYTOS_AGENT_SOCKET',
+                                             DEFAULT_SOCKET))
+
+
+def context(config_file=None):
+    """Return what a command depends on besides its arguments.
+
+    Args:
+        config_file (str): Config file. If None, use the one of this process
+            (see :func:`~kytos.utils.config.set_config_file`).
+
+    Returns:
+        dict: Absolute path of the config file (``config``) and the
+            variables of :data:`ENVIRONMENT` and :data:`ENVIRONMENT_PREFIXES`
+            (``env``).
+
+    """
+    from kytos.utils.config import get_config_file
+    config_file = os.path.abspath(os.path.expanduser(config_file or
+                                                     get_config_file()))
+    env = {name: value for name, value in os.environ.items()
+           if (name in ENVIRONMENT or name.startswith(ENVIRONMENT_PREFIXES))
+           and name != 'KYTOS_AGENT_SOCKET'}
+    return {'config': config_file, 'env': env}
+
+
+class AgentConnectionError(OSError):
+    """The agent could not be reached."""
+
+
+def request(message, path=None):
+    """Send a message to the agent and return its answer.
+
+    Args:
+        message (dict): JSON-serializable message.
+        path (str): Agent socket. If None, use :func:`socket_path`.
+
+    Returns:
+        dict: The answer of the agent.
+
+    Raises:
+        AgentConnectionError: If the agent is not running.
+        OSError: If the connection is lost after the message is sent.
+
+    """
+    path = path or socket_path()
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            client.connect(path)
+        except OSError as exception:
+            raise AgentConnectionError(exception) from exception
+        client.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        chunks = []
+        for chunk in iter(lambda: client.recv(64 * 1024), b''):
+            chunks.append(chunk)
+    finally:
+        client.close()
+    try:
+        return json.loads(b''.join(chunks).decode('utf-8'))
+    except ValueError:
+        raise OSError('Invalid answer from the kytos agent.') from None
+
+
+def forward(argv, config_file=None):
+    """Run a command in the agent, if it is running and serves the command.
+
+    Args:
+        argv (list): Command and its arguments, e.g. ``['napps', 'list']``.
+        config_file (str): Config file informed with ``kytos --config``.
+
+    Returns:
+        int: Exit status of the command or None if it must run in-process,
+            e.g. because the agent uses another config file or environment.
+
+    """
+    command, args = argv[0], argv[1:]
+    subcommand = next((arg for arg in args if not arg.startswith('-')), None)
+    if subcommand not in FORWARDED.get(command, ()) or \
+            '-h' in args or '--help' in args:
+        return None
+    path = socket_path()
+    if not os.path.exists(path):
+        return None
+
+    message = dict(context(config_file), argv=argv, cwd=os.getcwd(),
+                   columns=_terminal_columns())
+    try:
+        answer = request(message, path)
+    except AgentConnectionError:
+        return None
+    except OSError as exception:
+        # The command may have run, so it is not run again in-process
+        print('ERROR Lost connection to the kytos agent: {}'.format(
+            exception), file=sys.stderr)
+        return 1
+    if answer.get('local'):
+        return None
+    sys.stdout.write(answer['stdout'])
+    sys.stderr.write(answer['stderr'])
+    return answer['exit']
+
+
+def _terminal_columns():
+    """Return the width of the client terminal or None."""
+    try:
+        return os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError):
+        return None
+
+
+class Agent:
+    """Serve commands on a UNIX socket, one at a time.
+
+    Commands run in this process, so they are serialized: they share the
+    current directory, the standard streams and the logging handlers.
+    """
+
+    def __init__(self, path=None, config_file=None):
+        """Create an agent.
+
+        Args:
+            path (str): Socket to listen on (see :func:`socket_path`).
+            config_file (str): Config file. Clients using another one run
+                their commands themselves.
+
+        """
+        self.path = path or socket_path()
+        self.context = context(config_file)
+        self.started = None
+        self.requests = 0
+        self._running = False
+
+    def serve_forever(self):
+        """Warm up and serve until stopped by a message or SIGTERM.
+
+        Raises:
+            OSError: If another agent is listening on the socket.
+
+        """
+        if os.path.exists(self.path):
+            try:
+                request({'command': 'status'}, self.path)
+                raise OSError('The kytos agent is already running.')
+            except AgentConnectionError:
+                os.remove(self.path)  # Left by an agent that was killed
+
+        from kytos.utils.config import set_config_file
+        set_config_file(self.context['config'])
+        self._warm_up()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)  # Only the owner can connect
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(umask)
+        server.listen(64)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+        self.started = time.time()
+        self._running = True
+        LOG.info('Kytos agent listening on %s (pid %d).', self.path,
+                 os.getpid())
+        try:
+            while self._running:
+                connection, _ = server.accept()
+                with connection:
+                    connection.settimeout(CLIENT_TIMEOUT)
+                    self._handle(connection)
+        finally:
+            server.close()
+            os.remove(self.path)
+
+    @staticmethod
+    def _warm_up():
+        """Import the commands and load what can be kept in memory."""
+        from kytos.utils.config import get_config
+        from kytos.utils.napps import NAppsManager
+        from kytos.utils.session import get_session
+
+        importlib.import_module('kytos.cli.commands.napps.parser')
+        get_session(get_config().config)
+        with redirect_stdout(io.StringIO()):
+            try:
+                # Asks kytosd for its paths and loads the NApps index
+                NAppsManager().get_installed()
+            except SystemExit:
+                LOG.warning('Kytos is not running. Its NApps folders will be '
+                            'read on the first command.')
+
+    def _handle(self, connection):
+        """Answer a single message."""
+        try:
+            message = json.loads(connection.makefile('rb').readline()
+                                 .decode('utf-8'))
+        except (OSError, ValueError) as exception:
+            LOG.warning('Invalid message from a client: %s', exception)
+            return
+        if not isinstance(message, dict):
+            LOG.warning('Invalid message from a client: %s', message)
+            return
+        if message.get('command') == 'status':
+            answer = {'pid': os.getpid(), 'started': self.started,
+                      'requests': self.requests, 'socket': self.path}
+        elif message.get('command') == 'stop':
+            self._running = False
+            answer = {'stopping': True}
+        elif {key: message.get(key) for key in ('config', 'env')} != \
+                self.context:
+            answer = {'local': True}
+        elif not isinstance(message.get('argv'), list) or \
+                not message['argv'] or 'cwd' not in message:
+            LOG.warning('Invalid message from a client: %s', message)
+            answer = {'exit': 1, 'stdout': '',
+                      'stderr': 'ERROR Invalid message to the kytos agent.\n'}
+        else:
+            answer = self._run(message)
+        try:
+            connection.sendall(json.dumps(answer).encode('utf-8'))
+        except OSError as exception:
+            LOG.warning('Could not answer a client: %s', exception)
+
+    def _run(self, message):
+        """Run a command as if it were run by the client."""
+        from kytos.utils.napps import NAppsManager
+
+        # NApps may have been changed by other processes meanwhile
+        for index in NAppsManager.shared_indexes():
+            index.refresh()
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        handler = logging.StreamHandler(stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root = logging.getLogger()
+        handlers, root.handlers = root.handlers, [handler]
+        stdin, sys.stdin = sys.stdin, io.StringIO()
+        cwd = os.getcwd()
+        columns = os.environ.pop('COLUMNS', None)
+        status = 0
+        try:
+            if message.get('columns'):
+                # Used by shutil.get_terminal_size()
+                os.environ['COLUMNS'] = str(message['columns'])
+            os.chdir(message['cwd'])
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                self._dispatch(message['argv'])
+        except SystemExit as exception:
+            if isinstance(exception.code, int) or exception.code is None:
+                status = exception.code or 0
+            else:
+                stderr.write('{}\n'.format(exception.code))
+                status = 1
+        except Exception:  # pylint: disable=broad-except
+            LOG.exception('Error running %s',
+                          ' '.join(map(str, message.get('argv', []))))
+            status = 1
+        finally:
+            os.chdir(cwd)
+            os.environ.pop('COLUMNS', None)
+            if columns is not None:
+                os.environ['COLUMNS'] = columns
+            sys.stdin = stdin
+            root.handlers = handlers
+            self.requests += 1
+        return {'exit': status, 'stdout': stdout.getvalue(),
+                'stderr': stderr.getvalue()}
+
+    @staticmethod
+    def _dispatch(argv):
+        if argv[0] == 'napps':
+            from kytos.cli.commands.napps.parser import parse
+            parse(argv)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    PARSER = argparse.ArgumentParser(description='Run the kytos agent.')
+    PARSER.add_argument('-c', '--config', help='Load config file.')
+    logging.basicConfig(format=LOG_FORMAT, level=logging.INFO)
+    Agent(config_file=PARSER.parse_args().config).serve_forever()
@@ -0,0 +1,222 @@
+"""Local cache of downloaded NApp packages."""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+from kytos.utils.lock import FileLock
+
+LOG = logging.getLogger(__name__)
+
+
+class PackageCache:
+    """Content-addressed, size-bounded cache of ``.napp`` packages.
+
+    Packages are stored once per content hash in ``blobs/<sha256>`` and an
+    ``index.json`` maps each ``user/napp:version`` to its blob, the ETag sent
+    by the server and the NApp metadata (kytos.json). When the cache grows
+    beyond ``max_size``, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, max_size):
+        """Create a cache.
+
+        Args:
+            path (str): Cache directory.
+            max_size (int): Maximum size of all packages, in bytes. Zero means
+                unlimited.
+
+        """
+        self.path = Path(path).expanduser()
+        self.max_size = max_size
+        self._blobs = self.path / 'blobs'
+        self._index_file = self.path / 'index.json'
+        # Serializes index updates among threads and processes
+        self._lock = FileLock(self.path / 'index.lock')
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a cache using the ``[napps]`` section of the config."""
+        path = config.get('napps', 'cache_dir',
+                          fallback='~/.kytos/cache/napps')
+        max_size = config.getint('napps', 'cache_size', fallback=512)
+        return cls(path, max_size * 1024 * 1024)
+
+    @staticmethod
+    def key(user, napp, version):
+        """Return the index key of a NApp version."""
+        return '{}/{}:{}'.format(user, napp, version)
+
+    def blob_path(self, sha256):
+        """Return the path of a package given its content hash."""
+        return self._blobs / sha256
+
+    def get(self, key):
+        """Return the index entry of ``key`` if its package is cached."""
+        entry = self._load().get(key)
+        if entry and self.blob_path(entry['sha256']).exists():
+            return entry
+        return None
+
+    def find(self, user, napp):
+        """Return the most recently used cached entry of any NApp version."""
+        prefix = '{}/{}:'.format(user, napp)
+        entries = [entry for key, entry in self._load().items()
+                   if key.startswith(prefix)]
+        if not entries:
+            return None
+        return max(entries, key=lambda entry: entry['last_access'])
+
+    def touch(self, key):
+        """Mark ``key`` as recently used and return its package path."""
+        with self._lock:
+            index = self._load()
+            entry = index[key]
+            entry['last_access'] = time.time()
+            self._save(index)
+        return self.blob_path(entry['sha256'])
+
+    def temp_file(self):
+        """Return a temporary file inside the cache directory.
+
+        Downloading into the cache directory makes :meth:`store` a rename
+        instead of a copy.
+        """
+        self._blobs.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=str(self.path), suffix='.part',
+                                           delete=False)
+
+    def store(self, key, filename, etag=None):
+        """Move a downloaded package into the cache.
+
+        Args:
+            key (str): Index key returned by :meth:`key`.
+            filename (str): Package file. It is moved, not copied.
+            etag (str): ETag sent by the server, used for revalidation.
+
+        Returns:
+            pathlib.Path: Path of the cached package.
+
+        """
+        sha256 = self.hash_file(filename)
+        blob = self.blob_path(sha256)
+        self._blobs.mkdir(parents=True, exist_ok=True)
+        # Under the lock, so that prune never sees it unreferenced
+        with self._lock:
+            if blob.exists():
+                os.remove(filename)
+            else:
+                shutil.move(filename, str(blob))
+            index = self._load()
+            index[key] = {'sha256': sha256, 'etag': etag,
+                          'size': blob.stat().st_size,
+                          'last_access': time.time(),
+                          'meta': self._read_metadata(blob)}
+            if self.max_size:
+                self._evict(index, self.max_size, keep=key)
+            self._save(index)
+        return blob
+
+    def entries(self):
+        """Return a sorted list of (key, entry) of cached packages."""
+        return sorted(self._load().items())
+
+    def prune(self, max_size=None):
+        """Evict least recently used packages until ``max_size`` bytes.
+
+        Args:
+            max_size (int): Target size. If None, use the configured maximum.
+                Zero removes everything.
+
+        Returns:
+            list: Evicted keys.
+
+        """
+        if max_size is None:
+            max_size = self.max_size or None
+        with self._lock:
+            index = self._load()
+            evicted = []
+            if max_size is not None:
+                evicted = self._evict(index, max_size)
+            self._save(index)
+            self._remove_orphans(index)
+        return evicted
+
+    def _evict(self, index, max_size, keep=None):
+        """Remove least recently used entries from ``index`` in place."""
+        evicted = []
+        by_age = sorted(index, key=lambda k: index[k]['last_access'])
+        while by_age and self._size(index) > max_size:
+            key = by_age.pop(0)
+            if key == keep:
+                continue
+            sha256 = index.pop(key)['sha256']
+            evicted.append(key)
+            if not any(e['sha256'] == sha256 for e in index.values()):
+                self._remove_blob(sha256)
+        return evicted
+
+    @staticmethod
+    def _size(index):
+        """Size of all distinct packages referenced by ``index``."""
+        return sum({e['sha256']: e['size'] for e in index.values()}.values())
+
+    def _remove_blob(self, sha256):
+        try:
+            self.blob_path(sha256).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _remove_orphans(self, index):
+        """Delete unreferenced blobs and stale partial downloads."""
+        referenced = {e['sha256'] for e in index.values()}
+        if self._blobs.exists():
+            for blob in self._blobs.iterdir():
+                if blob.name not in referenced:
+                    blob.unlink()
+        # Downloads may still be running in other processes
+        stale = time.time() - 3600
+        for part in self.path.glob('*.part'):
+            if part.stat().st_mtime < stale:
+                part.unlink()
+
+    @staticmethod
+    def hash_file(filename):
+        """Return the SHA-256 hex digest of a file."""
+        sha256 = hashlib.sha256()
+        with open(str(filename), 'rb') as package:
+            for chunk in iter(lambda: package.read(1024 * 1024), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    @staticmethod
+    def _read_metadata(filename):
+        """Return kytos.json content of a package or None."""
+        try:
+            with tarfile.open(str(filename), 'r:xz') as tar:
+                member = next(m for m in tar.getmembers()
+                              if m.name.lstrip('./') == 'kytos.json')
+                return json.load(tar.extractfile(member))
+        except (tarfile.TarError, StopIteration, ValueError):
+            return None
+
+    def _load(self):
+        try:
+            with self._index_file.open() as index_file:
+                return json.load(index_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, index):
+        """Write the index atomically."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=str(self.path),
+                                         delete=False) as tmp:
+            json.dump(index, tmp)
+        os.replace(tmp.name, str(self._index_file))
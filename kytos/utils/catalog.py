@@ -0,0 +1,220 @@
+"""Local copy of the NApps Server catalog and its search index."""
+import bisect
+import difflib
+import fnmatch
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+
+LOG = logging.getLogger(__name__)
+
+#: Weight of a match in each NApp field.
+FIELD_WEIGHTS = {'name': 4, 'username': 3, 'tags': 2, 'description': 1}
+#: Score multiplier for exact, prefix and fuzzy token matches.
+MATCH_WEIGHTS = {'exact': 3, 'prefix': 2, 'fuzzy': 1}
+
+
+def tokenize(text):
+    """Split a text into lowercase alphanumeric tokens."""
+    return re.findall(r'[a-z0-9]+', (text or '').lower())
+
+
+@contextmanager
+def server_errors(config):
+    """Exit with an error if the NApps Server catalog can't be fetched.
+
+    Only happens when there is no cached catalog to fall back to.
+    """
+    try:
+        yield
+    except requests.exceptions.HTTPError as exception:
+        LOG.error('Error getting NApps from server (%s) - %s',
+                  exception.response.status_code, exception.response.reason)
+        sys.exit(1)
+    except requests.exceptions.RequestException:
+        LOG.error("Couldn't connect to NApps server %s.",
+                  config.get('napps', 'api'))
+        sys.exit(1)
+
+
+class NAppsCatalog:
+    """NApps Server catalog cached on disk with an inverted token index.
+
+    The catalog is fetched again only when it is older than ``ttl`` seconds,
+    and even then the server is asked with the previous ETag so that an
+    unchanged catalog is not downloaded. The token index is saved together
+    with the catalog, so searching doesn't depend on the catalog size.
+    """
+
+    def __init__(self, client, path, ttl):
+        """Create a catalog.
+
+        Args:
+            client (NAppsClient): Client used to fetch the catalog.
+            path (str): File where the catalog is cached.
+            ttl (int): Seconds before revalidating the cached catalog.
+
+        """
+        self._client = client
+        self.path = Path(path).expanduser()
+        self.ttl = ttl
+        self._data = None
+
+    @classmethod
+    def from_config(cls, client, config):
+        """Create a catalog using the ``[napps]`` section of the config."""
+        path = config.get('napps', 'catalog_file',
+                          fallback='~/.kytos/cache/catalog.json')
+        ttl = config.getint('napps', 'catalog_ttl', fallback=3600)
+        return cls(client, path, ttl)
+
+    def napps(self, refresh=False, offline=False):
+        """Return the list of NApps metadata from the catalog.
+
+        Args:
+            refresh (bool): Revalidate the catalog even if it is not stale.
+            offline (bool): Never contact the server.
+
+        """
+        return list(self._load(refresh, offline)['napps'].values())
+
+    def search(self, query, refresh=False, offline=False):
+        """Return NApps matching ``query``, best matches first.
+
+        Every word in ``query`` must match a word of the NApp name, username,
+        tags or description, exactly, as a prefix or approximately. If
+        ``query`` has shell wildcards (``*``), it is matched against the
+        whole strings instead.
+        """
+        data = self._load(refresh, offline)
+        if '*' in query:
+            return self._match_wildcard(data['napps'], query)
+
+        scores = None
+        for token in tokenize(query):
+            token_scores = self._score_token(data, token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {napp_id: score + token_scores[napp_id]
+                          for napp_id, score in scores.items()
+                          if napp_id in token_scores}
+        if not scores:
+            return []
+        ranked = sorted(scores, key=lambda napp_id: (-scores[napp_id],
+                                                     napp_id))
+        return [data['napps'][napp_id] for napp_id in ranked]
+
+    @staticmethod
+    def _score_token(data, token):
+        """Return {napp_id: score} of NApps matching a single token."""
+        index, vocabulary = data['index'], data['vocabulary']
+        matches = [(token, 'exact')] if token in index else []
+
+        # Prefix matches are contiguous in the sorted vocabulary
+        start = bisect.bisect_left(vocabulary, token)
+        for word in vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            if word != token:
+                matches.append((word, 'prefix'))
+
+        if not matches:
+            for word in difflib.get_close_matches(token, vocabulary, n=5,
+                                                  cutoff=0.75):
+                matches.append((word, 'fuzzy'))
+
+        scores = defaultdict(int)
+        for word, kind in matches:
+            for napp_id, field in index[word]:
+                score = FIELD_WEIGHTS[field] * MATCH_WEIGHTS[kind]
+                scores[napp_id] = max(scores[napp_id], score)
+        return scores
+
+    @staticmethod
+    def _match_wildcard(napps, pattern):
+        """Linear match of a shell pattern, as ``search`` used to do."""
+        regex = re.compile(fnmatch.translate('*{}*'.format(pattern)),
+                           re.IGNORECASE)
+        result = []
+        for napp_id, napp in sorted(napps.items()):
+            strings = [napp_id, napp.get('description') or ''] + \
+                (napp.get('tags') or [])
+            if any(regex.match(string) for string in strings):
+                result.append(napp)
+        return result
+
+    def _load(self, refresh=False, offline=False):
+        """Return cached data, revalidating it with the server if needed."""
+        if self._data is None:
+            self._data = self._read()
+        data = self._data
+        stale = time.time() - data.get('fetched_at', 0) > self.ttl
+        if offline or not (refresh or stale):
+            return data
+
+        try:
+            napps, etag = self._client.get_napps_if_changed(data.get('etag'))
+        except requests.exceptions.RequestException as exception:
+            if not data['napps']:
+                raise
+            LOG.warning('Using cached NApps catalog: %s', exception)
+            return data
+
+        if napps is not None:
+            data = self._build(napps, etag)
+        data['fetched_at'] = time.time()
+        self._write(data)
+        self._data = data
+        return data
+
+    @staticmethod
+    def _build(napps, etag):
+        """Return catalog data with the inverted token index."""
+        by_id = {}
+        index = defaultdict(set)
+        for napp in napps:
+            # WARNING: This will change for future versions, when 'author'
+            # will be removed.
+            username = napp.get('username', napp.get('author'))
+            napp_id = '{}/{}'.format(username, napp.get('name'))
+            by_id[napp_id] = napp
+            fields = {'name': tokenize(napp.get('name')),
+                      'username': tokenize(username),
+                      'tags': tokenize(' '.join(napp.get('tags') or [])),
+                      'description': tokenize(napp.get('description'))}
+            for field, tokens in fields.items():
+                for token in tokens:
+                    index[token].add((napp_id, field))
+
+        return {'etag': etag, 'napps': by_id,
+                'index': {token: sorted(entries)
+                          for token, entries in index.items()},
+                'vocabulary': sorted(index)}
+
+    def _read(self):
+        try:
+            with self.path.open() as catalog_file:
+                return json.load(catalog_file)
+        except (OSError, ValueError):
+            return {'napps': {}, 'index': {}, 'vocabulary': []}
+
+    def _write(self, data):
+        """Save the catalog atomically."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=str(self.path.parent),
+                                             delete=False) as tmp:
+                json.dump(data, tmp)
+            os.replace(tmp.name, str(self.path))
+        except OSError as exception:
+            LOG.debug('Could not save NApps catalog: %s', exception)
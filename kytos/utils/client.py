@@ -10,10 +10,10 @@ import json
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
-
-from kytos.utils.config import KytosConfig
+from kytos.utils.config import get_config
 from kytos.utils.decorators import kytos_auth
 from kytos.utils.exceptions import KytosException
 
@@ -26,25 +26,34 @@ class CommonClient:
     def __init__(self, config=None):
         """Set Kytos config."""
         if config is None:
-            config = KytosConfig().config
+            config = get_config().config
         self._config = config
 
+    @property
+    def session(self):
+        """Shared pooled session used to talk to the servers."""
+        # requests is only imported by commands that use the network
+        from kytos.utils.session import get_session
+        return get_session(self._config)
+
     @staticmethod
     def make_request(endpoint, **kwargs):
         """Send a request to server."""
+        import requests
+        from kytos.utils.session import get_session
+
         data = kwargs.get('json', [])
         package = kwargs.get('package', None)
         method = kwargs.get('method', 'GET')
 
-        function = getattr(requests, method.lower())
-
         try:
             if package:
-                response = function(endpoint, data=data,
-                                    files={'file': package})
+                response = get_session().request(method, endpoint, data=data,
+                                                 files={'file': package})
             else:
-                response = function(endpoint, json=data)
-        except requests.exceptions.ConnectionError:
+                response = get_session().request(method, endpoint, json=data)
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout):
             LOG.error("Couldn't connect to NApps server %s.", endpoint)
             sys.exit(1)
 
@@ -66,6 +75,30 @@ class NAppsClient(CommonClient):
 
         return json.loads(res.content.decode('utf-8'))['napps']
 
+    def get_napps_if_changed(self, etag=None):
+        """Get all NApps from the server, unless they haven't changed.
+
+        Args:
+            etag (str): ETag of the catalog already known by the caller.
+
+        Returns:
+            tuple: (napps, etag), napps being None if the catalog still
+                matches ``etag``.
+
+        Raises:
+            requests.exceptions.RequestException: If the server can't be
+                reached or answers with an error.
+
+        """
+        endpoint = os.path.join(self._config.get('napps', 'api'), 'napps', '')
+        headers = {'If-None-Match': etag} if etag else {}
+        res = self.session.get(endpoint, headers=headers)
+        if res.status_code == 304:
+            return None, etag
+        res.raise_for_status()
+        napps = json.loads(res.content.decode('utf-8'))['napps']
+        return napps, res.headers.get('ETag')
+
     def get_napp(self, username, name):
         """Return napp metadata or None if not found."""
         endpoint = os.path.join(self._config.get('napps', 'api'), 'napps',
@@ -79,43 +112,102 @@ class NAppsClient(CommonClient):
                                         res.reason))
         return json.loads(res.content)
 
-    def reload_napps(self, napps=None):
+    def reload_napps(self, napps=None, max_workers=4):
         """Reload a specific NApp or all Napps.
 
+        The reload of each NApp is requested concurrently over the shared
+        session and every result is collected, so no failure is lost.
+
         Args:
-            napp (list): NApp list to be reload.
-        Raises:
-            requests.HTTPError: When there's a server error.
+            napps (list): NApp list to be reloaded. If None, all NApps are
+                reloaded with a single request.
+            max_workers (int): Maximum number of concurrent requests.
+
+        Returns:
+            list: One dict per request with ``napp`` ("all" or user/napp),
+                ``status`` (None if Kytos could not be reached), ``ok``,
+                ``seconds`` and ``error``.
 
         """
+        api = self._config.get('kytos', 'api')
+        base = os.path.join(api, 'api', 'kytos', 'core', 'reload')
         if napps is None:
-            napps = []
-            api = self._config.get('kytos', 'api')
-            endpoint = os.path.join(api, 'api', 'kytos', 'core', 'reload',
-                                    'all')
-            response = self.make_request(endpoint)
+            targets = [('all', os.path.join(base, 'all'))]
+        else:
+            targets = [('{}/{}'.format(*napp[:2]),
+                        os.path.join(base, napp[0], napp[1]))
+                       for napp in napps]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda target: self._reload(*target),
+                                 targets))
+
+    def _reload(self, napp_id, endpoint):
+        """Request the reload of a NApp and return its result."""
+        import requests
+
+        result = {'napp': napp_id, 'status': None, 'ok': False,
+                  'error': None}
+        start = time.monotonic()
+        try:
+            response = self.session.get(endpoint)
+            result['status'] = response.status_code
+            result['ok'] = response.status_code == 200
+            if not result['ok']:
+                result['error'] = self._response_error(response)
+        except requests.exceptions.RequestException as exception:
+            result['error'] = str(exception)
+        result['seconds'] = time.monotonic() - start
+        return result
 
-        for napp in napps:
-            api = self._config.get('kytos', 'api')
-            endpoint = os.path.join(api, 'api', 'kytos', 'core', 'reload',
-                                    napp[0], napp[1])
-            response = self.make_request(endpoint)
+    @staticmethod
+    def _response_error(response):
+        """Return the error message sent by Kytos or the HTTP reason."""
+        try:
+            return json.loads(response.content)['error']
+        except (ValueError, KeyError, TypeError):
+            return response.reason
 
-        if response.status_code != 200:
-            raise KytosException('Error reloading the napp: Module not founded'
-                                 ' or could not be imported')
+    @kytos_auth
+    def upload_napp(self, metadata, package, progress=None):
+        """Upload the napp from the current directory to the napps server.
 
-        return response.content
+        If the server supports it, the package is sent in chunks and an
+        interrupted upload is resumed from where it stopped. Otherwise, it is
+        streamed in a single multipart request. Either way, the package is
+        never fully loaded in memory.
+
+        Args:
+            metadata (dict): NApp metadata.
+            package (tuple): (filename, file) of the package.
+            progress (callable): Called as ``progress(sent, total)``.
+
+        """
+        import requests
+        from kytos.utils.upload import MultipartStream, ResumableUpload
 
-    @kytos_auth
-    def upload_napp(self, metadata, package):
-        """Upload the napp from the current directory to the napps server."""
         endpoint = os.path.join(self._config.get('napps', 'api'), 'napps', '')
         metadata['token'] = self._config.get('auth', 'token')
-        request = self.make_request(endpoint, json=metadata, package=package,
-                                    method="POST")
-        if request.status_code != 201:
-            KytosConfig().clear_token()
+        filename, fileobj = package
+        retries = self._config.getint('http', 'retries', fallback=3)
+        try:
+            uploader = ResumableUpload(self.session,
+                                       os.path.join(endpoint, 'uploads', ''),
+                                       retries=retries)
+            request = uploader.upload(metadata, fileobj, progress)
+            if request is None:
+                body = MultipartStream(metadata, filename, fileobj, progress)
+                request = self.session.post(
+                    endpoint, data=body,
+                    headers={'Content-Type': body.content_type})
+        except requests.exceptions.RequestException as exception:
+            LOG.error("Couldn't upload to NApps server %s: %s", endpoint,
+                      exception)
+            sys.exit(1)
+
+        if request.status_code not in (201, 204):
+            if request.status_code in (401, 403):
+                get_config().clear_token()
             LOG.error("%s: %s", request.status_code, request.reason)
             sys.exit(1)
 
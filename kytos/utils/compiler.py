@@ -0,0 +1,188 @@
+"""Bytecode precompilation of installed NApps."""
+import logging
+import os
+import threading
+from functools import partial
+
+from kytos.utils.profiling import span
+
+LOG = logging.getLogger(__name__)
+
+#: Values of ``[napps] compile_invalidation``, see :pep:`552`. The hash
+#: modes require Python 3.7.
+INVALIDATION_MODES = ('timestamp', 'checked-hash', 'unchecked-hash')
+#: Smaller batches are compiled in this process: starting workers would
+#: cost more than compiling them.
+MIN_PARALLEL_FILES = 16
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _pool(workers):
+    """Return a process pool shared by all compilations of this process.
+
+    Workers are not forked from this process, which may have other threads
+    (e.g. installing NApps concurrently) holding locks that a forked child
+    would keep.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _POOLS_LOCK:
+        if workers not in _POOLS:
+            method = 'forkserver' if 'forkserver' in \
+                multiprocessing.get_all_start_methods() else 'spawn'
+            _POOLS[workers] = ProcessPoolExecutor(
+                max_workers=workers or None,
+                mp_context=multiprocessing.get_context(method))
+        return _POOLS[workers]
+
+
+class NAppsCompiler:
+    """Compile the Python modules of NApps to ``__pycache__``.
+
+    Kytos would otherwise compile every module of every NApp when it first
+    imports them, i.e. on start-up and after each reload. Modules whose
+    bytecode is up to date are skipped, so compiling again after an upgrade
+    only compiles what changed (in ``timestamp`` mode).
+    """
+
+    def __init__(self, optimize=(0,), invalidation_mode='timestamp',
+                 workers=0):
+        """Create a compiler.
+
+        Args:
+            optimize (tuple): Optimization levels (0, 1 and/or 2) to compile
+                for, as in ``python -O``.
+            invalidation_mode (str): One of :data:`INVALIDATION_MODES`.
+            workers (int): Number of worker processes. Zero means one per
+                CPU and one means no worker process.
+
+        Raises:
+            ValueError: If an option is invalid.
+
+        """
+        if not optimize or not set(optimize) <= {0, 1, 2}:
+            raise ValueError('Invalid optimization levels: {}'.format(
+                optimize))
+        if invalidation_mode not in INVALIDATION_MODES:
+            raise ValueError('Invalid invalidation mode: {}'.format(
+                invalidation_mode))
+        if invalidation_mode != 'timestamp' and _pyc_modes() is None:
+            raise ValueError('Invalidation mode {} requires Python '
+                             '3.7.'.format(invalidation_mode))
+        self.optimize = tuple(sorted(set(optimize)))
+        self.invalidation_mode = invalidation_mode
+        self.workers = workers
+
+    @classmethod
+    def from_config(cls, config, optimize=None, invalidation_mode=None):
+        """Create a compiler using the ``[napps]`` section of the config.
+
+        Args:
+            config (ConfigParser): Kytos config.
+            optimize (str): Comma-separated levels overriding the config.
+            invalidation_mode (str): Mode overriding the config.
+
+        Raises:
+            ValueError: If an option is invalid.
+
+        """
+        optimize = optimize or config.get('napps', 'compile_optimize',
+                                          fallback='0')
+        try:
+            levels = [int(level) for level in optimize.split(',')]
+        except ValueError:
+            raise ValueError('Invalid optimization levels: {}'.format(
+                optimize)) from None
+        return cls(levels, invalidation_mode or
+                   config.get('napps', 'compile_invalidation',
+                              fallback='timestamp'),
+                   config.getint('napps', 'compile_workers', fallback=0))
+
+    def compile(self, folders):
+        """Compile all modules inside ``folders``.
+
+        Args:
+            folders (list): NApp folders (pathlib.Path or str).
+
+        Returns:
+            list: Modules that could not be compiled, e.g. due to syntax
+                errors, which are printed.
+
+        """
+        files = [path for folder in folders for path in self._modules(folder)]
+        modes = _pyc_modes()
+        if modes is None:
+            # Python 3.6 only writes timestamp-based .pyc files
+            compile_file = _compile_file
+        else:
+            compile_file = partial(_compile_file, invalidation_mode=modes[
+                self.invalidation_mode.upper().replace('-', '_')])
+        tasks = [(path, level) for path in files for level in self.optimize]
+        if self.workers == 1 or len(tasks) < MIN_PARALLEL_FILES:
+            results = map(compile_file, tasks)
+        else:
+            results = _pool(self.workers).map(compile_file, tasks,
+                                              chunksize=8)
+        return sorted({path for (path, _), success in zip(tasks, results)
+                       if not success})
+
+    @staticmethod
+    def _modules(folder):
+        """Yield the Python modules of a NApp folder."""
+        for root, dirs, files in os.walk(str(folder)):
+            dirs[:] = [name for name in dirs
+                       if name != '__pycache__' and not name.startswith('.')]
+            for name in files:
+                if name.endswith('.py'):
+                    yield os.path.join(root, name)
+
+
+def precompile(config, folder, napp_id):
+    """Precompile a NApp being installed, if enabled in the config.
+
+    Failures, including invalid options and errors of the worker processes,
+    are logged but never fail the installation: Kytos compiles the modules
+    itself when it loads the NApp.
+
+    Args:
+        config (ConfigParser): Kytos config, see
+            :meth:`NAppsCompiler.from_config` and ``[napps] compile``.
+        folder (pathlib.Path): NApp folder.
+        napp_id (str): NApp id (user/napp) shown in the log.
+
+    """
+    if not config.getboolean('napps', 'compile', fallback=True):
+        return
+    try:
+        compiler = NAppsCompiler.from_config(config)
+        with span('compile', napp=napp_id):
+            failed = compiler.compile([folder])
+    except Exception as exception:  # pylint: disable=broad-except
+        LOG.warning('    %s: Not compiled: %s', napp_id, exception)
+        return
+    for path in failed:
+        LOG.warning('    %s: Could not compile %s.', napp_id,
+                    os.path.relpath(path, str(folder)))
+
+
+def _pyc_modes():
+    """Return ``py_compile.PycInvalidationMode`` or None before Python 3.7."""
+    import py_compile
+
+    return getattr(py_compile, 'PycInvalidationMode', None)
+
+
+def _compile_file(task, **kwargs):
+    """Compile a (path, level) task, returning whether it succeeded.
+
+    Keyword arguments (``invalidation_mode``) are given to
+    ``compileall.compile_file``.
+    """
+    import compileall
+
+    path, level = task
+    return bool(compileall.compile_file(path, quiet=1, optimize=level,
+                                        **kwargs))
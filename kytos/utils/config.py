@@ -8,11 +8,57 @@
 
 import logging
 import os
+import tempfile
+import threading
 from collections import namedtuple
 from configparser import ConfigParser
+from urllib.request import pathname2url
 
 LOG = logging.getLogger(__name__)
 
+#: Config file used when none is informed (see ``set_config_file``).
+DEFAULT_CONFIG_FILE = '~/.kytosrc'
+
+_CONFIG = None
+_CONFIG_FILE = DEFAULT_CONFIG_FILE
+_CONFIG_LOCK = threading.Lock()
+
+
+def set_config_file(config_file):
+    """Use ``config_file`` as the config file of this process.
+
+    Called by ``kytos --config <file>`` before any command runs, and by the
+    agent before each command it runs.
+    """
+    global _CONFIG, _CONFIG_FILE  # pylint: disable=global-statement
+    config_file = config_file or DEFAULT_CONFIG_FILE
+    with _CONFIG_LOCK:
+        if config_file != _CONFIG_FILE:
+            _CONFIG_FILE = config_file
+            _CONFIG = None
+
+
+def get_config_file():
+    """Return the config file of this process (see ``set_config_file``)."""
+    return _CONFIG_FILE
+
+
+def get_config():
+    """Return the process-wide config, creating it on the first call.
+
+    The config file is parsed only once per process, unless it changes on
+    disk (e.g. when another ``kytos`` process saves a token).
+
+    Returns:
+        KytosConfig: The shared config.
+
+    """
+    global _CONFIG  # pylint: disable=global-statement
+    with _CONFIG_LOCK:
+        if _CONFIG is None or _CONFIG.changed():
+            _CONFIG = KytosConfig(_CONFIG_FILE)
+        return _CONFIG
+
 
 class KytosConfig():
     """Kytos Configs.
@@ -21,12 +67,14 @@ class KytosConfig():
     order to get the correct paths and links.
     """
 
-    def __init__(self, config_file='~/.kytosrc'):
+    def __init__(self, config_file=None):
         """Init method.
 
-        Receive the confi_file as argument.
+        Receive the config_file as argument. If None, use the file set by
+        ``set_config_file`` (``~/.kytosrc`` by default). Prefer
+        ``get_config`` to share a single parsed config in the process.
         """
-        self.config_file = os.path.expanduser(config_file)
+        self.config_file = os.path.expanduser(config_file or _CONFIG_FILE)
         self.debug = False
         if self.debug:
             LOG.setLevel(logging.DEBUG)
@@ -44,9 +92,19 @@ class KytosConfig():
         if not os.path.exists(self.config_file):
             LOG.warning("Config file %s not found.", self.config_file)
             LOG.warning("Creating a new empty config file.")
-            with open(self.config_file, 'w') as output_file:
-                os.chmod(self.config_file, 0o0600)
-                self.config.write(output_file)
+            self._write(self.config)
+        self._stamp = self._stat()
+
+    def changed(self):
+        """Whether the config file changed since it was read."""
+        return self._stat() != self._stamp
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
 
     def log_configs(self):
         """Log the read configs if debug is enabled."""
@@ -68,8 +126,32 @@ class KytosConfig():
                           'https://napps.kytos.io/api/'),
                    option('napps', 'repo', 'NAPPS_REPO_URI',
                           'https://napps.kytos.io/repo'),
+                   option('napps', 'workers', 'NAPPS_WORKERS', '4'),
+                   option('napps', 'cache_dir', 'NAPPS_CACHE_DIR',
+                          '~/.kytos/cache/napps'),
+                   option('napps', 'cache_size', 'NAPPS_CACHE_SIZE', '512'),
+                   option('napps', 'catalog_file', 'NAPPS_CATALOG_FILE',
+                          '~/.kytos/cache/catalog.json'),
+                   option('napps', 'catalog_ttl', 'NAPPS_CATALOG_TTL', '3600'),
+                   option('napps', 'build_preset', 'NAPPS_BUILD_PRESET', '6'),
+                   option('napps', 'proxy_dir', 'NAPPS_PROXY_DIR',
+                          '~/.kytos/cache/proxy'),
+                   option('napps', 'proxy_ttl', 'NAPPS_PROXY_TTL', '60'),
+                   option('napps', 'compile', 'NAPPS_COMPILE', 'yes'),
+                   option('napps', 'compile_optimize',
+                          'NAPPS_COMPILE_OPTIMIZE', '0'),
+                   option('napps', 'compile_invalidation',
+                          'NAPPS_COMPILE_INVALIDATION', 'timestamp'),
+                   option('napps', 'compile_workers',
+                          'NAPPS_COMPILE_WORKERS', '0'),
+                   option('napps', 'keep_versions', 'NAPPS_KEEP_VERSIONS',
+                          '3'),
                    option('kytos', 'api', 'KYTOS_API',
-                          'http://localhost:8181/')]
+                          'http://localhost:8181/'),
+                   option('http', 'pool_size', 'KYTOS_HTTP_POOL_SIZE', '10'),
+                   option('http', 'retries', 'KYTOS_HTTP_RETRIES', '3'),
+                   option('http', 'backoff', 'KYTOS_HTTP_BACKOFF', '0.3'),
+                   option('http', 'timeout', 'KYTOS_HTTP_TIMEOUT', '30')]
 
         for option in options:
             if not self.config.has_option(option.section, option.name):
@@ -78,12 +160,32 @@ class KytosConfig():
                 if env_value:
                     self.config.set(option.section, option.name, env_value)
 
+        for name in ('api', 'repo'):
+            uri = self.config.get('napps', name, fallback=None)
+            if uri:
+                self.config.set('napps', name, self.location_uri(uri))
+
         self.config.set('global', 'debug', str(self.debug))
 
+    @staticmethod
+    def location_uri(location):
+        """Return a URI for a NApps API or repository location.
+
+        Besides ``http(s)://`` and ``file://`` URIs, a local path (e.g. of a
+        mirror made by ``kytos napps mirror``) is accepted and converted to a
+        ``file://`` URI.
+        """
+        if '://' in location:
+            return location
+        path = os.path.abspath(os.path.expanduser(location))
+        if location.endswith('/'):
+            path = os.path.join(path, '')
+        return 'file://' + pathname2url(path)
+
     @staticmethod
     def check_sections(config):
         """Create a empty config file."""
-        default_sections = ['global', 'auth', 'napps', 'kytos']
+        default_sections = ['global', 'auth', 'napps', 'kytos', 'http']
         for section in default_sections:
             if not config.has_section(section):
                 config.add_section(section)
@@ -102,13 +204,12 @@ class KytosConfig():
 
         new_config.set('auth', 'user', user)
         new_config.set('auth', 'token', token)
-        filename = os.path.expanduser(self.config_file)
-        with open(filename, 'w') as out_file:
-            os.chmod(filename, 0o0600)
-            new_config.write(out_file)
+        self._write(new_config)
 
     def clear_token(self):
         """Clear Token information on config file."""
+        self.config.remove_option('auth', 'user')
+        self.config.remove_option('auth', 'token')
         # allow_no_value=True is used to keep the comments on the config file.
         new_config = ConfigParser(allow_no_value=True)
 
@@ -119,7 +220,25 @@ class KytosConfig():
 
         new_config.remove_option('auth', 'user')
         new_config.remove_option('auth', 'token')
-        filename = os.path.expanduser(self.config_file)
-        with open(filename, 'w') as out_file:
-            os.chmod(filename, 0o0600)
-            new_config.write(out_file)
+        self._write(new_config)
+
+    def _write(self, config):
+        """Replace the config file atomically.
+
+        The new content is written to a temporary file in the same folder,
+        created with mode 0600 before anything is written to it, and then
+        renamed over the config file. Concurrent readers see either the old
+        or the new file, never a partial one.
+        """
+        folder = os.path.dirname(self.config_file) or '.'
+        file_descriptor, tmp_name = tempfile.mkstemp(dir=folder,
+                                                     prefix='.kytosrc-')
+        try:
+            os.fchmod(file_descriptor, 0o600)
+            with os.fdopen(file_descriptor, 'w') as out_file:
+                config.write(out_file)
+            os.replace(tmp_name, self.config_file)
+        except BaseException:
+            os.remove(tmp_name)
+            raise
+        self._stamp = self._stat()
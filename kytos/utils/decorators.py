@@ -4,9 +4,7 @@ import os
 import sys
 from getpass import getpass
 
-import requests
-
-from kytos.utils.config import KytosConfig
+from kytos.utils.config import get_config
 
 LOG = logging.getLogger(__name__)
 
@@ -19,13 +17,21 @@ class kytos_auth:  # pylint: disable=invalid-name
     def __init__(self, func):
         """Init method.
 
-        Save the function on the func attribute and bootstrap a new config.
+        Save the function on the func attribute. The config is only read
+        when the function is called, not when the class is defined.
         """
         self.func = func
-        self.config = KytosConfig().config
+        self._config = None
         self.cls = None
         self.obj = None
 
+    @property
+    def config(self):
+        """Kytos config, read on first use."""
+        if self._config is None:
+            self._config = get_config().config
+        return self._config
+
     def __call__(self, *args, **kwargs):
         """Code run when func is called."""
         if not (self.config.has_option('napps', 'api') and
@@ -64,12 +70,14 @@ class kytos_auth:  # pylint: disable=invalid-name
         endpoint = os.path.join(self.config.get('napps', 'api'), 'auth', '')
         username = self.config.get('auth', 'user')
         password = getpass("Enter the password for {}: ".format(username))
-        response = requests.get(endpoint, auth=(username, password))
+        from kytos.utils.session import get_session
+        response = get_session(self.config).get(endpoint,
+                                                auth=(username, password))
         if response.status_code != 201:
             LOG.error(response.content)
             LOG.error('ERROR: %s: %s', response.status_code, response.reason)
             sys.exit(1)
         else:
             data = response.json()
-            KytosConfig().save_token(username, data.get('hash'))
+            get_config().save_token(username, data.get('hash'))
             return data.get('hash')
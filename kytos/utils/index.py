@@ -0,0 +1,188 @@
+"""Persistent index of installed and enabled NApps."""
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from kytos.utils.lock import FileLock
+from kytos.utils.profiling import span
+
+LOG = logging.getLogger(__name__)
+
+
+class NAppsIndex:
+    """Index of installed and enabled NApps with their kytos.json content.
+
+    The index is saved in ``<installed>/.index/napps.json`` together with the
+    entries (names and modification times) of the installed and enabled
+    folders and of their user folders. When one of those folders changes,
+    only the NApps of that user are scanned again, so listing NApps doesn't
+    need to glob and parse every ``kytos.json`` on each call.
+    """
+
+    def __init__(self, installed, enabled):
+        """Create an index.
+
+        Args:
+            installed (pathlib.Path): Folder of installed NApps.
+            enabled (pathlib.Path): Folder of enabled NApps.
+
+        """
+        self._roots = {'installed': Path(installed), 'enabled': Path(enabled)}
+        self._file = self._roots['installed'] / '.index' / 'napps.json'
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self._roots['installed'] / '.locks' /
+                                   'index.lock')
+        self._data = None
+        self._dirty = set()
+        self._stale = False
+
+    def installed(self):
+        """Set of (username, napp_name) of installed NApps."""
+        return self._napps('installed')
+
+    def enabled(self):
+        """Set of (username, napp_name) of enabled NApps."""
+        return self._napps('enabled')
+
+    def metadata(self, user, napp):
+        """Return the kytos.json content of an installed NApp or {}."""
+        data = self._load()
+        return data['installed'].get(user, {}).get(napp) or {}
+
+    def invalidate(self, user=None):
+        """Force a new scan of ``user`` folders, or of everything if None."""
+        with self._lock:
+            self._dirty.add(user)
+
+    def refresh(self):
+        """Check the folders again, even if the index is already loaded."""
+        with self._lock:
+            self._stale = True
+
+    def _napps(self, kind):
+        data = self._load()
+        return {(user, napp) for user, napps in data[kind].items()
+                for napp in napps}
+
+    def _load(self):
+        """Return the index data, scanning only what has changed."""
+        with self._lock:
+            if self._data is not None and not (self._dirty or self._stale):
+                return self._data
+            # Other processes may be updating the index file as well
+            with self._file_lock, span('index'):
+                data = self._data or self._read()
+                changed = False
+                for kind, root in self._roots.items():
+                    changed |= self._update(kind, root, data)
+                if changed:
+                    self._write(data)
+            self._data = data
+            self._dirty.clear()
+            self._stale = False
+            return data
+
+    def _update(self, kind, root, data):
+        """Scan again the user folders of ``root`` that have changed."""
+        stamps = data['stamps'].setdefault(kind, {})
+        napps = data[kind]
+        users = self._stamps(root)
+        changed = stamps.get('') != users.pop('', None)
+
+        for user in set(napps) - set(users):
+            del napps[user]
+            changed = True
+        for user, stamp in users.items():
+            if (stamps.get(user) != stamp or user not in napps or
+                    None in self._dirty or user in self._dirty):
+                napps[user] = self._scan(root / user, kind == 'installed',
+                                         napps.get(user, {}))
+                changed = True
+
+        users[''] = self._stat(root)
+        data['stamps'][kind] = users
+        return changed
+
+    @classmethod
+    def _stamps(cls, root):
+        """Return the stamps of ``root`` ('') and of its user folders."""
+        stamps = {'': cls._stat(root)}
+        for name, _ in stamps[''] or []:
+            path = os.path.join(str(root), name)
+            if os.path.isdir(path):
+                stamps[name] = cls._stat(path)
+        return stamps
+
+    @classmethod
+    def _stat(cls, path):
+        """Return the names and modification times of a folder's entries.
+
+        Modification times alone may not change when a folder is modified
+        twice within the filesystem timestamp granularity, so the names
+        are compared too. The entries' own times reveal NApps updated in
+        place. A NApp installed as a symlink to a working copy is not
+        touched when its kytos.json is edited, so that file's time is
+        added for symlinks.
+        """
+        try:
+            entries = list(os.scandir(str(path)))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return sorted(cls._stamp(entry) for entry in entries
+                      if not entry.name.startswith(('.', '_')))
+
+    @staticmethod
+    def _stamp(entry):
+        """Return the stamp of a folder entry."""
+        stamp = [entry.name, entry.stat(follow_symlinks=False).st_mtime_ns]
+        if entry.is_symlink():
+            try:
+                stamp.append(os.stat(os.path.join(entry.path, 'kytos.json'))
+                             .st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return stamp
+
+    @staticmethod
+    def _scan(user_dir, with_metadata, previous):
+        """Return {napp: metadata} of NApps in ``user_dir``."""
+        napps = {}
+        for entry in os.scandir(str(user_dir)):
+            if entry.name.startswith(('.', '_')):
+                continue
+            kytos_json = Path(entry.path) / 'kytos.json'
+            if not kytos_json.exists():
+                continue
+            if not with_metadata:
+                napps[entry.name] = None
+                continue
+            try:
+                with kytos_json.open() as file_descriptor:
+                    napps[entry.name] = json.load(file_descriptor)
+            except (OSError, ValueError):
+                napps[entry.name] = previous.get(entry.name) or {}
+        return napps
+
+    def _read(self):
+        try:
+            with self._file.open() as index_file:
+                data = json.load(index_file)
+            if {'stamps', 'installed', 'enabled'} <= set(data):
+                return data
+        except (OSError, ValueError):
+            pass
+        return {'stamps': {}, 'installed': {}, 'enabled': {}}
+
+    def _write(self, data):
+        """Save the index atomically, if the install folder is writable."""
+        try:
+            self._file.parent.mkdir(exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=str(self._file.parent),
+                                             delete=False) as tmp:
+                json.dump(data, tmp)
+            os.replace(tmp.name, str(self._file))
+        except OSError as exception:
+            LOG.debug('Could not save NApps index: %s', exception)
@@ -0,0 +1,152 @@
+"""Measure how long enabled NApps take to be imported by Kytos."""
+import json
+import subprocess
+import sys
+
+from kytos.utils.profiling import span
+from kytos.utils.resolver import dependency_order
+
+#: Written to stderr between the imports that are not measured and the ones
+#: that are, so that ``-X importtime`` lines can be told apart.
+MARK = '--- kytos napps profile-load ---'
+
+# Run in a new interpreter with "-X importtime". Kytos imports the NApps in
+# dependency order, so kytos.core and the dependencies of the NApp are
+# imported before measuring.
+SCRIPT = '''
+import importlib, json, resource, sys, time
+
+def peak_rss():
+    # ru_maxrss is kept across exec on Linux: it would be the parent's
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss // 1024 if sys.platform == 'darwin' else maxrss
+
+args = json.loads(sys.argv[1])
+sys.path.insert(0, args['path'])
+for module in args['preload']:
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        pass
+rss = peak_rss()
+sys.stderr.write(args['mark'] + '\\n')
+sys.stderr.flush()
+start = time.perf_counter()
+for module in args['modules']:
+    # Unlike importlib.import_module, logged by "-X importtime"
+    __import__(module)
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'rss_before': rss, 'rss': peak_rss()}))
+'''
+
+
+def profile_napp(enabled, napp, dependencies=(), timeout=60):
+    """Import a NApp in a new interpreter and measure it.
+
+    Args:
+        enabled (pathlib.Path): Enabled NApps folder, e.g.
+            ``/var/lib/kytos/napps``, whose parent is in Kytos' ``sys.path``.
+        napp (tuple): (user, napp) of the NApp.
+        dependencies (list): (user, napp) of the NApps Kytos loads before
+            it, in order.
+        timeout (int): Seconds to wait for the import.
+
+    Returns:
+        dict: ``napp`` (user/napp), ``seconds`` (import time), ``rss`` (peak
+            RSS in KiB), ``rss_delta`` (KiB added by the import), ``imports``
+            (list of ``{'module', 'self', 'cumulative'}`` in microseconds,
+            heaviest first) and ``error`` (None or why it failed).
+
+    """
+    def modules(user, name):
+        # Meta-package NApps, which only depend on others, have neither
+        folder = enabled / user / name
+        package = '.'.join((enabled.name, user, name))
+        return [package + '.' + module for module in ('settings', 'main')
+                if (folder / (module + '.py')).exists() or
+                (folder / module / '__init__.py').exists()]
+
+    args = {'path': str(enabled.parent), 'mark': MARK,
+            'preload': ['kytos.core'] + [module for dependency in dependencies
+                                         for module in modules(*dependency)],
+            'modules': modules(*napp)}
+    result = {'napp': '{}/{}'.format(*napp), 'seconds': None, 'rss': None,
+              'rss_delta': None, 'imports': [], 'error': None}
+    try:
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT,
+             json.dumps(args)], stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, universal_newlines=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        result['error'] = 'Timed out after {} s.'.format(timeout)
+        return result
+
+    _, _, stderr = process.stderr.partition(MARK + '\n')
+    if process.returncode:
+        errors = [line for line in stderr.splitlines()
+                  if not line.startswith('import time:')]
+        result['error'] = errors[-1] if errors else 'Exit status {}'.format(
+            process.returncode)
+        return result
+
+    measured = json.loads(process.stdout.splitlines()[-1])
+    result.update(seconds=measured['seconds'], rss=measured['rss'],
+                  rss_delta=measured['rss'] - measured['rss_before'],
+                  imports=_parse_importtime(stderr))
+    return result
+
+
+def _parse_importtime(stderr):
+    """Return the modules of ``-X importtime`` output, heaviest first."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, own, cumulative, name = (field.strip() for field in
+                                    line.replace(':', '|', 1).split('|'))
+        if own.isdigit():
+            imports.append({'module': name, 'self': int(own),
+                            'cumulative': int(cumulative)})
+    return sorted(imports, key=lambda module: module['self'], reverse=True)
+
+
+def profile_napps(enabled, napps, enabled_napps, dependencies, timeout=60):
+    """Profile NApps in dependency order, see :func:`profile_napp`.
+
+    Each NApp is imported after kytos.core and the enabled NApps it depends
+    on, directly or not, as Kytos would.
+
+    Args:
+        enabled (pathlib.Path): Enabled NApps folder.
+        napps (list): (user, napp) tuples to profile.
+        enabled_napps (set): (user, napp) tuples of all enabled NApps.
+        dependencies (callable): Called as ``dependencies(user, napp)``,
+            returns the (user, napp) tuples the NApp depends on.
+        timeout (int): Seconds to wait for the import of each NApp.
+
+    Returns:
+        list: Results of :func:`profile_napp`.
+
+    """
+    results = []
+    for napp in dependency_order(napps, dependencies):
+        loaded = []
+        pending = list(dependencies(*napp))
+        while pending:
+            dependency = pending.pop()
+            if dependency in enabled_napps and dependency not in loaded \
+                    and dependency != napp:
+                loaded.append(dependency)
+                pending.extend(dependencies(*dependency))
+        with span('profile_load', napp='{}/{}'.format(*napp)):
+            results.append(profile_napp(
+                enabled, napp, dependency_order(loaded, dependencies),
+                timeout))
+    return results
@@ -0,0 +1,97 @@
+"""Advisory file locks shared by concurrent kytos processes."""
+import fcntl
+import logging
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from kytos.utils.profiling import span
+
+LOG = logging.getLogger(__name__)
+
+
+class FileLock:
+    """Exclusive ``flock`` on a lock file.
+
+    The lock is released when the file is closed, so it never outlives the
+    process that holds it. Threads of the same process first take a lock
+    shared by all instances on the same path, so they exclude each other as
+    well and only waits for other processes are reported. If the lock file
+    can't be created (e.g. the folder is read-only for the user), locking is
+    skipped: such a user can't change the locked files anyway.
+    """
+
+    _thread_locks = {}
+    _thread_locks_lock = threading.Lock()
+
+    def __init__(self, path):
+        """Create a lock on ``path``, which is created if needed."""
+        self.path = Path(path)
+        self._local = threading.local()
+        with self._thread_locks_lock:
+            self._thread_lock = self._thread_locks.setdefault(
+                str(self.path.absolute()), threading.Lock())
+
+    def acquire(self):
+        """Block until the lock is held."""
+        if not self._thread_lock.acquire(blocking=False):
+            with span('lock_wait', lock=self.path.name):
+                self._thread_lock.acquire()
+        try:
+            self._local.file_descriptor = self._flock()
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def _flock(self):
+        """Lock the file and return its descriptor, or None if skipped."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            file_descriptor = os.open(str(self.path),
+                                      os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as exception:
+            LOG.debug('Not locking %s: %s', self.path, exception)
+            return None
+        try:
+            fcntl.flock(file_descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            LOG.info('Waiting for another kytos process (%s)...',
+                     self.path.name)
+            with span('lock_wait', lock=self.path.name):
+                fcntl.flock(file_descriptor, fcntl.LOCK_EX)
+        except BaseException:
+            os.close(file_descriptor)
+            raise
+        return file_descriptor
+
+    def release(self):
+        """Release the lock."""
+        file_descriptor = getattr(self._local, 'file_descriptor', None)
+        self._local.file_descriptor = None
+        if file_descriptor is not None:
+            os.close(file_descriptor)
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+@contextmanager
+def locked(*locks):
+    """Hold several locks, acquired in the order of their paths.
+
+    Always acquiring in the same order prevents deadlocks between processes
+    locking overlapping sets of NApps.
+    """
+    with ExitStack() as stack:
+        paths = set()
+        for lock in sorted(locks, key=lambda lock: str(lock.path)):
+            if lock.path not in paths:
+                paths.add(lock.path)
+                stack.enter_context(lock)
+        yield
@@ -0,0 +1,240 @@
+"""Lockfile of NApps pinned to versions and package hashes.
+
+Besides the lockfile itself, this module resolves what to pin
+(:func:`lock`) or to upgrade (:func:`upgrade_plan`) and fetches the pinned
+packages (:func:`fetch_package`) of a NAppsManager.
+"""
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from kytos.utils.exceptions import KytosException
+from kytos.utils.profiling import span
+from kytos.utils.resolver import DependencyResolver
+
+#: Lockfile format version.
+LOCKFILE_VERSION = 1
+
+
+class NAppsLockfile:
+    """Resolved NApps with their versions, package hashes and install order.
+
+    Saved as JSON::
+
+        {"version": 1,
+         "napps": {"<user>/<napp>": {"version": "1.0", "sha256": "...",
+                                     "size": 1234,
+                                     "dependencies": ["<user>/<napp>"]}},
+         "levels": [["<user>/<napp>", ...], ...]}
+
+    NApps in the same level don't depend on each other and every level only
+    depends on the previous ones, as returned by
+    :meth:`~kytos.utils.resolver.DependencyResolver.resolve`.
+    """
+
+    def __init__(self, napps, levels):
+        """Create a lockfile.
+
+        Args:
+            napps (dict): Entries by NApp id ("user/napp").
+            levels (list): Lists of NApp ids in install order.
+
+        """
+        self.napps = napps
+        self.levels = levels
+
+    @classmethod
+    def from_resolution(cls, levels, graph, entries):
+        """Create a lockfile from resolved NApps and their cached packages.
+
+        Args:
+            levels (list): Levels of (user, napp, version) tuples.
+            graph (dict): Dependencies of each (user, napp).
+            entries (dict): Package cache entry of each (user, napp).
+
+        """
+        napps = {}
+        for user, napp, version in (napp for level in levels
+                                    for napp in level):
+            entry = entries[(user, napp)]
+            napps['{}/{}'.format(user, napp)] = {
+                'version': version, 'sha256': entry['sha256'],
+                'size': entry['size'],
+                'dependencies': sorted('{}/{}'.format(*dependency) for
+                                       dependency in graph[(user, napp)])}
+        return cls(napps, [['{}/{}'.format(*napp[:2]) for napp in level]
+                           for level in levels])
+
+    @classmethod
+    def load(cls, path):
+        """Read a lockfile.
+
+        Raises:
+            OSError: If the file can't be read.
+            KytosException: If the file is not a valid lockfile.
+
+        """
+        with open(str(path)) as lockfile:
+            try:
+                data = json.load(lockfile)
+            except ValueError as exception:
+                raise KytosException('Invalid lockfile {}: {}'.format(
+                    path, exception)) from exception
+        if not isinstance(data, dict) or \
+                data.get('version') != LOCKFILE_VERSION:
+            raise KytosException('Unsupported lockfile {}.'.format(path))
+        lockfile = cls(data['napps'], data['levels'])
+        missing = {napp_id for level in lockfile.levels
+                   for napp_id in level} - set(lockfile.napps)
+        if missing:
+            raise KytosException('Lockfile {} has no entry for {}.'.format(
+                path, ', '.join(sorted(missing))))
+        return lockfile
+
+    def save(self, path):
+        """Write the lockfile atomically."""
+        path = Path(path)
+        with tempfile.NamedTemporaryFile('w', dir=str(path.parent.resolve()),
+                                         prefix='.', delete=False) as tmp:
+            json.dump({'version': LOCKFILE_VERSION, 'napps': self.napps,
+                       'levels': self.levels}, tmp, indent=2, sort_keys=True)
+            tmp.write('\n')
+        os.replace(tmp.name, str(path))
+
+    def graph(self):
+        """Return the dependencies of each (user, napp)."""
+        return {tuple(napp_id.split('/')):
+                {tuple(dependency.split('/'))
+                 for dependency in entry.get('dependencies', ())}
+                for napp_id, entry in self.napps.items()}
+
+    def install_order(self, installed=None):
+        """Return levels of (user, napp, version, sha256) tuples.
+
+        Args:
+            installed (dict): Installed version of each (user, napp). NApps
+                already installed at their pinned version are left out.
+
+        """
+        installed = installed or {}
+        levels = [[tuple(napp_id.split('/')) +
+                   (self.napps[napp_id]['version'],
+                    self.napps[napp_id]['sha256']) for napp_id in level]
+                  for level in self.levels]
+        return [[napp for napp in level if installed.get(napp[:2]) != napp[2]]
+                for level in levels]
+
+
+def fetch_package(mgr, sha256=None):
+    """Make sure the package of a NApp version is in the local cache.
+
+    Args:
+        mgr (NAppsManager): Manager set to the NApp version.
+        sha256 (str): Expected package hash. A cached package with this hash
+            is used without contacting the server. Otherwise, the package is
+            revalidated or downloaded as when installing.
+
+    Returns:
+        dict: Package cache entry, with ``sha256`` and ``size``.
+
+    Raises:
+        requests.HTTPError: If download is not successful.
+        FileNotFoundError: If offline and the package is not cached.
+        KytosException: If the package doesn't match ``sha256``.
+
+    """
+    key = mgr.cache.key(mgr.user, mgr.napp, mgr.version)
+    entry = mgr.cache.get(key)
+    if sha256 is None or entry is None or entry['sha256'] != sha256:
+        # Downloads are read to the end into the cache on exit
+        with mgr.open_package():
+            pass
+        entry = mgr.cache.get(key)
+    if sha256 is not None and entry['sha256'] != sha256:
+        raise KytosException('{} does not match the lockfile hash.'
+                             .format(key))
+    return entry
+
+
+def lock(mgr, napps=None):
+    """Resolve NApps and pin their versions and package hashes.
+
+    The packages are downloaded into the local cache concurrently to be
+    hashed, so installing from the lockfile needs no further request.
+
+    Args:
+        mgr (NAppsManager): Manager of the controller.
+        napps (list): (user, napp, version) tuples, version being None for
+            the latest. If None, the installed NApps at their installed
+            versions.
+
+    Returns:
+        NAppsLockfile: Resolved NApps and their dependencies.
+
+    Raises:
+        KytosException: If a NApp is not found or there is a dependency
+            cycle.
+        requests.exceptions.RequestException: If the NApps Server can't be
+            reached or a download fails.
+
+    """
+    if napps is None:
+        napps = [napp + (mgr.get_version(*napp),)
+                 for napp in mgr.get_installed()]
+    resolver = DependencyResolver(mgr.get_metadata, max_workers=mgr.workers)
+    with span('resolve'):
+        levels = resolver.resolve(napps)
+    if resolver.missing:
+        raise KytosException('NApp(s) not found: {}'.format(', '.join(
+            '{}/{}'.format(*napp) for napp in sorted(resolver.missing))))
+
+    levels = [[(user, napp, version or resolver.metadata[(user, napp)]
+                .get('version') or 'latest')
+               for user, napp, version in level] for level in levels]
+    napps = [napp for level in levels for napp in level]
+    with ThreadPoolExecutor(max_workers=mgr.workers) as pool:
+        entries = pool.map(lambda napp: fetch_package(mgr.for_napp(*napp)),
+                           napps)
+        entries = {napp[:2]: entry for napp, entry in zip(napps, entries)}
+    return NAppsLockfile.from_resolution(levels, resolver.graph, entries)
+
+
+def upgrade_plan(mgr, napps=None, offline=False):
+    """Return the NApps to download to upgrade installed NApps.
+
+    Dependencies added by the new versions that are not installed yet are
+    included. Everything is resolved from the catalog, without requesting
+    the metadata of each NApp.
+
+    Args:
+        mgr (NAppsManager): Manager of the controller.
+        napps (list): (user, napp) tuples to upgrade. If None, every outdated
+            NApp. NApps already up to date are left out.
+        offline (bool): Use only the cached catalog.
+
+    Returns:
+        tuple: Levels of (user, napp, version) tuples, as returned by
+            :meth:`~kytos.utils.resolver.DependencyResolver.resolve`, and the
+            dependencies of each (user, napp).
+
+    Raises:
+        KytosException: If there is a dependency cycle.
+
+    """
+    catalog = mgr.catalog(offline)
+    outdated = {(user, napp): latest for user, napp, _, latest in
+                mgr.outdated(catalog=catalog)}
+    if napps is not None:
+        selected = {tuple(napp) for napp in napps}
+        outdated = {napp: latest for napp, latest in outdated.items()
+                    if napp in selected}
+    resolver = DependencyResolver(
+        lambda user, napp: catalog.get((user, napp)),
+        exclude=set(mgr.get_installed()) - set(outdated))
+    levels = resolver.resolve([napp + (latest,) for napp, latest in
+                               sorted(outdated.items())])
+    return [[(user, napp, version or catalog[(user, napp)].get('version'))
+             for user, napp, version in level]
+            for level in levels], resolver.graph
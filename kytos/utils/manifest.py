@@ -0,0 +1,83 @@
+"""Per-file content manifest of NApp packages."""
+import hashlib
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+#: Name of the manifest inside a package. It is always the first entry.
+MANIFEST_FILE = '.napp-manifest.json'
+#: Manifest format version.
+MANIFEST_VERSION = 1
+#: Files at least this big (bytes) are memory-mapped to be hashed.
+MMAP_THRESHOLD = 1024 * 1024
+
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file.
+
+    Large files are memory-mapped instead of read in chunks, which avoids
+    copying their content through Python buffers.
+    """
+    sha256 = hashlib.sha256()
+    with open(str(path), 'rb') as content:
+        if os.fstat(content.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(content.fileno(), 0,
+                           access=mmap.ACCESS_READ) as mapped:
+                sha256.update(mapped)
+        else:
+            for chunk in iter(lambda: content.read(64 * 1024), b''):
+                sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def build_manifest(files, max_workers=4):
+    """Return the manifest of regular files.
+
+    Args:
+        files (list): (path, arcname) tuples. Only regular files are listed.
+        max_workers (int): Maximum number of files hashed concurrently.
+
+    Returns:
+        dict: ``{'version': 1, 'files': {arcname: {'sha256', 'size'}}}``.
+
+    """
+    files = [(path, arcname) for path, arcname in files
+             if os.path.isfile(path) and not os.path.islink(path)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        hashes = pool.map(lambda item: hash_file(item[0]), files)
+        entries = {arcname: {'sha256': sha256,
+                             'size': os.path.getsize(path)}
+                   for (path, arcname), sha256 in zip(files, hashes)}
+    return {'version': MANIFEST_VERSION, 'files': entries}
+
+
+def unchanged_files(root, manifest, max_workers=4):
+    """Return the arcnames of ``manifest`` whose file in ``root`` matches.
+
+    Only files with the same size as in the manifest are hashed, so most
+    changed files are detected without reading them.
+
+    Args:
+        root (pathlib.Path): Installed NApp folder.
+        manifest (dict): Manifest of the new package.
+        max_workers (int): Maximum number of files hashed concurrently.
+
+    Returns:
+        set: Arcnames whose content is already in ``root``.
+
+    """
+    candidates = []
+    for arcname, entry in manifest['files'].items():
+        path = root / arcname
+        try:
+            if not path.is_symlink() and \
+                    path.stat().st_size == entry['size']:
+                candidates.append(arcname)
+        except OSError:
+            continue
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        hashes = pool.map(lambda arcname: hash_file(root / arcname),
+                          candidates)
+        return {arcname for arcname, sha256 in zip(candidates, hashes)
+                if sha256 == manifest['files'][arcname]['sha256']}
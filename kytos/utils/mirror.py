@@ -0,0 +1,205 @@
+"""Local mirror of the NApps Server catalog and packages."""
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from kytos.utils.resolver import DependencyResolver
+
+LOG = logging.getLogger(__name__)
+
+
+class NAppsMirror:
+    """Folder with a copy of the NApps Server catalog and packages.
+
+    The folder mimics the server, so ``[napps] api`` can be set to
+    ``<folder>/api/`` and ``[napps] repo`` to ``<folder>/repo`` (as paths or
+    ``file://`` URIs) to install NApps without reaching the server::
+
+        api/napps/index.json                  catalog (<api>/napps/)
+        api/napps/<user>/<napp>/index.json    NApp metadata
+        repo/<user>/<napp>-<version>.napp     packages
+
+    Syncing is incremental: the catalog and the ``latest`` packages are
+    revalidated with the ETags of the previous sync, and versioned packages
+    already in the mirror are never downloaded again.
+    """
+
+    def __init__(self, path, client, session, repo, max_workers=4):
+        """Create a mirror.
+
+        Args:
+            path (str): Mirror folder.
+            client (NAppsClient): Client used to fetch the catalog.
+            session (requests.Session): Session used to download packages.
+            repo (str): URI of the NApps repository.
+            max_workers (int): Maximum number of concurrent downloads.
+
+        """
+        self.path = Path(path).expanduser()
+        self._client = client
+        self._session = session
+        self._repo = repo
+        self._max_workers = max_workers
+        self._state_file = self.path / '.mirror.json'
+        self._state = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, path, config):
+        """Create a mirror of the servers in the ``[napps]`` section."""
+        from kytos.utils.client import NAppsClient
+        from kytos.utils.session import get_session
+
+        return cls(path, NAppsClient(config), get_session(config),
+                   config.get('napps', 'repo'),
+                   config.getint('napps', 'workers', fallback=4))
+
+    @property
+    def api_uri(self):
+        """URI to be used as ``[napps] api``."""
+        return (self.path / 'api').resolve().as_uri() + '/'
+
+    @property
+    def repo_uri(self):
+        """URI to be used as ``[napps] repo``."""
+        return (self.path / 'repo').resolve().as_uri()
+
+    def sync(self, napps=None):
+        """Update the catalog and download packages.
+
+        Args:
+            napps (list): (user, napp, version) tuples to be mirrored together
+                with their dependencies. If empty, mirror every NApp in the
+                catalog. NApps without a version get both their ``latest``
+                package and the one of their current version.
+
+        Returns:
+            list: Sorted (package, status) tuples, status being
+                ``'downloaded'``, ``'unchanged'`` or an error message.
+
+        Raises:
+            requests.exceptions.RequestException: If the catalog can't be
+                fetched.
+            KytosException: If the dependencies can't be resolved.
+
+        """
+        self._state = self._read_json(self._state_file) or {}
+        catalog = self._sync_catalog()
+
+        report = []
+        if napps:
+            resolver = DependencyResolver(
+                lambda user, napp: catalog.get((user, napp)),
+                max_workers=self._max_workers)
+            packages = [napp for level in resolver.resolve(napps)
+                        for napp in level]
+            report = [('{}/{}'.format(*key), 'not found')
+                      for key in resolver.missing]
+        else:
+            packages = [key + (None,) for key in sorted(catalog)]
+        packages = [package for napp in packages
+                    for package in self._packages(catalog, *napp)]
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            report.extend(pool.map(lambda napp: self._sync_package(*napp),
+                                   packages))
+        self._write_json(self._state_file, self._state)
+        return sorted(report)
+
+    def _sync_catalog(self):
+        """Update the catalog and return it as {(user, napp): metadata}."""
+        folder = self.path / 'api' / 'napps'
+        index = folder / 'index.json'
+        etag = self._state.get('catalog_etag') if index.exists() else None
+        napps, etag = self._client.get_napps_if_changed(etag)
+        if napps is None:
+            napps = self._read_json(index)['napps']
+        else:
+            self._write_json(index, {'napps': napps})
+            for napp in napps:
+                # WARNING: This will change for future versions, when
+                # 'author' will be removed.
+                username = napp.get('username', napp.get('author'))
+                self._write_json(folder / username / napp['name'] /
+                                 'index.json', napp)
+            self._state['catalog_etag'] = etag
+
+        return {(napp.get('username', napp.get('author')), napp['name']): napp
+                for napp in napps}
+
+    @staticmethod
+    def _packages(catalog, user, napp, version):
+        """Return the (user, napp, version) packages to mirror of a NApp.
+
+        Without a version, both the ``latest`` package and the one of the
+        version in the catalog are mirrored, since ``kytos napps upgrade``
+        and lockfiles download NApps by version.
+        """
+        latest = (catalog.get((user, napp)) or {}).get('version')
+        if version or not latest:
+            return [(user, napp, version)]
+        return [(user, napp, None), (user, napp, latest)]
+
+    def _sync_package(self, user, napp, version=None):
+        """Download a package unless the mirror has it up to date."""
+        name = '{}/{}-{}.napp'.format(user, napp, version or 'latest')
+        dst = self.path / 'repo' / name
+        etags = self._state.setdefault('packages', {})
+        if version and dst.exists():
+            return name, 'unchanged'
+
+        headers = {}
+        if dst.exists() and etags.get(name):
+            headers['If-None-Match'] = etags[name]
+        try:
+            response = self._session.get(os.path.join(self._repo, name),
+                                         headers=headers, stream=True)
+            with response:
+                if response.status_code == 304:
+                    return name, 'unchanged'
+                response.raise_for_status()
+                self._download(response, dst)
+        except (requests.exceptions.RequestException, OSError) as exception:
+            return name, str(exception)
+
+        with self._lock:
+            etags[name] = response.headers.get('ETag')
+        return name, 'downloaded'
+
+    @staticmethod
+    def _download(response, dst):
+        """Save a streamed response atomically."""
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=str(dst.parent), suffix='.part',
+                                         delete=False) as tmp:
+            try:
+                for chunk in response.iter_content(64 * 1024):
+                    tmp.write(chunk)
+            except BaseException:
+                tmp.close()
+                os.remove(tmp.name)
+                raise
+        os.replace(tmp.name, str(dst))
+
+    @staticmethod
+    def _read_json(filename):
+        try:
+            with filename.open() as json_file:
+                return json.load(json_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(filename, data):
+        """Write a JSON file atomically."""
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=str(filename.parent),
+                                         delete=False) as tmp:
+            json.dump(data, tmp)
+        os.replace(tmp.name, str(filename))
@@ -1,25 +1,29 @@
 """Manage Network Application files."""
+import copy
 import json
 import logging
 import os
 import re
 import shutil
 import sys
-import tarfile
-import urllib
+import tempfile
 from pathlib import Path
-from random import randint
-
-# Disable pylint import checks that conflict with isort
-# pylint: disable=ungrouped-imports,wrong-import-order
-from jinja2 import Environment, FileSystemLoader
-from kytos.core.napps.manager import NAppsManager as CoreNAppsManager
-from ruamel.yaml import YAML
 
+from kytos.utils.cache import PackageCache
 from kytos.utils.client import NAppsClient
-from kytos.utils.config import KytosConfig
-from kytos.utils.openapi import OpenAPI
+from kytos.utils.compiler import NAppsCompiler, precompile
+from kytos.utils.config import get_config
+from kytos.utils.index import NAppsIndex
+from kytos.utils.lock import FileLock, locked
+from kytos.utils.package import build_package, extract_package, open_package
+from kytos.utils.profiling import TimedReader, span, timed
+from kytos.utils.resolver import dependency_order
 from kytos.utils.settings import SKEL_PATH
+from kytos.utils.versions import NAppVersions, napp_version, version_key
+
+# Heavy modules (requests, jinja2, ruamel.yaml, kytos.core and the ones that
+# import them) are imported by the methods that need them, so that commands
+# like "kytos napps list" start fast.
 
 LOG = logging.getLogger(__name__)
 
@@ -28,6 +32,12 @@ LOG = logging.getLogger(__name__)
 class NAppsManager:
     """Deal with NApps at filesystem level and ask Kytos to (un)load NApps."""
 
+    #: kytosd NApps folders by Kytos API URL and NApps indexes by folders,
+    #: shared by the managers of a process so that a long-running one (e.g.
+    #: ``kytos agent``) asks kytosd and loads each index only once.
+    _kytos_paths = {}
+    _indexes = {}
+
     def __init__(self, controller=None):
         """If controller is not informed, the necessary paths must be.
 
@@ -43,8 +53,12 @@ class NAppsManager:
                 use the controller's configuration.
         """
         self._controller = controller
-        self._config = KytosConfig().config
+        self._config = get_config().config
         self._kytos_api = self._config.get('kytos', 'api')
+        self._cache = PackageCache.from_config(self._config)
+
+        #: If True, install packages only from the local cache
+        self.offline = False
 
         self.user = None
         self.napp = None
@@ -53,6 +67,7 @@ class NAppsManager:
         # Automatically get from kytosd API when needed
         self.__enabled = None
         self.__installed = None
+        self.__index = None
 
     @property
     def _enabled(self):
@@ -73,14 +88,33 @@ class NAppsManager:
         running kytosd instance.
         """
         if self.__enabled is None:
-            uri = self._kytos_api + 'api/kytos/core/config/'
-            try:
-                options = json.loads(urllib.request.urlopen(uri).read())
-            except urllib.error.URLError:
-                print('Kytos is not running.')
-                sys.exit()
-            self.__enabled = Path(options.get('napps'))
-            self.__installed = Path(options.get('installed_napps'))
+            paths = self._kytos_paths.get(self._kytos_api)
+            if paths is None:
+                paths = self._request_kytos_paths()
+                self._kytos_paths[self._kytos_api] = paths
+            self.__enabled, self.__installed = paths
+
+    @timed('kytos_config')
+    def _request_kytos_paths(self):
+        """Return kytosd (enabled, installed) NApps folders."""
+        import requests
+        from kytos.utils.session import get_session
+
+        uri = self._kytos_api + 'api/kytos/core/config/'
+        try:
+            response = get_session(self._config).get(uri)
+            response.raise_for_status()
+            options = response.json()
+        except requests.exceptions.RequestException:
+            print('Kytos is not running.')
+            sys.exit()
+        return (Path(options.get('napps')),
+                Path(options.get('installed_napps')))
+
+    @property
+    def workers(self):
+        """Maximum number of concurrent jobs (``[napps] workers``)."""
+        return self._config.getint('napps', 'workers', fallback=4)
 
     def set_napp(self, user, napp, version=None):
         """Set info about NApp.
@@ -94,37 +128,64 @@ class NAppsManager:
         self.napp = napp
         self.version = version or 'latest'
 
+    def for_napp(self, user, napp, version=None):
+        """Return a copy of this manager set to another NApp.
+
+        The copy shares the config and the Kytos paths already fetched, so it
+        can be used concurrently without asking kytosd again.
+        """
+        mgr = copy.copy(self)
+        mgr.set_napp(user, napp, version)
+        return mgr
+
     @property
     def napp_id(self):
         """Return a Identifier of NApp."""
         return '/'.join((self.user, self.napp))
 
-    @staticmethod
-    def _get_napps(napps_dir):
-        """List of (username, napp_name) found in ``napps_dir``."""
-        jsons = napps_dir.glob('*/*/kytos.json')
-        return sorted(j.parts[-3:-1] for j in jsons)
+    def _lock(self, user=None, napp=None):
+        """Return the cross-process lock of a NApp.
+
+        Locks live in ``<installed>/.locks`` and are held while a NApp is
+        installed, uninstalled, enabled or disabled, so that concurrent
+        ``kytos`` processes don't change the same NApp at once.
+        """
+        return FileLock(self._installed / '.locks' / '{}.{}.lock'.format(
+            user or self.user, napp or self.napp))
+
+    @property
+    def _index(self):
+        """Index of installed and enabled NApps, loaded once per process."""
+        if self.__index is None:
+            key = (self._installed, self._enabled)
+            if key not in self._indexes:
+                self._indexes[key] = NAppsIndex(*key)
+            self.__index = self._indexes[key]
+        return self.__index
+
+    @classmethod
+    def shared_indexes(cls):
+        """Return the NApps indexes loaded in this process."""
+        return list(cls._indexes.values())
 
     def get_enabled(self):
         """Sorted list of (username, napp_name) of enabled napps."""
-        return self._get_napps(self._enabled)
+        return sorted(self._index.enabled())
 
     def get_installed(self):
         """Sorted list of (username, napp_name) of installed napps."""
-        return self._get_napps(self._installed)
+        return sorted(self._index.installed())
 
     def is_installed(self):
         """Whether a NApp is installed."""
-        return (self.user, self.napp) in self.get_installed()
+        return (self.user, self.napp) in self._index.installed()
 
     def get_disabled(self):
         """Sorted list of (username, napp_name) of disabled napps.
 
         The difference of installed and enabled.
         """
-        installed = set(self.get_installed())
-        enabled = set(self.get_enabled())
-        return sorted(installed - enabled)
+        return sorted(self._index.installed() - self._index.enabled())
 
     def dependencies(self, user=None, napp=None):
         """Get napp_dependencies from install NApp.
@@ -164,18 +225,11 @@ class NAppsManager:
             user = self.user
         if napp is None:
             napp = self.napp
-        kytos_json = self._installed / user / napp / 'kytos.json'
-        try:
-            with kytos_json.open() as file_descriptor:
-                meta = json.load(file_descriptor)
-                return meta[key]
-        except (FileNotFoundError, json.JSONDecodeError, KeyError):
-            return ''
+        return self._index.metadata(user, napp).get(key, '')
 
     def disable(self):
         """Disable a NApp if it is enabled."""
-        core_napps_manager = CoreNAppsManager(base_path=self._enabled)
-        core_napps_manager.disable(self.user, self.napp)
+        self.disable_napps([(self.user, self.napp)])
 
     def enabled_dir(self):
         """Return the enabled dir from current napp."""
@@ -193,21 +247,153 @@ class NAppsManager:
             PermissionError: No filesystem permission to enable NApp.
 
         """
-        core_napps_manager = CoreNAppsManager(base_path=self._enabled)
-        core_napps_manager.enable(self.user, self.napp)
+        self.enable_napps([(self.user, self.napp)])
 
     def is_enabled(self):
         """Whether a NApp is enabled."""
-        return (self.user, self.napp) in self.get_enabled()
+        return (self.user, self.napp) in self._index.enabled()
+
+    @timed('enable')
+    def enable_napps(self, napps):
+        """Enable several NApps in a single pass.
+
+        The NApps are enabled in dependency order. Nothing is changed if any
+        of them is not installed, and if a symlink can't be created, the ones
+        already created are removed, so the batch is applied entirely or not
+        at all.
+
+        Args:
+            napps (list): (user, napp) tuples.
+
+        Returns:
+            list: (user, napp) tuples that were enabled, in order.
+
+        Raises:
+            FileNotFoundError: If a NApp is not installed.
+            PermissionError: No filesystem permission to enable NApps.
+
+        """
+        napps = dependency_order(napps, self.dependencies)
+        with locked(*(self._lock(*napp) for napp in napps)):
+            self._index.refresh()
+            enabled = self._index.enabled()
+            installed = self._index.installed()
+            todo = [napp for napp in napps if napp not in enabled]
+            for napp in todo:
+                if napp not in installed:
+                    raise FileNotFoundError(
+                        'Install {}/{} before enabling.'.format(*napp))
+
+            done = []
+            try:
+                for user, napp in todo:
+                    link = self._enabled / user / napp
+                    self._check_module(link.parent)
+                    link.symlink_to(self._installed / user / napp)
+                    done.append((user, napp))
+            except OSError:
+                for user, napp in done:
+                    (self._enabled / user / napp).unlink()
+                raise
+            finally:
+                self._index.invalidate()
+        return done
+
+    @timed('disable')
+    def disable_napps(self, napps):
+        """Disable several NApps in a single pass.
+
+        The NApps are disabled in reverse dependency order. If a symlink can't
+        be removed, the ones already removed are restored.
+
+        Args:
+            napps (list): (user, napp) tuples.
+
+        Returns:
+            list: (user, napp) tuples that were disabled, in order.
+
+        Raises:
+            PermissionError: No filesystem permission to disable NApps.
+
+        """
+        napps = dependency_order(napps, self.dependencies)
+        with locked(*(self._lock(*napp) for napp in napps)):
+            self._index.refresh()
+            enabled = self._index.enabled()
+            todo = [napp for napp in reversed(napps) if napp in enabled]
+
+            done, targets = [], []
+            try:
+                for user, napp in todo:
+                    link = self._enabled / user / napp
+                    if link.is_symlink():
+                        targets.append(os.readlink(str(link)))
+                        link.unlink()
+                        done.append((user, napp))
+            except OSError:
+                for (user, napp), target in zip(done, targets):
+                    (self._enabled / user / napp).symlink_to(target)
+                raise
+            finally:
+                self._index.invalidate()
+        return done
 
     def uninstall(self):
-        """Delete code inside NApp directory, if existent."""
-        if self.is_installed():
+        """Delete code inside NApp directory, if existent.
+
+        All stored versions of the NApp are deleted too.
+        """
+        with self._lock():
             installed = self.installed_dir()
-            if installed.is_symlink():
-                installed.unlink()
-            else:
+            if installed.is_dir() and not installed.is_symlink():
                 shutil.rmtree(str(installed))
+            self._versions().remove()
+            self._index.invalidate(self.user)
+
+    def _versions(self, user=None, napp=None):
+        """Return the stored versions of a NApp."""
+        return NAppVersions(self._installed, user or self.user,
+                            napp or self.napp)
+
+    def versions(self):
+        """Return the stored versions of the NApp and the active one.
+
+        Returns:
+            tuple: List of versions, most recently activated first, and the
+                active version (None if the installed NApp is not a stored
+                version, e.g. a local NApp).
+
+        """
+        with self._lock():
+            versions = self._versions()
+            return versions.versions(), versions.active()
+
+    def switch_version(self, version=None):
+        """Activate a stored version of the NApp.
+
+        Only a symlink is replaced, so Kytos keeps running the previous code
+        until the NApp is reloaded.
+
+        Args:
+            version (str): Stored version. If None, the version that was
+                active before the current one (rollback).
+
+        Returns:
+            str: Activated version.
+
+        Raises:
+            FileNotFoundError: If the version is not stored.
+
+        """
+        with self._lock():
+            versions = self._versions()
+            version = version or versions.previous()
+            if version is None:
+                raise FileNotFoundError('{} has no previous version.'.format(
+                    self.napp_id))
+            versions.activate(version)
+            self._index.invalidate(self.user)
+        return version
 
     @staticmethod
     def valid_name(username):
@@ -222,43 +408,98 @@ class NAppsManager:
     @staticmethod
     def render_template(templates_path, template_filename, context):
         """Render Jinja2 template for a NApp structure."""
+        from jinja2 import Environment, FileSystemLoader
         template_env = Environment(
             autoescape=False, trim_blocks=False,
             loader=FileSystemLoader(str(templates_path)))
         return template_env.get_template(str(template_filename)) \
             .render(context)
 
-    @staticmethod
-    def search(pattern):
-        """Search all server NApps matching pattern.
+    def search(self, query, refresh=False, offline=False):
+        """Search all server NApps matching a query, best matches first.
+
+        The NApps Server catalog is cached locally, see
+        :class:`~kytos.utils.catalog.NAppsCatalog`.
 
         Args:
-            pattern (str): Python regular expression.
+            query (str): Words to look for. Shell wildcards (``*``) are
+                matched against the whole NApp id, description and tags.
+            refresh (bool): Revalidate the cached catalog now.
+            offline (bool): Use only the cached catalog.
+        """
+        from kytos.utils.catalog import NAppsCatalog, server_errors
+        catalog = NAppsCatalog.from_config(NAppsClient(self._config),
+                                           self._config)
+        with server_errors(self._config):
+            return catalog.search(query, refresh=refresh, offline=offline)
+
+    def catalog(self, offline=False):
+        """Return {(user, napp): metadata} of the NApps Server catalog.
+
+        The cached catalog is revalidated with a single conditional request,
+        unless ``offline``.
         """
-        def match(napp):
-            """Whether a NApp metadata matches the pattern."""
-            # WARNING: This will change for future versions, when 'author' will
-            # be removed.
-            username = napp.get('username', napp.get('author'))
+        from kytos.utils.catalog import NAppsCatalog, server_errors
+        catalog = NAppsCatalog.from_config(NAppsClient(self._config),
+                                           self._config)
+        with span('catalog'), server_errors(self._config):
+            napps = catalog.napps(refresh=not offline, offline=offline)
+        # WARNING: This will change in future versions, when 'author' will be
+        # removed.
+        return {(meta.get('username', meta.get('author')), meta.get('name')):
+                meta for meta in napps}
+
+    def outdated(self, offline=False, catalog=None):
+        """Return installed NApps with a newer version in the catalog.
+
+        The catalog is joined in memory with the metadata of the NApps index,
+        so the cost is one request and one local scan however many NApps are
+        installed. Local NApps (symlinks to a working copy) are left out.
 
-            strings = ['{}/{}'.format(username, napp.get('name')),
-                       napp.get('description')] + napp.get('tags')
-            return any(pattern.match(string) for string in strings)
+        Args:
+            offline (bool): Use only the cached catalog.
+            catalog (dict): Catalog already returned by :meth:`catalog`.
 
-        napps = NAppsClient().get_napps()
-        return [napp for napp in napps if match(napp)]
+        Returns:
+            list: Sorted (user, napp, installed version, latest version)
+                tuples.
+
+        """
+        if catalog is None:
+            catalog = self.catalog(offline)
+        outdated = []
+        for user, napp in self.get_installed():
+            latest = catalog.get((user, napp), {}).get('version')
+            if not latest:
+                continue
+            installed = self.get_version(user, napp)
+            link = self._installed / user / napp
+            if link.is_symlink() and self._versions(user, napp).active() \
+                    is None:
+                continue
+            if version_key(latest) > version_key(installed):
+                outdated.append((user, napp, installed, latest))
+        return outdated
 
     def install_local(self):
         """Make a symlink in install folder to a local NApp.
 
+        Installing the same local NApp again does nothing.
+
         Raises:
             FileNotFoundError: If NApp is not found.
+            FileExistsError: If another copy of the NApp is installed.
 
         """
-        folder = self._get_local_folder()
+        folder = self._get_local_folder().resolve()
         installed = self.installed_dir()
-        self._check_module(installed.parent)
-        installed.symlink_to(folder.resolve())
+        with self._lock():
+            self._check_module(installed.parent)
+            if installed.is_symlink() and installed.resolve() == folder:
+                return
+            installed.symlink_to(folder)
+            self._index.invalidate(self.user)
+            precompile(self._config, folder, self.napp_id)
 
     def _get_local_folder(self, root=None):
         """Return local NApp root folder.
@@ -271,13 +512,23 @@ class NAppsManager:
         Return:
             pathlib.Path: NApp root folder.
 
+        Raises:
+            FileNotFoundError: If there is no such local NApp.
+
+        """
+        return self._find_local_napp(self.user, self.napp, root)[0]
+
+    @staticmethod
+    def _find_local_napp(user, napp, root=None):
+        """Return the local NApp root folder and its kytos.json content.
+
         Raises:
             FileNotFoundError: If there is no such local NApp.
 
         """
         if root is None:
             root = Path()
-        for folders in ['.'], [self.user, self.napp]:
+        for folders in ['.'], [user, napp]:
             kytos_json = root / Path(*folders) / 'kytos.json'
             if kytos_json.exists():
                 with kytos_json.open() as file_descriptor:
@@ -285,56 +536,196 @@ class NAppsManager:
                     # WARNING: This will change in future versions, when
                     # 'author' will be removed.
                     username = meta.get('username', meta.get('author'))
-                    if username == self.user and meta.get('name') == self.napp:
-                        return kytos_json.parent
+                    if username == user and meta.get('name') == napp:
+                        return kytos_json.parent, meta
         raise FileNotFoundError('kytos.json not found.')
 
-    def install_remote(self):
-        """Download, extract and install NApp."""
-        package, pkg_folder = None, None
+    def get_metadata(self, user=None, napp=None):
+        """Return NApp metadata, from a local kytos.json or NApps Server.
+
+        Return:
+            dict: kytos.json content or None if the NApp was not found.
+
+        """
+        user = user or self.user
+        napp = napp or self.napp
         try:
-            package = self._download()
-            pkg_folder = self._extract(package)
-            napp_folder = self._get_local_folder(pkg_folder)
-            dst = self._installed / self.user / self.napp
-            self._check_module(dst.parent)
-            shutil.move(str(napp_folder), str(dst))
-        finally:
-            # Delete temporary files
-            if package:
-                Path(package).unlink()
-            if pkg_folder and pkg_folder.exists():
-                shutil.rmtree(str(pkg_folder))
-
-    def _download(self):
-        """Download NApp package from server.
+            return self._find_local_napp(user, napp)[1]
+        except FileNotFoundError:
+            pass
+        if self.offline:
+            entry = self._cache.find(user, napp)
+            return entry and entry['meta']
+        with span('metadata', napp='{}/{}'.format(user, napp)):
+            return NAppsClient(self._config).get_napp(user, napp)
+
+    @property
+    def cache(self):
+        """Local cache of downloaded packages."""
+        return self._cache
+
+    def mirror(self, path, napps=None):
+        """Copy the NApps catalog and packages into a local folder.
+
+        Args:
+            path (str): Mirror folder.
+            napps (list): (user, napp, version) tuples to be mirrored with
+                their dependencies. If empty, mirror every NApp.
 
         Return:
-            str: Downloaded temp filename.
+            tuple: The :class:`~kytos.utils.mirror.NAppsMirror` and the list
+                of (package, status) returned by its ``sync`` method.
+
+        """
+        from kytos.utils.mirror import NAppsMirror
+
+        mirror = NAppsMirror.from_config(path, self._config)
+        return mirror, mirror.sync(napps)
+
+    def serve_cache(self, host, port):
+        """Serve a pull-through caching proxy of the NApps Server.
+
+        Controllers using ``http://<host>:<port>/api/`` and
+        ``http://<host>:<port>/repo`` as NApps API and repository share the
+        proxy's cache. This method blocks until interrupted.
+
+        Args:
+            host (str): Address to listen on.
+            port (int): Port to listen on.
+
+        """
+        from kytos.utils.proxy import serve
+
+        serve(self._config, host, port)
+
+    def install_remote(self):
+        """Download, extract and install NApp.
+
+        The package is streamed straight into a staging folder on the same
+        filesystem as the installed NApps, stored as a version next to the
+        other versions of the NApp (reusing the stored one if identical) and
+        activated by atomically replacing the NApp symlink (see
+        :class:`~kytos.utils.versions.NAppVersions`), so there is no
+        intermediate archive or ``/tmp`` copy and the NApp is never seen
+        half-installed. The NApp lock is held meanwhile.
+
+        If the NApp is already installed and the package has a manifest, the
+        new version starts as a hard-linked copy of the installed one and
+        only files whose content changed are written.
+
+        Either way, the NApp modules are precompiled (see :meth:`compile`)
+        and the oldest versions beyond ``[napps] keep_versions`` are deleted.
+        """
+        dst = self._installed / self.user / self.napp
+        self._check_module(dst.parent)
+        staging_root = self._installed / '.staging'
+        staging_root.mkdir(exist_ok=True)
+        with self._lock():
+            versions = self._versions()
+            # Not a local NApp, whose files may be edited in place
+            base = dst if versions.active() or dst.is_dir() and \
+                not dst.is_symlink() else None
+            staging = Path(tempfile.mkdtemp(dir=str(staging_root)))
+            try:
+                # One level deeper so "*/*/kytos.json" never matches staging
+                pkg_folder = staging / self.napp
+                with self.open_package() as package, \
+                        span('extract', napp=self.napp_id):
+                    reader = TimedReader(package, 'download',
+                                         napp=self.napp_id)
+                    extract_package(reader, pkg_folder, base, self.workers)
+                    reader.close()
+                napp_folder = self._get_local_folder(pkg_folder)
+                # Compiled before the NApp is visible to Kytos
+                precompile(self._config, napp_folder, self.napp_id)
+                with span('move', napp=self.napp_id):
+                    version = versions.add(napp_folder,
+                                           napp_version(napp_folder))
+                    versions.activate(version)
+                self._index.invalidate(self.user)
+                for removed in versions.prune(self._config.getint(
+                        'napps', 'keep_versions', fallback=3)):
+                    LOG.info('    %s: Deleted version %s.', self.napp_id,
+                             removed)
+            finally:
+                shutil.rmtree(str(staging), ignore_errors=True)
+
+    def compile(self, napps=None, optimize=None, invalidation_mode=None):
+        """Precompile the modules of installed NApps.
+
+        Args:
+            napps (list): (user, napp) tuples. If None, all installed NApps.
+            optimize (str): Comma-separated optimization levels. If None, use
+                ``[napps] compile_optimize``.
+            invalidation_mode (str): If None, use
+                ``[napps] compile_invalidation``.
+
+        Returns:
+            list: Modules that could not be compiled.
 
         Raises:
-            urllib.error.HTTPError: If download is not successful.
+            ValueError: If an option is invalid.
+            FileNotFoundError: If a NApp is not installed.
 
         """
-        repo = self._config.get('napps', 'repo')
-        napp_id = '{}/{}-{}.napp'.format(self.user, self.napp, self.version)
-        uri = os.path.join(repo, napp_id)
-        return urllib.request.urlretrieve(uri)[0]
+        compiler = NAppsCompiler.from_config(self._config, optimize,
+                                             invalidation_mode)
+        installed = self._index.installed()
+        napps = sorted(installed) if napps is None else napps
+        for napp in napps:
+            if tuple(napp) not in installed:
+                raise FileNotFoundError('{}/{} is not installed.'.format(
+                    *napp))
+        with locked(*(self._lock(*napp) for napp in napps)), \
+                span('compile'):
+            return compiler.compile([self._installed / user / napp
+                                     for user, napp in napps])
+
+    def profile_load(self, napps=None, timeout=60):
+        """Measure how long Kytos takes to import enabled NApps.
+
+        See :func:`~kytos.utils.loadprofile.profile_napps`.
 
-    @staticmethod
-    def _extract(filename):
-        """Extract package to a temporary folder.
+        Args:
+            napps (list): (user, napp) tuples. If None, all enabled NApps.
+            timeout (int): Seconds to wait for the import of each NApp.
 
-        Return:
-            pathlib.Path: Temp dir with package contents.
+        Returns:
+            list: Results of :func:`kytos.utils.loadprofile.profile_napp`.
+
+        Raises:
+            FileNotFoundError: If a NApp is not enabled.
 
         """
-        random_string = '{:0d}'.format(randint(0, 10**6))
-        tmp = '/tmp/kytos-napp-' + Path(filename).stem + '-' + random_string
-        os.mkdir(tmp)
-        with tarfile.open(filename, 'r:xz') as tar:
-            tar.extractall(tmp)
-        return Path(tmp)
+        from kytos.utils.loadprofile import profile_napps
+
+        enabled = set(self.get_enabled())
+        napps = sorted(enabled) if napps is None else napps
+        for napp in napps:
+            if tuple(napp) not in enabled:
+                raise FileNotFoundError('{}/{} is not enabled.'.format(
+                    *napp))
+        return profile_napps(self._enabled, napps, enabled,
+                             self.dependencies, timeout)
+
+    def open_package(self):
+        """Return a context manager yielding a stream of the NApp package.
+
+        The package goes through the local cache, see
+        :func:`~kytos.utils.package.open_package`.
+
+        Raises:
+            requests.HTTPError: If download is not successful.
+            FileNotFoundError: If offline and the package is not cached.
+
+        """
+        uri = os.path.join(self._config.get('napps', 'repo'),
+                           '{}/{}-{}.napp'.format(self.user, self.napp,
+                                                  self.version))
+        return open_package(self._cache,
+                            self._cache.key(self.user, self.napp,
+                                            self.version),
+                            uri, self._config, offline=self.offline)
 
     @classmethod
     def create_napp(cls, meta_package=False):
@@ -433,49 +824,42 @@ class NAppsManager:
     def _check_module(folder):
         """Create module folder with empty __init__.py if it doesn't exist.
 
+        Safe to be called concurrently: the ``__init__.py`` is checked even
+        if the folder exists, since it may have just been created by another
+        process.
+
         Args:
             folder (pathlib.Path): Module path.
         """
-        if not folder.exists():
-            folder.mkdir(parents=True, exist_ok=True, mode=0o755)
-            (folder / '__init__.py').touch()
+        folder.mkdir(parents=True, exist_ok=True, mode=0o755)
+        try:
+            os.close(os.open(str(folder / '__init__.py'),
+                             os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+        except FileExistsError:
+            pass
 
     @staticmethod
-    def build_napp_package(napp_name):
+    def build_napp_package(napp_name, root='.'):
         """Build the .napp file to be sent to the napps server.
 
+        See :func:`~kytos.utils.package.build_package`, which is given the
+        ``[napps] build_preset`` and ``workers`` options.
+
         Args:
-            napp_identifier (str): Identifier formatted as
-                <username>/<napp_name>
+            napp_name (str): NApp name, used as the package file name.
+            root (str): NApp folder.
 
         Return:
             file_payload (binary): The binary representation of the napp
-                package that will be POSTed to the napp server.
+                package that will be POSTed to the napp server, with its
+                position at the beginning.
 
         """
-        ignored_extensions = ['.swp', '.pyc', '.napp']
-        ignored_dirs = ['__pycache__']
-        files = os.listdir()
-        for filename in files:
-            if os.path.isfile(filename) and '.' in filename and \
-                    filename.rsplit('.', 1)[1] in ignored_extensions:
-                files.remove(filename)
-            elif os.path.isdir(filename) and filename in ignored_dirs:
-                files.remove(filename)
-
-        # Create the '.napp' package
-        napp_file = tarfile.open(napp_name + '.napp', 'x:xz')
-        for local_f in files:
-            napp_file.add(local_f)
-        napp_file.close()
-
-        # Get the binary payload of the package
-        file_payload = open(napp_name + '.napp', 'rb')
-
-        # remove the created package from the filesystem
-        os.remove(napp_name + '.napp')
-
-        return file_payload
+        config = get_config().config
+        return build_package(
+            napp_name, root,
+            preset=config.getint('napps', 'build_preset', fallback=6),
+            workers=config.getint('napps', 'workers', fallback=4))
 
     @staticmethod
     def create_metadata(*args, **kwargs):  # pylint: disable=unused-argument
@@ -500,6 +884,7 @@ class NAppsManager:
             metadata['readme'] = ''
 
         try:
+            from ruamel.yaml import YAML
             yaml = YAML(typ='safe')
             openapi_dict = yaml.load(Path('openapi.yml').open())
             openapi = json.dumps(openapi_dict)
@@ -519,8 +904,17 @@ class NAppsManager:
         self.prepare()
         metadata = self.create_metadata(*args, **kwargs)
         package = self.build_napp_package(metadata.get('name'))
+        filename = '{}.napp'.format(metadata.get('name'))
 
-        NAppsClient().upload_napp(metadata, package)
+        NAppsClient().upload_napp(metadata, (filename, package),
+                                  progress=self._print_progress)
+
+    @staticmethod
+    def _print_progress(sent, total):
+        """Show how much of the package was uploaded."""
+        percent = 100 * sent / total if total else 100
+        end = '\n' if sent >= total else ''
+        print('\rUploading... {:3.0f}%'.format(percent), end=end, flush=True)
 
     def delete(self):
         """Delete a NApp.
@@ -536,6 +930,7 @@ class NAppsManager:
     def prepare(cls):
         """Prepare NApp to be uploaded by creating openAPI skeleton."""
         if cls._ask_openapi():
+            from kytos.utils.openapi import OpenAPI
             napp_path = Path()
             tpl_path = SKEL_PATH / 'napp-structure/username/napp'
             OpenAPI(napp_path, tpl_path).render_template()
@@ -567,12 +962,14 @@ class NAppsManager:
 
         Args:
             napps (list): NApp list to be reloaded.
-        Raises:
-            requests.HTTPError: When there's a server error.
+
+        Returns:
+            list: Result of each reload, see
+                :meth:`~kytos.utils.client.NAppsClient.reload_napps`.
 
         """
         client = NAppsClient(self._config)
-        client.reload_napps(napps)
+        return client.reload_napps(napps, max_workers=self.workers)
 
 
 # pylint: enable=too-many-instance-attributes,too-many-public-methods
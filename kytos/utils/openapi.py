@@ -1,24 +1,68 @@
 """Deal with OpenAPI v3."""
+import ast
+import hashlib
 import json
+import logging
+import os
 import re
+import tempfile
+from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader
 from kytos.core.api_server import APIServer
 from kytos.core.napps.base import NApp
 
+LOG = logging.getLogger(__name__)
+
+
+class _ParseCache:
+    """Results of parsing NApp modules, addressed by their content hash."""
+
+    #: Change it whenever the parser output changes.
+    VERSION = 1
+
+    def __init__(self, path):
+        self._path = Path(path).expanduser()
+
+    def _file(self, code):
+        digest = hashlib.sha256(code).hexdigest()
+        return self._path / '{}-{}.json'.format(digest, self.VERSION)
+
+    def get(self, code):
+        """Return the cached result for ``code`` or None."""
+        try:
+            with self._file(code).open() as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, code, result):
+        """Save the result of parsing ``code``."""
+        try:
+            self._path.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=str(self._path),
+                                             delete=False) as tmp:
+                json.dump(result, tmp)
+            os.replace(tmp.name, str(self._file(code)))
+        except OSError as exception:
+            LOG.debug('Could not cache OpenAPI parsing: %s', exception)
+
 
 class OpenAPI:  # pylint: disable=too-few-public-methods
     """Create OpenAPI skeleton."""
 
-    def __init__(self, napp_path, tpl_path):
+    def __init__(self, napp_path, tpl_path,
+                 cache_path='~/.kytos/cache/openapi'):
         """Instantiate an OpenAPI object.
 
         Args:
             napp_path (string): Napp directory
             tlp_path (string): File name from template
+            cache_path (string): Where parsed modules are cached
 
         """
         self._napp_path = napp_path
+        self._cache = _ParseCache(cache_path)
         self._template = tpl_path / 'openapi.yml.template'
         self._api_file = napp_path / 'openapi.yml'
 
@@ -39,32 +83,133 @@ class OpenAPI:  # pylint: disable=too-few-public-methods
         self._save(context)
 
     def _parse_paths(self):
-        main_file = self._napp_path / 'main.py'
-        code = main_file.open().read()
-        return self._parse_decorated_functions(code)
-
-    def _parse_decorated_functions(self, code):
-        """Return URL rule, HTTP methods and docstring."""
-        matches = re.finditer(r"""
-                # @rest decorators
-                (?P<decorators>
-                    (?:@rest\(.+?\)\n)+  # one or more @rest decorators inside
-                )
-                # docstring delimited by 3 double quotes
-                .+?"{3}(?P<docstring>.+?)"{3}
-                """, code, re.VERBOSE | re.DOTALL)
-
-        for function_match in matches:
-            m_dict = function_match.groupdict()
-            self._parse_docstring(m_dict['docstring'])
-            self._add_function_paths(m_dict['decorators'])
-
-    def _add_function_paths(self, decorators_str):
-        for rule, parsed_methods in self._parse_decorators(decorators_str):
-            absolute_rule = APIServer.get_absolute_rule(rule, self._napp)
-            path_url = self._rule2path(absolute_rule)
-            path_methods = self._paths.setdefault(path_url, {})
-            self._add_methods(parsed_methods, path_methods)
+        """Add the paths of all ``@rest`` endpoints found in the NApp.
+
+        ``main.py`` and the NApp modules it imports are parsed.
+        """
+        for rule, methods, docstring in self._parse_module('main.py'):
+            self._parse_docstring(docstring)
+            self._add_function_paths(rule, methods)
+
+    def _parse_module(self, filename, seen=None):
+        """Yield (rule, methods, docstring) of a module and its imports.
+
+        Args:
+            filename (str): Module path relative to the NApp directory.
+            seen (set): Modules already parsed, to avoid import cycles.
+
+        """
+        seen = set() if seen is None else seen
+        if filename in seen:
+            return
+        seen.add(filename)
+
+        code = (self._napp_path / filename).read_bytes()
+        result = self._cache.get(code)
+        if result is None:
+            result = self._parse_decorated_functions(code)
+            self._cache.set(code, result)
+
+        yield from result['endpoints']
+        folder = Path(filename).parent
+        for module in result['imports']:
+            submodule = self._module_file(module, folder)
+            if submodule is not None:
+                yield from self._parse_module(submodule, seen)
+
+    def _module_file(self, module, folder):
+        """Return the file of an imported module if it is part of the NApp.
+
+        Args:
+            module (list): Import level and module name parts, as returned by
+                :meth:`_parse_decorated_functions`.
+            folder (pathlib.Path): Folder of the importing module.
+
+        """
+        level, *parts = module
+        if level:
+            base = folder
+            for _ in range(level - 1):
+                base = base.parent
+        else:
+            prefix = ['napps', self._napp.username, self._napp.name]
+            if parts[:3] != prefix:
+                return None
+            base, parts = Path(), parts[3:]
+        if not parts:
+            # A package of the NApp, e.g. "from . import settings", whose
+            # imported names are parsed as modules of their own
+            return None
+        for candidate in (Path(base, *parts).with_suffix('.py'),
+                          Path(base, *parts, '__init__.py')):
+            if (self._napp_path / candidate).is_file():
+                return str(candidate)
+        return None
+
+    @classmethod
+    def _parse_decorated_functions(cls, code):
+        """Return URL rules, HTTP methods, docstrings and imports of a module.
+
+        Returns:
+            dict: ``endpoints`` with a (rule, methods, docstring) list for
+                each ``@rest`` decorator and ``imports`` with the imported
+                modules as [level, name parts...] lists.
+
+        """
+        tree = ast.parse(code)
+        endpoints, imports = [], []
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                docstring = ast.get_docstring(node, clean=False) or ''
+                for decorator in node.decorator_list:
+                    rest = cls._parse_decorator(decorator)
+                    if rest:
+                        endpoints.append((node.lineno, decorator.lineno) +
+                                         rest + (docstring,))
+            elif isinstance(node, ast.ImportFrom):
+                parts = node.module.split('.') if node.module else []
+                imports.append([node.level] + parts)
+                for alias in node.names:
+                    imports.append([node.level] + parts + [alias.name])
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.append([0] + alias.name.split('.'))
+
+        # ast.walk doesn't follow the source order
+        endpoints.sort()
+        return {'endpoints': [endpoint[2:] for endpoint in endpoints],
+                'imports': imports}
+
+    @staticmethod
+    def _parse_decorator(decorator):
+        """Return (rule, methods) of a ``@rest`` decorator or None."""
+        if not isinstance(decorator, ast.Call):
+            return None
+        func = decorator.func
+        name = func.attr if isinstance(func, ast.Attribute) else \
+            getattr(func, 'id', None)
+        if name != 'rest':
+            return None
+        keywords = {keyword.arg: keyword.value
+                    for keyword in decorator.keywords}
+        rule = decorator.args[0] if decorator.args else keywords.get('rule')
+        if rule is None:
+            return None
+        try:
+            rule = ast.literal_eval(rule)
+            methods = None
+            if 'methods' in keywords:
+                methods = list(ast.literal_eval(keywords['methods']))
+        except (TypeError, ValueError):
+            return None
+        return rule, methods
+
+    def _add_function_paths(self, rule, methods):
+        parsed_methods = self._parse_methods(methods)
+        absolute_rule = APIServer.get_absolute_rule(rule, self._napp)
+        path_url = self._rule2path(absolute_rule)
+        path_methods = self._paths.setdefault(path_url, {})
+        self._add_methods(parsed_methods, path_methods)
 
     def _parse_docstring(self, docstring):
         """Parse the method docstring."""
@@ -101,36 +246,12 @@ class OpenAPI:  # pylint: disable=too-few-public-methods
         self._summary = summary
         self._description = description
 
-    def _parse_decorators(self, decorators_str):
-        matches = re.finditer(r"""
-             @rest\(
-
-              ## Endpoint rule
-              (?P<quote>['"])  # inside single or double quotes
-                  (?P<rule>.+?)
-              (?P=quote)
-
-              ## HTTP methods (optional)
-              (\s*,\s*
-                  methods=(?P<methods>\[.+?\])
-              )?
-
-             .*?\)\s*$
-            """, decorators_str, re.VERBOSE)
-
-        for match in matches:
-            rule = match.group('rule')
-            methods = self._parse_methods(match.group('methods'))
-            yield rule, methods
-
     @classmethod
-    def _parse_methods(cls, list_string):
-        """Return HTTP method list. Use json for security reasons."""
-        if list_string is None:
+    def _parse_methods(cls, methods):
+        """Return HTTP method list, using the default if not informed."""
+        if methods is None:
             return APIServer.DEFAULT_METHODS
-        # json requires double quotes
-        json_list = list_string.replace("'", '"')
-        return json.loads(json_list)
+        return methods
 
     def _add_methods(self, methods, path_methods):
         for method in methods:
@@ -0,0 +1,302 @@
+"""Build, download and extract .napp packages."""
+import fnmatch
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+from contextlib import contextmanager
+
+from kytos.utils.manifest import (MANIFEST_FILE, build_manifest,
+                                  unchanged_files)
+from kytos.utils.profiling import span
+
+LOG = logging.getLogger(__name__)
+
+#: Files and folders never included in a .napp package, at any depth.
+PACKAGE_IGNORE = ['__pycache__', '*.pyc', '*.pyo', '*.swp', '*.napp', '.git',
+                  '.tox', '*.egg-info']
+#: Packages bigger than this (bytes) are spooled to a temporary file.
+PACKAGE_SPOOL_SIZE = 64 * 1024 * 1024
+
+
+class TeeReader:  # pylint: disable=too-few-public-methods
+    """Read a streamed response while copying its content to a file."""
+
+    def __init__(self, response, sink):
+        """Copy what is read from ``response`` to the file ``sink``."""
+        self._raw = response.raw
+        self._sink = sink
+
+    def read(self, size=-1):
+        """Read up to ``size`` bytes from the response."""
+        data = self._raw.read(None if size < 0 else size, decode_content=True)
+        self._sink.write(data)
+        return data
+
+    def drain(self):
+        """Read whatever is left in the response."""
+        while self.read(64 * 1024):
+            pass
+
+
+def build_package(napp_name, root='.', preset=6, workers=4):
+    """Build a reproducible .napp package of a NApp folder.
+
+    The package is built in memory (spilling to a temporary file only if it
+    is large). Entries are sorted and their timestamps, owners and
+    permissions are normalized, so the same sources always produce the same
+    bytes. ``SOURCE_DATE_EPOCH`` is used as the timestamp if set. The first
+    entry is a manifest with the SHA-256 and size of every file, used to
+    upgrade NApps in place.
+
+    Args:
+        napp_name (str): NApp name, used as the package file name.
+        root (str): NApp folder.
+        preset (int): xz compression preset.
+        workers (int): Number of threads hashing files.
+
+    Return:
+        file: The package, with its position at the beginning.
+
+    """
+    mtime = int(os.environ.get('SOURCE_DATE_EPOCH', 0))
+    files = [(path, arcname) for path, arcname in package_files(root)
+             if arcname != MANIFEST_FILE]
+    manifest = json.dumps(build_manifest(files, workers), indent=2,
+                          sort_keys=True).encode('utf-8')
+
+    package = tempfile.SpooledTemporaryFile(
+        max_size=PACKAGE_SPOOL_SIZE, suffix='-{}.napp'.format(napp_name))
+    with tarfile.open(fileobj=package, mode='w:xz', preset=preset,
+                      format=tarfile.PAX_FORMAT) as tar:
+        info = tarfile.TarInfo(MANIFEST_FILE)
+        info.size, info.mtime, info.mode = len(manifest), mtime, 0o644
+        tar.addfile(info, io.BytesIO(manifest))
+        for path, arcname in files:
+            info = tar.gettarinfo(path, arcname)
+            info.mtime = mtime
+            info.uid = info.gid = 0
+            info.uname = info.gname = ''
+            if info.isdir() or info.mode & 0o100:
+                info.mode = 0o755
+            else:
+                info.mode = 0o644
+            if info.isreg():
+                with open(path, 'rb') as content:
+                    tar.addfile(info, content)
+            else:
+                tar.addfile(info)
+    package.seek(0)
+    return package
+
+
+def package_files(root='.'):
+    """Yield (path, arcname) of files to package, in a stable order.
+
+    Files and folders matching :data:`PACKAGE_IGNORE` are skipped at any
+    depth, and ignored folders are not walked into.
+    """
+    for folder, dirs, files in os.walk(root):
+        relative = os.path.relpath(folder, root)
+        dirs[:] = sorted(d for d in dirs if not is_ignored(
+            os.path.normpath(os.path.join(relative, d))))
+        for name in sorted(dirs + files):
+            arcname = os.path.normpath(os.path.join(relative, name))
+            if name in dirs or not is_ignored(arcname):
+                yield os.path.join(folder, name), arcname
+
+
+def is_ignored(arcname):
+    """Whether a package path or its name matches :data:`PACKAGE_IGNORE`."""
+    name = os.path.basename(arcname)
+    return any(fnmatch.fnmatch(name, pattern) or
+               fnmatch.fnmatch(arcname, pattern)
+               for pattern in PACKAGE_IGNORE)
+
+
+@contextmanager
+def open_package(cache, key, uri, config, offline=False):
+    """Yield a readable stream of a package, going through the cache.
+
+    A cached package is revalidated with its ETag and only downloaded again
+    if it has changed. In offline mode, the server is not contacted. When
+    downloading, the response body is copied into the cache as it is read.
+
+    Args:
+        cache (PackageCache): Local cache of downloaded packages.
+        key (str): Cache key of the package.
+        uri (str): Package URL.
+        config (ConfigParser): Configuration of the HTTP session.
+        offline (bool): Use only the cache.
+
+    Raises:
+        requests.HTTPError: If download is not successful.
+        FileNotFoundError: If offline and the package is not cached.
+
+    """
+    cached = cache.get(key)
+    if offline and cached is None:
+        raise FileNotFoundError('{} is not cached.'.format(key))
+
+    response = None
+    if not offline:
+        with span('request', napp=key):
+            response = _request(uri, config, cached)
+    if response is None:
+        with cache.touch(key).open('rb') as package:
+            yield package
+        return
+
+    with cache.temp_file() as part:
+        try:
+            reader = TeeReader(response, part)
+            yield reader
+            reader.drain()
+        except BaseException:
+            part.close()
+            os.remove(part.name)
+            raise
+        finally:
+            response.close()
+    cache.store(key, part.name, response.headers.get('ETag'))
+
+
+def _request(uri, config, cached=None):
+    """Request a package, revalidating the ``cached`` entry if any.
+
+    Return:
+        requests.Response: Streamed response or None if ``cached`` is still
+            valid.
+
+    Raises:
+        requests.HTTPError: If download is not successful.
+
+    """
+    from kytos.utils.session import get_session
+
+    headers = {}
+    if cached and cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    response = get_session(config).get(uri, stream=True, headers=headers)
+    if response.status_code == 304 and cached:
+        response.close()
+        return None
+    response.raise_for_status()
+    return response
+
+
+def extract_package(package, folder, installed=None, workers=4):
+    """Extract a package stream into ``folder``.
+
+    Args:
+        package (file): Readable stream of a tar.xz package.
+        folder (pathlib.Path): Destination folder.
+        installed (pathlib.Path): Folder of the installed NApp version. If
+            the package starts with a manifest, ``folder`` becomes a
+            hard-linked copy of it and only the changed files are extracted.
+        workers (int): Number of threads hashing the installed files.
+
+    Raises:
+        tarfile.TarError: If the package is invalid.
+
+    """
+    with tarfile.open(fileobj=package, mode='r|xz') as tar:
+        if hasattr(tarfile, 'data_filter'):
+            tar.extraction_filter = tarfile.data_filter
+        members = iter(tar)
+        first = next(members, None)
+        if first is not None and first.name == MANIFEST_FILE and \
+                installed is not None and installed.is_dir():
+            manifest = json.load(tar.extractfile(first))
+            link_copy(installed, folder)
+            unchanged = unchanged_files(folder, manifest, workers)
+            _upgrade(tar, members, manifest, folder, unchanged)
+            return
+        if first is not None and first.name != MANIFEST_FILE:
+            tar.extract(first, str(folder))
+        for member in members:
+            tar.extract(member, str(folder))
+
+
+def link_copy(src, dst):
+    """Copy a folder hard-linking its files, or copying if unsupported.
+
+    Files are later replaced, never written in place, so the copy and ``src``
+    can safely share them.
+    """
+    def link(source, target):
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    shutil.copytree(str(src), str(dst), symlinks=True, copy_function=link)
+
+
+def _upgrade(tar, members, manifest, folder, unchanged):
+    """Write only the package files that differ from ``folder``.
+
+    Args:
+        tar (tarfile.TarFile): Package opened in stream mode.
+        members (iterator): Package members after the manifest.
+        manifest (dict): Package manifest.
+        folder (pathlib.Path): Copy of the installed NApp folder.
+        unchanged (set): Files of ``folder`` matching the manifest.
+
+    Raises:
+        tarfile.TarError: If a file doesn't match the manifest or would be
+            written outside ``folder``.
+
+    """
+    root = folder.resolve()
+    written = 0
+    for member in members:
+        if hasattr(tarfile, 'data_filter'):
+            member = tarfile.data_filter(member, str(root))
+        dst = root / member.name
+        if root not in dst.resolve().parents:
+            raise tarfile.TarError('{} is outside the NApp folder.'
+                                   .format(member.name))
+        if member.isdir():
+            dst.mkdir(parents=True, exist_ok=True)
+        elif member.name not in unchanged:
+            _replace_file(tar, member, root,
+                          manifest['files'].get(member.name))
+            written += 1
+
+    files = set(manifest['files'])
+    for path, arcname in package_files(str(folder)):
+        if arcname not in files and not os.path.isdir(path):
+            os.remove(path)
+    LOG.info('    %d of %d files changed.', written, len(files))
+
+
+def _replace_file(tar, member, root, entry):
+    """Atomically replace a file of ``root`` with a package member."""
+    dst = root / member.name
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if not member.isreg():
+        if os.path.lexists(str(dst)):
+            os.remove(str(dst))
+        tar.extract(member, str(root))
+        return
+    sha256 = hashlib.sha256()
+    content = tar.extractfile(member)
+    with tempfile.NamedTemporaryFile(dir=str(dst.parent), delete=False,
+                                     prefix='.', suffix='.part') as tmp:
+        for chunk in iter(lambda: content.read(64 * 1024), b''):
+            sha256.update(chunk)
+            tmp.write(chunk)
+    try:
+        if entry is None or sha256.hexdigest() != entry['sha256']:
+            raise tarfile.TarError('{} does not match the package manifest.'
+                                   .format(member.name))
+        os.chmod(tmp.name, member.mode)
+        os.replace(tmp.name, str(dst))
+    except BaseException:
+        os.remove(tmp.name)
+        raise
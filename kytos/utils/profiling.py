@@ -0,0 +1,171 @@
+"""Lightweight timing of the phases of kytos commands.
+
+Code marks its phases with :func:`span`, which does nothing unless profiling
+was enabled with :func:`enable` (``kytos --profile``). The recorded spans can
+be summarized per phase with :meth:`Profiler.report` or saved in the Chrome
+trace event format with :meth:`Profiler.write_trace`, to be opened in
+``chrome://tracing`` or https://ui.perfetto.dev.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+_PROFILER = None
+
+
+class Profiler:
+    """Collect the spans of all threads of this process."""
+
+    def __init__(self):
+        """Start counting time from now."""
+        self.origin = time.perf_counter()
+        self.events = []
+        self._lock = threading.Lock()
+
+    def add(self, name, start, duration, args=None):
+        """Record a span.
+
+        Args:
+            name (str): Phase name, e.g. ``'extract'``.
+            start (float): ``time.perf_counter()`` when the span started.
+            duration (float): Duration in seconds.
+            args (dict): Details shown in the trace, e.g. the NApp.
+
+        """
+        event = {'name': name, 'start': start - self.origin,
+                 'duration': duration, 'tid': threading.get_ident(),
+                 'args': args or {}}
+        with self._lock:
+            self.events.append(event)
+
+    def elapsed(self):
+        """Seconds since the profiler was created."""
+        return time.perf_counter() - self.origin
+
+    def phases(self):
+        """Return the spans aggregated by name, in order of first start.
+
+        Returns:
+            list: (name, count, total, maximum) tuples, times in seconds.
+
+        """
+        phases = {}
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event['start'])
+        for event in events:
+            count, total, maximum = phases.get(event['name'], (0, 0.0, 0.0))
+            phases[event['name']] = (count + 1, total + event['duration'],
+                                     max(maximum, event['duration']))
+        return [(name,) + values for name, values in phases.items()]
+
+    def report(self):
+        """Return the per-phase breakdown as text.
+
+        Phases run concurrently (e.g. downloads of independent NApps) or
+        nested in others (e.g. the download inside ``install``), so their
+        totals may add up to more than the wall time.
+        """
+        row = '{:<24} {:>6} {:>10} {:>10}'
+        lines = [row.format('Phase', 'Count', 'Total ms', 'Max ms')]
+        for name, count, total, maximum in self.phases():
+            lines.append(row.format(name, count, '{:.1f}'.format(total * 1000),
+                                    '{:.1f}'.format(maximum * 1000)))
+        lines.append(row.format('wall', '',
+                                '{:.1f}'.format(self.elapsed() * 1000),
+                                '').rstrip())
+        return '\n'.join(lines)
+
+    def write_trace(self, filename):
+        """Save the spans in the Chrome trace event format."""
+        pid = os.getpid()
+        with self._lock:
+            events = [{'name': event['name'], 'cat': 'kytos', 'ph': 'X',
+                       'ts': round(event['start'] * 1e6, 1),
+                       'dur': round(event['duration'] * 1e6, 1),
+                       'pid': pid, 'tid': event['tid'],
+                       'args': event['args']} for event in self.events]
+        with open(filename, 'w') as trace:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'},
+                      trace)
+
+
+def enable():
+    """Start recording spans in this process and return the profiler."""
+    global _PROFILER  # pylint: disable=global-statement
+    if _PROFILER is None:
+        _PROFILER = Profiler()
+    return _PROFILER
+
+
+def get_profiler():
+    """Return the profiler or None if profiling is not enabled."""
+    return _PROFILER
+
+
+@contextmanager
+def span(name, **args):
+    """Time the enclosed block as phase ``name`` if profiling is enabled.
+
+    Args:
+        name (str): Phase name.
+        args: Details shown in the trace, e.g. ``napp='kytos/of_core'``.
+
+    """
+    profiler = _PROFILER
+    if profiler is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add(name, start, time.perf_counter() - start, args)
+
+
+def timed(name):
+    """Decorate a function to time its calls as phase ``name``."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TimedReader:  # pylint: disable=too-few-public-methods
+    """Readable stream that times its reads as a single phase.
+
+    Streamed packages are downloaded while they are decompressed, so timing
+    every read separately would flood the trace. Instead, the time spent in
+    reads is added up and recorded as one span, starting at the first read,
+    when :meth:`close` is called.
+    """
+
+    def __init__(self, stream, name, **args):
+        """Wrap ``stream``, recording its reads as phase ``name``."""
+        self._stream = stream
+        self._name = name
+        self._args = args
+        self._start = None
+        self._duration = 0.0
+
+    def read(self, size=-1):
+        """Read up to ``size`` bytes from the stream."""
+        start = time.perf_counter()
+        try:
+            return self._stream.read(size)
+        finally:
+            if self._start is None:
+                self._start = start
+            self._duration += time.perf_counter() - start
+
+    def close(self):
+        """Record the span. The wrapped stream is not closed."""
+        profiler = _PROFILER
+        if profiler is not None and self._start is not None:
+            profiler.add(self._name, self._start, self._duration, self._args)
+        self._start = None
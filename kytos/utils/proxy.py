@@ -0,0 +1,260 @@
+"""Pull-through caching proxy of the NApps Server."""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+
+import requests
+
+LOG = logging.getLogger(__name__)
+
+#: Upstream response headers kept in the cache and sent to clients.
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CacheProxy:
+    """Disk cache in front of the NApps Server API and repository.
+
+    Requests to ``/api/<path>`` and ``/repo/<path>`` are answered from the
+    cache or fetched from the upstream ``[napps] api`` and ``repo``:
+
+    - versioned packages (``<napp>-<version>.napp``) never change, so they are
+      fetched once;
+    - everything else (catalog, metadata and ``-latest`` packages) is served
+      from the cache for ``ttl`` seconds and then revalidated with its ETag;
+    - concurrent requests for the same URL wait for a single upstream fetch;
+    - if upstream can't be reached or fails (5xx), the cached copy is served,
+      however old it is.
+    """
+
+    def __init__(self, api, repo, path, session, ttl=60):
+        """Create a proxy.
+
+        Args:
+            api (str): URI of the upstream NApps Server API.
+            repo (str): URI of the upstream NApps repository.
+            path (str): Cache directory.
+            session (requests.Session): Session used to reach upstream.
+            ttl (int): Seconds before revalidating mutable content.
+
+        """
+        self.upstreams = {'api': api, 'repo': repo}
+        self.path = Path(path).expanduser()
+        self.ttl = ttl
+        self._session = session
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create a proxy using the ``[napps]`` section of the config."""
+        from kytos.utils.session import get_session
+
+        return cls(config.get('napps', 'api'), config.get('napps', 'repo'),
+                   config.get('napps', 'proxy_dir',
+                              fallback='~/.kytos/cache/proxy'),
+                   get_session(config),
+                   config.getint('napps', 'proxy_ttl', fallback=60))
+
+    def upstream_url(self, path):
+        """Return the upstream URL of a request path or None."""
+        prefix, _, rest = path.lstrip('/').partition('/')
+        upstream = self.upstreams.get(prefix)
+        if upstream is None:
+            return None
+        return upstream.rstrip('/') + '/' + rest
+
+    def get(self, url):
+        """Return a cached or fetched response to a GET of ``url``.
+
+        Returns:
+            tuple: (entry, body, cache) where ``entry`` has the ``status`` and
+                ``headers`` of the response, ``body`` is the path of its
+                content (None if not cached) and ``cache`` is one of ``HIT``,
+                ``MISS``, ``REVALIDATED`` or ``STALE``.
+
+        Raises:
+            requests.exceptions.RequestException: If upstream can't be
+                reached and the URL is not cached.
+
+        """
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        body = self.path / key
+        with self._lock(key):
+            entry = self._read(key)
+            if entry and self._is_fresh(url, entry):
+                return entry, body, 'HIT'
+            try:
+                entry, cache = self._fetch(url, key, entry)
+            except requests.exceptions.RequestException as exception:
+                if entry is None:
+                    raise
+                LOG.warning('Serving stale %s: %s', url, exception)
+                return entry, body, 'STALE'
+        return entry, body if entry['status'] == 200 else None, cache
+
+    def _lock(self, key):
+        """Return the lock that serializes fetches of a URL."""
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _is_fresh(self, url, entry):
+        """Whether an entry can be served without asking upstream."""
+        if url.endswith('.napp') and not url.endswith('-latest.napp'):
+            return True
+        return time.time() - entry['fetched_at'] < self.ttl
+
+    def _fetch(self, url, key, entry):
+        """Fetch ``url`` from upstream, revalidating ``entry`` if cached."""
+        headers = {}
+        if entry and entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        response = self._session.get(url, headers=headers, stream=True)
+        with response:
+            if response.status_code == 304 and entry:
+                entry['fetched_at'] = time.time()
+                self._write(key, entry)
+                return entry, 'REVALIDATED'
+            if response.status_code >= 500 and entry:
+                LOG.warning('Serving stale %s: upstream status %d', url,
+                            response.status_code)
+                return entry, 'STALE'
+            if response.status_code != 200:
+                return {'status': response.status_code, 'headers': {}}, 'MISS'
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=str(self.path),
+                                             suffix='.part',
+                                             delete=False) as tmp:
+                try:
+                    for chunk in response.iter_content(64 * 1024):
+                        tmp.write(chunk)
+                except BaseException:
+                    tmp.close()
+                    os.remove(tmp.name)
+                    raise
+            # Clients still reading the previous body keep their open file
+            os.replace(tmp.name, str(self.path / key))
+
+        entry = {'url': url, 'status': 200, 'fetched_at': time.time(),
+                 'headers': {name: response.headers[name]
+                             for name in CACHED_HEADERS
+                             if name in response.headers}}
+        self._write(key, entry)
+        return entry, 'MISS'
+
+    def _read(self, key):
+        try:
+            with (self.path / (key + '.json')).open() as meta:
+                entry = json.load(meta)
+            if (self.path / key).exists():
+                return entry
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _write(self, key, entry):
+        """Save the metadata of a cached response atomically."""
+        with tempfile.NamedTemporaryFile('w', dir=str(self.path),
+                                         delete=False) as tmp:
+            json.dump(entry, tmp)
+        os.replace(tmp.name, str(self.path / (key + '.json')))
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    """Answer GET and HEAD requests using the server's CacheProxy."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'KytosNAppsCache'
+    # Headers and body are written separately: without TCP_NODELAY, delayed
+    # ACKs would add ~40 ms to every keep-alive request
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Send a cached or fetched response."""
+        self._serve(with_body=True)
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        """Send the headers of a cached or fetched response."""
+        self._serve(with_body=False)
+
+    def _serve(self, with_body):
+        url = self.server.proxy.upstream_url(self.path)
+        if url is None:
+            self._send_empty(404)
+            return
+        try:
+            entry, body, cache = self.server.proxy.get(url)
+        except requests.exceptions.RequestException as exception:
+            LOG.error('Could not fetch %s: %s', url, exception)
+            self._send_empty(502)
+            return
+        if body is None:
+            self._send_empty(entry['status'])
+            return
+
+        etag = entry['headers'].get('ETag')
+        if etag and self.headers.get('If-None-Match') == etag:
+            self._send_empty(304, {'ETag': etag, 'X-Cache': cache})
+            return
+        with body.open('rb') as content:
+            size = os.fstat(content.fileno()).st_size
+            self.send_response(200)
+            for name, value in entry['headers'].items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(size))
+            self.send_header('X-Cache', cache)
+            self.end_headers()
+            if with_body:
+                shutil.copyfileobj(content, self.wfile, 64 * 1024)
+
+    def _send_empty(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        LOG.info('%s - %s', self.address_string(), format % args)
+
+
+class ProxyServer(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server of a :class:`CacheProxy`."""
+
+    daemon_threads = True
+
+    def __init__(self, address, proxy):
+        """Listen on ``address`` (host, port) and serve ``proxy``."""
+        super().__init__(address, _ProxyHandler)
+        self.proxy = proxy
+
+
+def serve(config, host, port):
+    """Serve a :class:`CacheProxy` of the config until interrupted.
+
+    Args:
+        config (ConfigParser): Kytos config, see
+            :meth:`CacheProxy.from_config`.
+        host (str): Address to listen on.
+        port (int): Port to listen on.
+
+    """
+    proxy = CacheProxy.from_config(config)
+    server = ProxyServer((host, port), proxy)
+    LOG.info('Caching %s and %s in %s.', proxy.upstreams['api'],
+             proxy.upstreams['repo'], proxy.path)
+    LOG.info('Listening on http://%s:%d/ (api/ and repo).', host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,206 @@
+"""Resolve the dependency graph of NApps before installing them."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from kytos.utils.exceptions import KytosException
+
+LOG = logging.getLogger(__name__)
+
+
+class DependencyResolver:
+    """Build and sort the dependency DAG of a set of NApps.
+
+    The metadata of every NApp in the graph is fetched up front, one
+    breadth-first frontier at a time and concurrently, so the whole graph is
+    known before anything is downloaded.
+    """
+
+    def __init__(self, get_metadata, exclude=None, max_workers=4):
+        """Create a resolver.
+
+        Args:
+            get_metadata (callable): Called as ``get_metadata(user, napp)``,
+                returns the NApp metadata (kytos.json content) or None if the
+                NApp doesn't exist.
+            exclude (set): (user, napp) tuples that must be left out of the
+                graph, e.g. the ones already installed.
+            max_workers (int): Maximum number of concurrent metadata requests.
+
+        """
+        self._get_metadata = get_metadata
+        self._exclude = set(exclude or ())
+        self._max_workers = max_workers
+
+        #: (user, napp) -> set of (user, napp) dependencies
+        self.graph = {}
+        #: (user, napp) -> requested version (None for the latest)
+        self.versions = {}
+        #: (user, napp) -> metadata
+        self.metadata = {}
+        #: (user, napp) of NApps whose metadata could not be found
+        self.missing = set()
+
+    def resolve(self, napps):
+        """Build the graph and return the NApps in topological levels.
+
+        NApps inside the same level don't depend on each other, so they can
+        be installed concurrently. Every level only depends on the previous
+        ones.
+
+        Args:
+            napps (list): (user, napp, version) tuples requested by the user.
+
+        Returns:
+            list: List of levels, each one a sorted list of
+                (user, napp, version) tuples.
+
+        Raises:
+            KytosException: If a NApp is requested with different versions or
+                if there is a dependency cycle.
+
+        """
+        frontier = []
+        for user, napp, version in napps:
+            key = (user, napp)
+            if key in self._exclude:
+                continue
+            self._add_version(key, version)
+            if key not in frontier:
+                frontier.append(key)
+        # Every NApp whose metadata was or will be fetched
+        queued = set(frontier)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as pool:
+            while frontier:
+                metas = pool.map(lambda key: self._get_metadata(*key),
+                                 frontier)
+                next_frontier = []
+                for key, meta in zip(frontier, metas):
+                    deps = self._add_node(key, meta)
+                    for dep in deps:
+                        if dep not in queued:
+                            queued.add(dep)
+                            self._add_version(dep, None)
+                            next_frontier.append(dep)
+                frontier = next_frontier
+
+        return self._levels()
+
+    def _add_version(self, key, version):
+        """Register the version of a NApp, checking for conflicts."""
+        current = self.versions.get(key)
+        if current and version and current != version:
+            msg = 'NApp {}/{} requested with versions {} and {}.'
+            raise KytosException(msg.format(*key, current, version))
+        self.versions[key] = current or version
+
+    def _add_node(self, key, meta):
+        """Add a NApp to the graph and return its unresolved dependencies."""
+        if meta is None:
+            LOG.error('  NApp %s/%s not found.', *key)
+            self.missing.add(key)
+            self.graph[key] = set()
+            return []
+
+        deps = set()
+        for dep_id in meta.get('napp_dependencies', []):
+            dep = tuple(dep_id.split('/'))
+            if dep == key:
+                raise KytosException('NApp {}/{} depends on itself.'.format(
+                    *key))
+            if dep not in self._exclude:
+                deps.add(dep)
+        self.metadata[key] = meta
+        self.graph[key] = deps
+        return sorted(deps)
+
+    def _levels(self):
+        """Sort the graph in levels using Kahn's algorithm."""
+        pending = {key: set(deps) for key, deps in self.graph.items()
+                   if key not in self.missing}
+        for deps in pending.values():
+            deps -= self.missing
+
+        levels = []
+        while pending:
+            ready = sorted(key for key, deps in pending.items() if not deps)
+            if not ready:
+                raise KytosException('Dependency cycle found: {}'.format(
+                    self._find_cycle(pending)))
+            for key in ready:
+                del pending[key]
+            for deps in pending.values():
+                deps.difference_update(ready)
+            levels.append([key + (self.versions.get(key),) for key in ready])
+        return levels
+
+    @staticmethod
+    def _find_cycle(pending):
+        """Return a human-readable cycle among the pending NApps."""
+        path = []
+        node = min(pending)
+        while node not in path:
+            path.append(node)
+            node = min(pending[node])
+        cycle = path[path.index(node):] + [node]
+        return ' -> '.join('{}/{}'.format(*key) for key in cycle)
+
+
+def installable(level, graph, failed):
+    """Return the NApps of a level whose dependencies didn't fail.
+
+    NApps depending on a failed NApp are logged and added to ``failed``, so
+    their own dependents are skipped in the next levels.
+
+    Args:
+        level (list): Tuples starting with (user, napp).
+        graph (dict): Dependencies of each (user, napp).
+        failed (set): (user, napp) of NApps that could not be installed.
+
+    Returns:
+        list: The tuples of ``level`` that can be installed.
+
+    """
+    ready = []
+    for napp in level:
+        broken = graph.get(napp[:2], set()) & failed
+        if broken:
+            LOG.error('    %s/%s: Skipped, depends on %s.', *napp[:2],
+                      ', '.join('{}/{}'.format(*dep)
+                                for dep in sorted(broken)))
+            failed.add(napp[:2])
+        else:
+            ready.append(napp)
+    return ready
+
+
+def dependency_order(napps, dependencies):
+    """Sort NApps so that dependencies come before their dependents.
+
+    Only dependencies among ``napps`` are considered. Their order is kept
+    otherwise, and also among the NApps of a dependency cycle.
+
+    Args:
+        napps (list): (user, napp) tuples.
+        dependencies (callable): Called as ``dependencies(user, napp)``,
+            returns the (user, napp) tuples the NApp depends on.
+
+    Returns:
+        list: (user, napp) tuples without duplicates.
+
+    """
+    napps = list(dict.fromkeys(tuple(napp) for napp in napps))
+    pending = {napp: set(dependencies(*napp)) & set(napps) for napp in napps}
+    ordered = []
+    while pending:
+        ready = [napp for napp in napps
+                 if napp in pending and not pending[napp]]
+        if not ready:
+            # Dependency cycle: keep the given order
+            ready = [napp for napp in napps if napp in pending]
+        for napp in ready:
+            del pending[napp]
+        for deps in pending.values():
+            deps.difference_update(ready)
+        ordered.extend(ready)
+    return ordered
@@ -0,0 +1,175 @@
+"""Shared HTTP session used by every kytos-utils client.
+
+All the communication with the NApps server and with the Kytos controller goes
+through a single pooled ``requests.Session`` per process, so consecutive calls
+reuse the same keep-alive connections instead of paying a new TCP/TLS
+handshake each time. ``file://`` URLs are served from the local filesystem,
+so the NApps API and repository can point to a local mirror.
+"""
+import io
+import logging
+import mimetypes
+import threading
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.response import HTTPResponse
+from urllib3.util.retry import Retry
+
+from kytos.utils.config import get_config
+
+LOG = logging.getLogger(__name__)
+
+#: Status codes that are retried with backoff for idempotent methods.
+RETRY_STATUS = (502, 503, 504)
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+class KytosSession(requests.Session):
+    """A ``requests.Session`` that applies a default timeout to requests."""
+
+    def __init__(self, timeout=None):
+        """Set the default timeout (seconds) used when none is given."""
+        super().__init__()
+        self.timeout = timeout
+
+    # pylint: disable=arguments-differ
+    def request(self, method, url, **kwargs):
+        """Send a request using the default timeout if none is informed."""
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class FileAdapter(BaseAdapter):
+    """Answer ``GET`` and ``HEAD`` requests of ``file://`` URLs.
+
+    The URL of a folder returns its ``index.json``, which is how a mirror
+    made by ``kytos napps mirror`` stores API listings. Responses carry an
+    ETag built from the file modification time and size, so conditional
+    requests get ``304 Not Modified`` as they would from the NApps server.
+    """
+
+    # pylint: disable=too-many-arguments
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        """Return a response with the content of the requested file."""
+        path = Path(url2pathname(urlparse(request.url).path))
+        if request.url.endswith('/') or path.is_dir():
+            path = path / 'index.json'
+
+        headers = {}
+        body = None
+        if request.method not in ('GET', 'HEAD'):
+            status = HTTPStatus.METHOD_NOT_ALLOWED
+        else:
+            try:
+                stat = path.stat()
+            except (FileNotFoundError, NotADirectoryError):
+                status = HTTPStatus.NOT_FOUND
+            else:
+                status = HTTPStatus.OK
+                etag = '"{:x}-{:x}"'.format(stat.st_mtime_ns, stat.st_size)
+                content_type = mimetypes.guess_type(path.name)[0]
+                headers = {'Content-Length': str(stat.st_size), 'ETag': etag,
+                           'Content-Type': content_type or
+                           'application/octet-stream'}
+                if request.headers.get('If-None-Match') == etag:
+                    status = HTTPStatus.NOT_MODIFIED
+                elif request.method == 'GET':
+                    body = path.open('rb')
+
+        response = requests.Response()
+        response.raw = HTTPResponse(body=body or io.BytesIO(),
+                                    headers=headers, status=status,
+                                    reason=status.phrase,
+                                    preload_content=False,
+                                    decode_content=False,
+                                    # No body is expected for HEAD and 304
+                                    request_method=request.method)
+        response.status_code = status.value
+        response.reason = status.phrase
+        response.headers = CaseInsensitiveDict(headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        """Nothing to release."""
+
+
+def create_session(config=None):
+    """Create a new pooled session using the ``[http]`` config section.
+
+    Args:
+        config (ConfigParser): Kytos config. If None, use ``get_config()``.
+
+    Requests to the NApps server are retried with backoff, requests to the
+    Kytos controller (``[kytos] api``) are not.
+
+    Returns:
+        KytosSession: Session with connection pool, retries and timeout.
+
+    """
+    if config is None:
+        config = get_config().config
+
+    pool_size = config.getint('http', 'pool_size', fallback=10)
+    retries = config.getint('http', 'retries', fallback=3)
+    backoff = config.getfloat('http', 'backoff', fallback=0.3)
+    timeout = config.getfloat('http', 'timeout', fallback=30)
+
+    retry = Retry(total=retries, connect=retries, read=retries,
+                  backoff_factor=backoff, status_forcelist=RETRY_STATUS,
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retry)
+
+    session = KytosSession(timeout=timeout)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # kytosd is local: if it refuses a connection, it is not running and
+    # retrying only delays "Kytos is not running."
+    kytos_api = config.get('kytos', 'api', fallback=None)
+    if kytos_api:
+        session.mount(kytos_api, HTTPAdapter(pool_connections=pool_size,
+                                             pool_maxsize=pool_size,
+                                             max_retries=0))
+    session.mount('file://', FileAdapter())
+    session.headers['Connection'] = 'keep-alive'
+    LOG.debug('HTTP session: pool=%d retries=%d backoff=%s timeout=%s',
+              pool_size, retries, backoff, timeout)
+    return session
+
+
+def get_session(config=None):
+    """Return the process-wide session, creating it on the first call.
+
+    Args:
+        config (ConfigParser): Kytos config used only when the session is
+            created. If None, use ``get_config()``.
+
+    Returns:
+        KytosSession: The shared session.
+
+    """
+    global _SESSION  # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = create_session(config)
+    return _SESSION
+
+
+def close_session():
+    """Close the shared session and its pooled connections, if any."""
+    global _SESSION  # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+            _SESSION = None
@@ -0,0 +1,272 @@
+"""Streaming and resumable upload of NApp packages."""
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from urllib.parse import urljoin
+
+LOG = logging.getLogger(__name__)
+
+#: Bytes sent per request in resumable uploads.
+CHUNK_SIZE = 1024 * 1024
+#: Protocol version of resumable uploads (https://tus.io).
+TUS_VERSION = '1.0.0'
+
+
+def file_size(fileobj):
+    """Return the size of a seekable file, keeping its position."""
+    position = fileobj.tell()
+    size = fileobj.seek(0, io.SEEK_END)
+    fileobj.seek(position)
+    return size
+
+
+class MultipartStream:
+    """File-like ``multipart/form-data`` body read on demand.
+
+    Only the form fields are kept in memory; the package is read in chunks
+    while the request is sent, so memory usage doesn't depend on its size.
+    """
+
+    def __init__(self, fields, filename, fileobj, progress=None):
+        """Create the body of a form with ``fields`` and a ``file`` field.
+
+        Args:
+            fields (dict): Form fields. Lists are sent as repeated fields and
+                None values are skipped, as in ``requests``.
+            filename (str): Name of the uploaded file.
+            fileobj (file): Seekable binary file, read from its beginning.
+            progress (callable): Called as ``progress(sent, total)`` with
+                the number of package bytes read so far.
+
+        """
+        boundary = uuid.uuid4().hex
+        self.content_type = 'multipart/form-data; boundary=' + boundary
+
+        head = io.BytesIO()
+        for name, values in fields.items():
+            if isinstance(values, (str, bytes)) or \
+                    not hasattr(values, '__iter__'):
+                values = [values]
+            for value in values:
+                if value is None:
+                    continue
+                if not isinstance(value, bytes):
+                    value = str(value).encode('utf-8')
+                head.write('--{}\r\nContent-Disposition: form-data; '
+                           'name="{}"\r\n\r\n'.format(boundary, name)
+                           .encode('utf-8'))
+                head.write(value + b'\r\n')
+        head.write('--{}\r\nContent-Disposition: form-data; name="file"; '
+                   'filename="{}"\r\nContent-Type: application/octet-stream'
+                   '\r\n\r\n'.format(boundary, filename).encode('utf-8'))
+        tail = '\r\n--{}--\r\n'.format(boundary).encode('utf-8')
+
+        fileobj.seek(0)
+        self._file = fileobj
+        self._file_size = file_size(fileobj)
+        self._sent = 0
+        self._progress = progress
+        self._parts = [io.BytesIO(head.getvalue()), fileobj, io.BytesIO(tail)]
+        self._length = len(head.getvalue()) + self._file_size + len(tail)
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        """Read up to ``size`` bytes of the body."""
+        if size is None or size < 0:
+            size = self._length
+        data = b''
+        while self._parts and len(data) < size:
+            part = self._parts[0]
+            chunk = part.read(size - len(data))
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            if part is self._file:
+                self._sent += len(chunk)
+                if self._progress:
+                    self._progress(self._sent, self._file_size)
+            data += chunk
+        return data
+
+
+class UploadState:
+    """Upload URLs of unfinished resumable uploads, by package hash."""
+
+    def __init__(self, path='~/.kytos/cache/uploads.json'):
+        """Use the state saved in ``path``."""
+        self._path = Path(path).expanduser()
+
+    def get(self, sha256):
+        """Return the upload URL of a package or None."""
+        return self._load().get(sha256)
+
+    def set(self, sha256, url):
+        """Save (or remove, if ``url`` is None) the upload URL of a package."""
+        state = self._load()
+        if url is None:
+            state.pop(sha256, None)
+        else:
+            state[sha256] = url
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=str(self._path.parent),
+                                             delete=False) as tmp:
+                json.dump(state, tmp)
+            os.replace(tmp.name, str(self._path))
+        except OSError as exception:
+            LOG.debug('Could not save upload state: %s', exception)
+
+    def _load(self):
+        try:
+            with self._path.open() as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError):
+            return {}
+
+
+class ResumableUpload:
+    """Upload a package in chunks, resuming from the offset the server has.
+
+    The server side follows the core of the tus protocol: ``POST`` to
+    ``<api>/napps/uploads/`` with the metadata creates an upload and returns
+    its URL in ``Location``, ``HEAD`` on that URL returns the current
+    ``Upload-Offset`` and each ``PATCH`` appends a chunk at that offset.
+    """
+
+    def __init__(self, session, endpoint, retries=3, chunk_size=CHUNK_SIZE,
+                 state=None):
+        """Create an uploader.
+
+        Args:
+            session (requests.Session): Session used for every request.
+            endpoint (str): URL where uploads are created.
+            retries (int): Consecutive failures tolerated before giving up.
+            chunk_size (int): Bytes sent per request.
+            state (UploadState): Where unfinished uploads are remembered, so
+                a new run resumes them.
+
+        """
+        self._session = session
+        self._endpoint = endpoint
+        self._retries = retries
+        self._chunk_size = chunk_size
+        self._state = state or UploadState()
+
+    def upload(self, metadata, fileobj, progress=None):
+        """Upload ``fileobj`` and return the last response.
+
+        Returns:
+            requests.Response: Response of the last request, or None if the
+                server doesn't support resumable uploads. If the server
+                rejects the offset of more than ``retries`` chunks in a row,
+                it is the last rejection (409).
+
+        Raises:
+            requests.exceptions.RequestException: If the server can't be
+                reached more than ``retries`` times in a row.
+
+        """
+        import requests
+
+        size = file_size(fileobj)
+        sha256 = self._hash(fileobj)
+        url, offset = self._state.get(sha256), None
+        if url:
+            offset = self._offset(url)
+        if offset is None:
+            response = self._create(metadata, size, sha256)
+            if response is None or response.status_code != 201:
+                return response
+            url = urljoin(self._endpoint, response.headers['Location'])
+            self._state.set(sha256, url)
+            offset = 0
+        elif offset:
+            LOG.info('Resuming upload at %d of %d bytes.', offset, size)
+
+        failures = 0
+        while True:
+            fileobj.seek(offset)
+            chunk = fileobj.read(self._chunk_size)
+            headers = {'Tus-Resumable': TUS_VERSION,
+                       'Upload-Offset': str(offset),
+                       'Content-Type': 'application/offset+octet-stream'}
+            try:
+                response = self._session.patch(url, data=chunk,
+                                               headers=headers)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                failures += 1
+                if failures > self._retries:
+                    raise
+                offset = self._server_offset(url, offset)
+                continue
+
+            if response.status_code == 409:  # Offset mismatch
+                failures += 1
+                if failures > self._retries:
+                    return response
+                offset = self._server_offset(url, offset)
+                continue
+            if response.status_code not in (200, 204):
+                return response
+            failures = 0
+            offset = int(response.headers.get('Upload-Offset') or
+                         offset + len(chunk))
+            if progress:
+                progress(offset, size)
+            if offset >= size:
+                self._state.set(sha256, None)
+                return response
+
+    def _create(self, metadata, size, sha256):
+        """Create an upload or return None if it is not supported.
+
+        Servers without resumable uploads may answer the unknown endpoint
+        with any error or a redirect. Only authentication errors are
+        returned, since the fallback upload would fail the same way.
+        """
+        headers = {'Tus-Resumable': TUS_VERSION, 'Upload-Length': str(size)}
+        body = dict(metadata, size=size, sha256=sha256)
+        response = self._session.post(self._endpoint, json=body,
+                                      headers=headers, allow_redirects=False)
+        if not 200 <= response.status_code < 300 and \
+                response.status_code not in (401, 403):
+            response.close()
+            return None
+        return response
+
+    def _offset(self, url):
+        """Return how many bytes the server has or None if unknown."""
+        import requests
+
+        try:
+            headers = {'Tus-Resumable': TUS_VERSION}
+            response = self._session.head(url, headers=headers)
+        except requests.exceptions.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        return int(response.headers.get('Upload-Offset', 0))
+
+    def _server_offset(self, url, offset):
+        """Return how many bytes the server has or ``offset`` if unknown."""
+        server_offset = self._offset(url)
+        return offset if server_offset is None else server_offset
+
+    @staticmethod
+    def _hash(fileobj):
+        """Return the SHA-256 of a file, keeping its position."""
+        position = fileobj.tell()
+        fileobj.seek(0)
+        sha256 = hashlib.sha256()
+        for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+        fileobj.seek(position)
+        return sha256.hexdigest()
@@ -0,0 +1,265 @@
+"""Side-by-side versions of installed NApps."""
+import filecmp
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+#: Folder of the installed NApps where versions are stored.
+VERSIONS_DIR = '.versions'
+
+
+def version_key(version):
+    """Return a sort key of a NApp version.
+
+    Numeric parts are compared as numbers and a release sorts after its
+    pre-releases, e.g. "1.10" > "1.9" > "1.9rc1" > "1.9.dev0" > "1.8".
+    """
+    key = [(1, int(part)) if part.isdigit() else (0, part.lower())
+           for part in re.findall(r'\d+|[a-zA-Z]+', version or '')]
+    # Sorts after any word part ("rc", "dev"...) and before any number
+    return key + [(0, '~')]
+
+
+def napp_version(folder):
+    """Return the version in the kytos.json of a NApp folder or "latest"."""
+    try:
+        with (Path(folder) / 'kytos.json').open() as kytos_json:
+            return json.load(kytos_json).get('version') or 'latest'
+    except (OSError, ValueError):
+        return 'latest'
+
+
+def same_content(first, second):
+    """Return whether two NApp folders have the same files and content.
+
+    Compiled modules (``__pycache__``) are ignored. Hard-linked files are
+    not read.
+    """
+    files = _relative_files(first)
+    if files != _relative_files(second):
+        return False
+    for name in files:
+        path1, path2 = os.path.join(str(first), name), \
+            os.path.join(str(second), name)
+        if os.path.islink(path1) or os.path.islink(path2):
+            if os.readlink(path1) != os.readlink(path2):
+                return False
+        elif not (os.path.samefile(path1, path2) or
+                  filecmp.cmp(path1, path2, shallow=False)):
+            return False
+    return True
+
+
+def _relative_files(folder):
+    """Return the set of files and symlinks in ``folder``, recursively."""
+    files = set()
+    for dirpath, dirnames, filenames in os.walk(str(folder)):
+        links = [name for name in dirnames
+                 if os.path.islink(os.path.join(dirpath, name))]
+        dirnames[:] = [name for name in dirnames
+                       if name != '__pycache__' and name not in links]
+        for name in filenames + links:
+            files.add(os.path.relpath(os.path.join(dirpath, name),
+                                      str(folder)))
+    return files
+
+
+class NAppVersions:
+    """Versions of an installed NApp, one of which is active.
+
+    Layout, relative to the installed NApps folder::
+
+        .versions/<user>/<napp>/<version>/     one folder per version
+        .versions/<user>/<napp>/history.json   versions in activation order
+        <user>/<napp> -> ../.versions/<user>/<napp>/<version>
+
+    Kytos only sees ``<user>/<napp>``, so activating another version is a
+    single atomic replacement of that symlink followed by a NApp reload.
+    Callers hold the NApp lock while using this class.
+    """
+
+    def __init__(self, installed, user, napp):
+        """Describe the versions of a NApp.
+
+        Args:
+            installed (pathlib.Path): Folder of installed NApps.
+            user (str): NApps Server username.
+            napp (str): NApp name.
+
+        """
+        self.link = Path(installed) / user / napp
+        self.root = Path(installed) / VERSIONS_DIR / user / napp
+        self._history_file = self.root / 'history.json'
+
+    def active(self):
+        """Return the active version, or None if not a stored version."""
+        try:
+            target = Path(os.path.join(str(self.link.parent),
+                                       os.readlink(str(self.link))))
+        except OSError:
+            return None
+        if os.path.normpath(str(target.parent)) == \
+                os.path.normpath(str(self.root)):
+            return target.name
+        return None
+
+    def versions(self):
+        """Return the stored versions, most recently activated first."""
+        try:
+            names = {entry.name for entry in os.scandir(str(self.root))
+                     if entry.is_dir() and not entry.name.startswith('.')}
+        except FileNotFoundError:
+            return []
+        history = [name for name in reversed(self._history())
+                   if name in names]
+        return history + sorted(names - set(history))
+
+    def previous(self):
+        """Return the version that was active before the current one."""
+        active = self.active()
+        for name in self.versions():
+            if name != active:
+                return name
+        return None
+
+    def path(self, version):
+        """Return the folder of a stored version."""
+        return self.root / version
+
+    def add(self, folder, version):
+        """Move a NApp folder in as a version, without activating it.
+
+        If the version is already stored with the same content, ``folder`` is
+        deleted and the stored one is kept. Otherwise, the stored one is
+        replaced. When it is the active version, Kytos sees the new content
+        at once and never a missing folder.
+
+        Args:
+            folder (pathlib.Path): NApp folder on the same filesystem.
+            version (str): Version of the NApp.
+
+        Returns:
+            str: Name of the stored version.
+
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        name = self._name(version)
+        target = self.root / name
+        if not target.exists():
+            os.rename(str(folder), str(target))
+        elif same_content(folder, target):
+            shutil.rmtree(str(folder))
+        else:
+            self._replace(folder, name)
+        return name
+
+    def activate(self, version):
+        """Make a stored version the one seen by Kytos.
+
+        A NApp installed before versions were stored is moved in as a
+        version first. Its folder is briefly missing meanwhile, which only
+        happens once.
+
+        Raises:
+            FileNotFoundError: If the version is not stored.
+
+        """
+        target = self.root / version
+        if not target.is_dir():
+            raise FileNotFoundError('Version {} of {}/{} is not installed.'
+                                    .format(version, self.link.parent.name,
+                                            self.link.name))
+        if self.link.is_dir() and not self.link.is_symlink():
+            legacy = self._free_name(napp_version(self.link))
+            os.rename(str(self.link), str(self.root / legacy))
+            self._save_history(self._history() + [legacy])
+        self._point(target)
+        history = [name for name in self._history() if name != version]
+        self._save_history(history + [version])
+
+    def prune(self, keep):
+        """Remove all but the ``keep`` most recently activated versions.
+
+        The active version is always kept.
+
+        Returns:
+            list: Removed versions.
+
+        """
+        active = self.active()
+        versions = self.versions()
+        kept = set(versions[:max(keep, 1)]) | {active}
+        removed = [name for name in versions if name not in kept]
+        for name in removed:
+            shutil.rmtree(str(self.root / name), ignore_errors=True)
+        if removed:
+            self._save_history([name for name in self._history()
+                                if name not in removed])
+        return removed
+
+    def remove(self):
+        """Remove the NApp symlink and all stored versions."""
+        if self.link.is_symlink():
+            self.link.unlink()
+        shutil.rmtree(str(self.root), ignore_errors=True)
+
+    def _replace(self, folder, name):
+        """Replace a stored version by ``folder``."""
+        new = self.root / '.{}.{}.new'.format(name, os.getpid())
+        old = self.root / '.{}.{}.old'.format(name, os.getpid())
+        os.rename(str(folder), str(new))
+        active = self.active() == name
+        if active:
+            self._point(new)
+        os.rename(str(self.root / name), str(old))
+        os.rename(str(new), str(self.root / name))
+        if active:
+            self._point(self.root / name)
+        shutil.rmtree(str(old), ignore_errors=True)
+
+    def _point(self, target):
+        """Atomically replace the NApp symlink by one to ``target``."""
+        # Hidden from the NApps index until it replaces the link
+        tmp = self.link.parent / '.{}.{}.link'.format(self.link.name,
+                                                      os.getpid())
+        if os.path.lexists(str(tmp)):
+            os.remove(str(tmp))
+        os.symlink(os.path.relpath(str(target), str(self.link.parent)),
+                   str(tmp))
+        try:
+            os.replace(str(tmp), str(self.link))
+        except OSError:
+            os.remove(str(tmp))
+            raise
+
+    @staticmethod
+    def _name(version):
+        """Return the folder name of a version."""
+        return re.sub(r'[^\w.+-]', '_', version or 'latest')
+
+    def _free_name(self, version):
+        """Return ``version`` or, if stored, the first free suffixed name."""
+        version = self._name(version)
+        name, suffix = version, 1
+        while (self.root / name).exists():
+            suffix += 1
+            name = '{}-{}'.format(version, suffix)
+        return name
+
+    def _history(self):
+        try:
+            with self._history_file.open() as history:
+                return json.load(history)
+        except (OSError, ValueError):
+            return []
+
+    def _save_history(self, history):
+        """Save the activation history atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=str(self.root),
+                                         prefix='.', delete=False) as tmp:
+            json.dump(history, tmp)
+        os.replace(tmp.name, str(self._history_file))
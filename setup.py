@@ -94,7 +94,7 @@ class CITest(SimpleCommand):
 
     def run(self):
         """Run unit tests with coverage, doc tests and linter."""
-        for command in TestCoverage, Linter:
+        for command in TestCoverage, Linter, StartupTime, Benchmark:
             command(*self._args, **self._kwargs).run()
 
 
@@ -107,13 +107,79 @@ class Linter(SimpleCommand):
         """Run yala."""
         print('Yala is running. It may take several seconds...')
         try:
-            check_call('yala setup.py tests kytos', shell=True)
+            check_call('yala setup.py tests kytos benchmarks', shell=True)
             print('No linter error found.')
         except CalledProcessError:
             print('Linter check failed. Fix the error(s) above and try again.')
             sys.exit(-1)
 
 
+class StartupTime(SimpleCommand):
+    """Check the CLI startup time."""
+
+    description = 'check the import time of the kytos command line'
+    user_options = [('budget=', None, 'maximum import time in milliseconds')]
+
+    budget = None
+
+    def initialize_options(self):
+        """Set default values for options."""
+        self.budget = 150
+
+    def run(self):
+        """Run the startup test (tests/test_startup.py) with the budget."""
+        env = dict(os.environ, KYTOS_STARTUP_BUDGET=str(self.budget))
+        try:
+            check_call([sys.executable, '-m', 'unittest', '-v',
+                        'tests.test_startup'], env=env)
+        except CalledProcessError:
+            print('Startup check failed.')
+            sys.exit(-1)
+
+
+class Benchmark(SimpleCommand):
+    """Run the benchmarks and compare them with a baseline."""
+
+    description = 'run the benchmarks and fail on performance regressions'
+    user_options = [('baseline=', None, 'results to compare with'),
+                    ('threshold=', None, 'maximum slowdown in percent'),
+                    ('save', None, 'save the results as the new baseline')]
+    boolean_options = ['save']
+
+    baseline = threshold = save = None
+
+    def initialize_options(self):
+        """Set default values for options."""
+        self.baseline = '.benchmarks/baseline.json'
+        self.threshold = 50
+        self.save = False
+
+    def run(self):
+        """Compare with the baseline or, with ``--save``, replace it.
+
+        Timings depend on the machine, so the baseline is not versioned: save
+        it once on each machine (e.g. from the base branch) before comparing.
+        Without a baseline, the check fails instead of passing unchecked.
+        """
+        cmd = [sys.executable, '-m', 'benchmarks', '--threshold',
+               str(self.threshold)]
+        if self.save:
+            os.makedirs(os.path.dirname(self.baseline) or '.', exist_ok=True)
+            cmd += ['--save', self.baseline]
+        elif os.path.exists(self.baseline):
+            cmd += ['--compare', self.baseline]
+        else:
+            print('No benchmark baseline in {}. Save one on this machine with '
+                  '"python setup.py bench --save" and try again.'.format(
+                      self.baseline))
+            sys.exit(-1)
+        try:
+            check_call(cmd)
+        except CalledProcessError:
+            print('Benchmark check failed.')
+            sys.exit(-1)
+
+
 class CommonInstall:
     """Class with common procedures to install the package."""
 
@@ -190,13 +256,15 @@ setup(name='kytos-utils',
               'yala'
           ]
       },
-      packages=find_packages(exclude=['tests']),
+      packages=find_packages(exclude=['tests', 'benchmarks']),
       cmdclass={
           'ci': CITest,
+          'bench': Benchmark,
           'clean': Cleaner,
           'coverage': TestCoverage,
           'develop': DevelopMode,
           'install': InstallMode,
-          'lint': Linter
+          'lint': Linter,
+          'startup': StartupTime
       },
       zip_safe=False)
@@ -0,0 +1,100 @@
+"""Helpers shared by the tests."""
+import shutil
+import tempfile
+import threading
+import unittest
+from configparser import ConfigParser
+from pathlib import Path
+
+from benchmarks.napps import make_napp
+from benchmarks.server import StandInServer
+from kytos.utils.config import set_config_file
+from kytos.utils.napps import NAppsManager
+
+#: Kytos API of the tests. Nothing listens on it.
+KYTOS_API = 'http://127.0.0.1:9/'
+
+
+class NAppsTestCase(unittest.TestCase):
+    """Manage NApps in temporary folders.
+
+    The config file, package cache and NApps catalog are in ``self.root``.
+    NAppsManager takes the ``self.installed`` and ``self.enabled`` folders
+    without asking kytosd.
+    """
+
+    #: Extra lines of the config file
+    config = ''
+
+    def setUp(self):
+        """Create the folders and the config file."""
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.root))
+        self.installed = self.root / 'installed'
+        self.enabled = self.root / 'enabled'
+        self.installed.mkdir()
+        self.enabled.mkdir()
+
+        self.config_file = self.root / 'kytosrc'
+        self.config_file.write_text('\n'.join([
+            '[napps]',
+            'cache_dir = {}'.format(self.root / 'cache' / 'napps'),
+            'catalog_file = {}'.format(self.root / 'cache' / 'catalog.json'),
+            '[kytos]',
+            'api = {}'.format(KYTOS_API),
+            '[http]',
+            'retries = 0',
+            self.config, '']))
+        set_config_file(str(self.config_file))
+        self.addCleanup(set_config_file, None)
+
+        # pylint: disable=protected-access
+        NAppsManager._kytos_paths[KYTOS_API] = (self.enabled, self.installed)
+        self.addCleanup(NAppsManager._kytos_paths.clear)
+        self.addCleanup(NAppsManager._indexes.clear)
+
+    def install(self, user, name, **kwargs):
+        """Write an installed NApp and return its metadata.
+
+        Keyword arguments are given to :func:`benchmarks.napps.make_napp`.
+        """
+        kwargs.setdefault('files', 0)
+        kwargs.setdefault('endpoints', 0)
+        (self.installed / user).mkdir(exist_ok=True)
+        (self.installed / user / '__init__.py').touch()
+        return make_napp(self.installed, user, name, **kwargs)
+
+    def serve(self):
+        """Start a stand-in NApps Server and Kytos API and return it.
+
+        The config is changed to use it. NApps are published with
+        :meth:`publish`.
+        """
+        server = StandInServer(self.enabled, self.installed)
+        # Polled more often than by server.start(), to stop it faster
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.stop)
+        config = ConfigParser()
+        config.read(str(self.config_file))
+        config.set('napps', 'api', server.url + 'api/')
+        config.set('napps', 'repo', server.url + 'repo')
+        config.set('kytos', 'api', server.url)
+        with self.config_file.open('w') as config_file:
+            config.write(config_file)
+        return server
+
+    def publish(self, server, user, name, version='1.0', **kwargs):
+        """Publish a NApp version in ``server`` and return its metadata.
+
+        Keyword arguments are given to :func:`benchmarks.napps.make_napp`.
+        """
+        kwargs.setdefault('files', 0)
+        kwargs.setdefault('endpoints', 0)
+        packages = self.root / 'packages' / version
+        metadata = make_napp(packages, user, name, version, **kwargs)
+        with NAppsManager.build_napp_package(
+                name, str(packages / user / name)) as package:
+            server.add_napp(metadata, package.read())
+        return metadata
@@ -0,0 +1,115 @@
+"""Tests of the kytos agent and of forwarding commands to it."""
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from kytos.utils.agent import AgentConnectionError, context, forward, request
+
+#: A forwarded command that works without kytosd
+CACHE = ['napps', 'cache', 'ls']
+
+
+class TestAgent(unittest.TestCase):
+    """Run commands in an agent process."""
+
+    def setUp(self):
+        """Start an agent with its own home folder, config and socket."""
+        self.home = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.home))
+        self.socket = str(self.home / 'agent.sock')
+        self.config_file = str(self.home / 'kytosrc')
+        Path(self.config_file).write_text('\n'.join([
+            '[napps]', 'cache_dir = {}'.format(self.home / 'cache'),
+            '[kytos]', 'api = http://127.0.0.1:9/',
+            '[http]', 'retries = 0', '']))
+
+        environ = mock.patch.dict(os.environ, {'HOME': str(self.home),
+                                               'KYTOS_AGENT_SOCKET':
+                                               self.socket})
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.agent = subprocess.Popen(
+            [sys.executable, '-m', 'kytos.utils.agent', '--config',
+             self.config_file], stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(self._stop)
+        self.status = self._wait()
+
+    def _wait(self):
+        """Return the agent status once it is listening."""
+        deadline = time.time() + 10
+        while True:
+            try:
+                return request({'command': 'status'}, self.socket)
+            except AgentConnectionError:
+                if time.time() > deadline or self.agent.poll() is not None:
+                    raise
+                time.sleep(0.05)
+
+    def _stop(self):
+        """Stop the agent, if running, and wait for it to exit."""
+        if self.agent.poll() is None:
+            try:
+                request({'command': 'stop'}, self.socket)
+            except AgentConnectionError:
+                self.agent.terminate()
+        return self.agent.wait(10)
+
+    def _forward(self, argv, config_file=None):
+        """Return the exit status and output of a forwarded command."""
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+            status = forward(argv, config_file or self.config_file)
+        return status, stdout.getvalue()
+
+    def test_status(self):
+        """The agent reports its pid, socket and served commands."""
+        self.assertEqual((self.status['pid'], self.status['socket'],
+                          self.status['requests']),
+                         (self.agent.pid, self.socket, 0))
+
+    def test_forward(self):
+        """Commands run in the agent, which returns their output."""
+        self.assertEqual(self._forward(CACHE),
+                         (0, 'No cached NApps found.\n'))
+        self.assertEqual(request({'command': 'status'},
+                                 self.socket)['requests'], 1)
+
+    def test_local(self):
+        """Some commands and other contexts run in the client."""
+        for argv in (['napps', 'create'], CACHE + ['--help'],
+                     ['web', 'update'], ['napps']):
+            self.assertIsNone(forward(argv, self.config_file), argv)
+
+        other = str(self.home / 'other')
+        shutil.copy(self.config_file, other)
+        self.assertIsNone(forward(CACHE, other))
+        with mock.patch.dict(os.environ, {'NAPPS_API_URI': 'http://other/'}):
+            self.assertIsNone(forward(CACHE, self.config_file))
+        self.assertEqual(request({'command': 'status'},
+                                 self.socket)['requests'], 0)
+
+    def test_invalid(self):
+        """Invalid messages get an error."""
+        answer = request(dict(context(self.config_file), argv=[]),
+                         self.socket)
+        self.assertEqual(answer['exit'], 1)
+        self.assertIn('Invalid message', answer['stderr'])
+
+    def test_stop(self):
+        """A stopped agent removes its socket and commands run locally."""
+        self.assertEqual(self._stop(), 0)
+        self.assertFalse(os.path.exists(self.socket))
+        self.assertIsNone(forward(CACHE, self.config_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""Tests of the local cache of downloaded packages."""
+import configparser
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from kytos.utils.cache import PackageCache
+from kytos.utils.package import open_package
+
+
+class TestPackageCache(unittest.TestCase):
+    """Store, find and evict packages."""
+
+    def setUp(self):
+        """Create an empty cache of 100 bytes."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.cache = PackageCache(self.tmp / 'cache', max_size=100)
+
+    def _store(self, key, content, etag=None):
+        """Store a package with ``content`` under ``key``."""
+        with self.cache.temp_file() as part:
+            part.write(content)
+        return self.cache.store(key, part.name, etag)
+
+    def test_store(self):
+        """Packages are moved in and indexed with their hash and ETag."""
+        blob = self._store('kytos/napp:1.0', b'a' * 10, '"v1"')
+        entry = self.cache.get('kytos/napp:1.0')
+        self.assertEqual(blob, self.cache.blob_path(entry['sha256']))
+        self.assertEqual(blob.read_bytes(), b'a' * 10)
+        self.assertEqual((entry['size'], entry['etag']), (10, '"v1"'))
+        self.assertIsNone(self.cache.get('kytos/napp:2.0'))
+        self.assertEqual(list(self.cache.path.glob('*.part')), [])
+
+    def test_same_content_stored_once(self):
+        """Versions with the same package share a blob."""
+        first = self._store('kytos/napp:1.0', b'same')
+        second = self._store('kytos/napp:latest', b'same')
+        self.assertEqual(first, second)
+        self.assertEqual(len(list(first.parent.iterdir())), 1)
+
+    def test_find(self):
+        """The most recently used version of a NApp is found."""
+        self._store('kytos/napp:1.0', b'1')
+        self._store('kytos/napp:2.0', b'2')
+        self.cache.touch('kytos/napp:1.0')
+        found = self.cache.find('kytos', 'napp')
+        self.assertEqual(found, self.cache.get('kytos/napp:1.0'))
+        self.assertIsNone(self.cache.find('kytos', 'other'))
+
+    def test_lru_eviction(self):
+        """Least recently used packages are evicted beyond the maximum."""
+        self._store('kytos/aaa:1.0', b'a' * 40)
+        self._store('kytos/bbb:1.0', b'b' * 40)
+        self.cache.touch('kytos/aaa:1.0')
+        self._store('kytos/ccc:1.0', b'c' * 40)
+        self.assertEqual([key for key, _ in self.cache.entries()],
+                         ['kytos/aaa:1.0', 'kytos/ccc:1.0'])
+
+    def test_larger_than_maximum(self):
+        """The package just stored is kept even if larger than the cache."""
+        self._store('kytos/aaa:1.0', b'a' * 10)
+        self._store('kytos/big:1.0', b'b' * 200)
+        self.assertEqual([key for key, _ in self.cache.entries()],
+                         ['kytos/big:1.0'])
+
+    def test_prune(self):
+        """Pruning to zero removes every entry and blob."""
+        self._store('kytos/aaa:1.0', b'a')
+        self._store('kytos/bbb:1.0', b'b')
+        self.assertEqual(sorted(self.cache.prune(0)),
+                         ['kytos/aaa:1.0', 'kytos/bbb:1.0'])
+        self.assertEqual(self.cache.entries(), [])
+        self.assertEqual(list((self.cache.path / 'blobs').iterdir()), [])
+
+
+class TestOpenPackage(unittest.TestCase):
+    """Download packages through the cache, revalidating their ETag."""
+
+    def setUp(self):
+        """Publish a package in a local folder."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.cache = PackageCache(self.tmp / 'cache', max_size=0)
+        self.package = self.tmp / 'repo' / 'napp-1.0.napp'
+        self.package.parent.mkdir()
+        self.package.write_bytes(b'version 1')
+        self.config = configparser.ConfigParser()
+        self.key = 'kytos/napp:1.0'
+
+    def _read(self, offline=False):
+        """Read the package through the cache."""
+        with open_package(self.cache, self.key, self.package.as_uri(),
+                          self.config, offline=offline) as package:
+            return package.read()
+
+    def test_download_and_revalidate(self):
+        """A cached package is reused until its ETag changes."""
+        self.assertEqual(self._read(), b'version 1')
+        entry = self.cache.get(self.key)
+        self.assertIsNotNone(entry['etag'])
+
+        # 304 Not Modified: read from the cache
+        self.assertEqual(self._read(), b'version 1')
+        self.assertEqual(self.cache.get(self.key)['sha256'], entry['sha256'])
+
+        self.package.write_bytes(b'version 2!')
+        self.assertEqual(self._read(), b'version 2!')
+        self.assertNotEqual(self.cache.get(self.key)['etag'], entry['etag'])
+
+    def test_offline(self):
+        """Offline, only cached packages can be read."""
+        with self.assertRaises(FileNotFoundError):
+            self._read(offline=True)
+        self._read()
+        self.package.unlink()
+        self.assertEqual(self._read(offline=True), b'version 1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Tests of the cached NApps Server catalog and its search."""
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+
+from kytos.utils.catalog import NAppsCatalog
+
+NAPPS = [
+    {'username': 'kytos', 'name': 'topology',
+     'description': 'Manage the network topology', 'tags': ['core']},
+    {'username': 'kytos', 'name': 'topo_viewer',
+     'description': 'Draw links', 'tags': []},
+    {'username': 'amlight', 'name': 'flow_stats',
+     'description': 'Statistics of the topology flows', 'tags': ['of']},
+    # Old NApps Server entries have "author" instead of "username"
+    {'author': 'legacy', 'name': 'coloring',
+     'description': 'Color links', 'tags': ['topology']},
+]
+
+
+class FakeClient:
+    """NApps client serving ``NAPPS`` with the ETag "v1"."""
+
+    def __init__(self):
+        """Record the ETags of the requests."""
+        self.requests = []
+        self.error = None
+
+    def get_napps_if_changed(self, etag=None):
+        """Return (napps, etag), napps being None if ``etag`` is current."""
+        self.requests.append(etag)
+        if self.error:
+            raise self.error
+        return (None if etag == '"v1"' else NAPPS), '"v1"'
+
+
+class TestNAppsCatalog(unittest.TestCase):
+    """Search the catalog and revalidate it with the server."""
+
+    def setUp(self):
+        """Create a catalog cached in a temporary folder."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.client = FakeClient()
+        self.catalog = NAppsCatalog(self.client, self.tmp / 'catalog.json',
+                                    ttl=3600)
+
+    def _search(self, query):
+        """Return the ids of the NApps found, in order."""
+        return ['{}/{}'.format(napp.get('username', napp.get('author')),
+                               napp['name'])
+                for napp in self.catalog.search(query)]
+
+    def test_ranking(self):
+        """Exact matches rank first, then prefixes, by field weight."""
+        self.assertEqual(self._search('topology'),
+                         ['kytos/topology', 'legacy/coloring',
+                          'amlight/flow_stats'])
+        self.assertEqual(self._search('topo'),
+                         ['kytos/topo_viewer', 'kytos/topology',
+                          'legacy/coloring', 'amlight/flow_stats'])
+
+    def test_fuzzy(self):
+        """Misspelled words match only when nothing else does."""
+        self.assertEqual(self._search('topolgy'),
+                         ['kytos/topology', 'legacy/coloring',
+                          'amlight/flow_stats'])
+        self.assertEqual(self._search('zzzz'), [])
+
+    def test_all_words(self):
+        """Every word of the query must match."""
+        self.assertEqual(self._search('topology flows'),
+                         ['amlight/flow_stats'])
+        self.assertEqual(self._search('amlight links'), [])
+
+    def test_wildcard(self):
+        """Shell patterns match the whole id, description or tags."""
+        self.assertEqual(self._search('kytos/topo*'),
+                         ['kytos/topo_viewer', 'kytos/topology'])
+        self.assertEqual(self._search('color*'), ['legacy/coloring'])
+
+    def test_revalidation(self):
+        """The catalog is fetched once and then revalidated by ETag."""
+        self.catalog.search('topology')
+        self.catalog.search('links')
+        self.assertEqual(self.client.requests, [None])
+
+        self.assertEqual(len(self.catalog.napps(refresh=True)), 4)
+        self.assertEqual(self.client.requests, [None, '"v1"'])
+
+        catalog = NAppsCatalog(self.client, self.catalog.path, ttl=3600)
+        self.assertEqual(len(catalog.napps(offline=True)), 4)
+        self.assertEqual(len(self.client.requests), 2)
+
+    def test_server_error(self):
+        """The cached catalog is used if the server can't be reached."""
+        self.client.error = requests.exceptions.ConnectionError()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.catalog.napps()
+
+        self.client.error = None
+        self.catalog.napps()
+        self.client.error = requests.exceptions.ConnectionError()
+        self.assertEqual(self._search('coloring'), ['legacy/coloring'])
+        with self.assertLogs('kytos.utils.catalog', 'WARNING'):
+            self.assertEqual(len(self.catalog.napps(refresh=True)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Tests of the clients of kytosd and the NApps Server."""
+import json
+import threading
+import unittest
+from configparser import ConfigParser
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from unittest import mock
+
+from kytos.cli.commands.napps.api import NAppsAPI
+from kytos.utils.client import NAppsClient
+from kytos.utils.session import close_session
+
+
+class KytosServer(ThreadingMixIn, HTTPServer):
+    """Stand-in kytosd answering reload requests."""
+
+    daemon_threads = True
+
+
+class ReloadHandler(BaseHTTPRequestHandler):
+    """Reload kytos/* NApps, fail the others."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Answer /api/kytos/core/reload/<user>/<napp>."""
+        napp = self.path.split('/reload/', 1)[1]
+        if napp.startswith('kytos/') or napp == 'all':
+            status, body = 200, b'reloaded'
+        else:
+            status, body = 500, json.dumps({'error': 'ImportError'}).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Don't log requests."""
+
+
+class TestReload(unittest.TestCase):
+    """Reload NApps concurrently and report every result."""
+
+    def setUp(self):
+        """Start a stand-in kytosd."""
+        server = KytosServer(('127.0.0.1', 0), ReloadHandler)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.config = ConfigParser()
+        self.config.read_dict({'kytos': {'api': 'http://127.0.0.1:{}/'.format(
+            server.server_port)}})
+        close_session()
+        self.addCleanup(close_session)
+
+    def test_report(self):
+        """Every NApp gets a result, failures with the kytosd error."""
+        report = NAppsClient(self.config).reload_napps(
+            [('kytos', 'of_core'), ('amlight', 'sdntrace', '1.0')])
+        self.assertEqual([(result['napp'], result['status'], result['ok'],
+                           result['error']) for result in report],
+                         [('kytos/of_core', 200, True, None),
+                          ('amlight/sdntrace', 500, False, 'ImportError')])
+        self.assertTrue(all(result['seconds'] >= 0 for result in report))
+
+    def test_all(self):
+        """All NApps are reloaded with a single request."""
+        report = NAppsClient(self.config).reload_napps()
+        self.assertEqual([(result['napp'], result['ok'])
+                          for result in report], [('all', True)])
+
+    def test_unreachable(self):
+        """The NApps of an unreachable kytosd fail without a status."""
+        self.config.set('kytos', 'api', 'http://127.0.0.1:9/')
+        close_session()
+        report = NAppsClient(self.config).reload_napps([('kytos', 'of_core')])
+        self.assertEqual((report[0]['status'], report[0]['ok']),
+                         (None, False))
+        self.assertTrue(report[0]['error'])
+
+
+class TestReloadCommand(unittest.TestCase):
+    """Log the reload report and set the exit status."""
+
+    @staticmethod
+    def _manager(*results):
+        """Return a manager whose reload returns ``results``."""
+        return mock.Mock(reload=mock.Mock(return_value=[
+            {'napp': napp, 'status': status, 'ok': status == 200,
+             'seconds': 0.1, 'error': None if status == 200 else 'error'}
+            for napp, status in results]))
+
+    def test_success(self):
+        """Every reload is logged."""
+        mgr = self._manager(('kytos/of_core', 200), ('kytos/of_lldp', 200))
+        with self.assertLogs('kytos.cli.commands.napps.api') as logs:
+            NAppsAPI.reload_napps(mgr, [('kytos', 'of_core'),
+                                        ('kytos', 'of_lldp')])
+        self.assertEqual(len(logs.output), 2)
+
+    def test_failure(self):
+        """The command exits with status 1 after reporting all failures."""
+        mgr = self._manager(('kytos/of_core', 500), ('kytos/of_lldp', 200),
+                            ('kytos/pathfinder', None))
+        with self.assertLogs('kytos.cli.commands.napps.api') as logs, \
+                self.assertRaises(SystemExit) as context:
+            NAppsAPI.reload_napps(mgr, None)
+        self.assertEqual(context.exception.code, 1)
+        self.assertIn('2 of 3 reload(s) failed.', logs.output[-1])
+        self.assertIn('unreachable', logs.output[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
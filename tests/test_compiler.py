@@ -0,0 +1,170 @@
+"""Tests of the bytecode precompilation of NApps."""
+import importlib.util
+import io
+import shutil
+import tempfile
+import unittest
+from configparser import ConfigParser
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.napps import make_napp
+from kytos.cli.commands.napps.modules import ModulesAPI
+from kytos.utils import compiler
+from kytos.utils.compiler import NAppsCompiler, precompile
+from tests.helpers import NAppsTestCase
+
+
+def cached(module, optimize=0):
+    """Return the path of the bytecode of ``module`` (pathlib.Path)."""
+    return Path(importlib.util.cache_from_source(
+        str(module), optimization=optimize or ''))
+
+
+class TestNAppsCompiler(unittest.TestCase):
+    """Compile the modules of NApp folders."""
+
+    def setUp(self):
+        """Write a NApp with a module that doesn't compile."""
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.root))
+        make_napp(self.root, 'kytos', 'of_core', files=2, endpoints=0)
+        self.napp = self.root / 'kytos' / 'of_core'
+        (self.napp / 'broken.py').write_text('def broken(:\n')
+        (self.napp / '.git').mkdir()
+        (self.napp / '.git' / 'hook.py').write_text('x = 1\n')
+
+    def test_compile(self):
+        """Every module is compiled for each level, errors are returned."""
+        with redirect_stdout(io.StringIO()):
+            failed = NAppsCompiler((0, 2), workers=1).compile([self.napp])
+        self.assertEqual(failed, [str(self.napp / 'broken.py')])
+        for module in 'main.py', 'settings.py', 'lib/module_1.py':
+            for level in 0, 2:
+                self.assertTrue(cached(self.napp / module, level).exists(),
+                                (module, level))
+        self.assertFalse(cached(self.napp / 'main.py', 1).exists())
+        self.assertFalse((self.napp / '.git' / '__pycache__').exists())
+
+    def test_pool(self):
+        """Larger NApps are compiled by worker processes."""
+        make_napp(self.root, 'kytos', 'of_lldp', files=16, endpoints=0)
+        napp = self.root / 'kytos' / 'of_lldp'
+        self.assertEqual(NAppsCompiler(workers=2).compile([napp]), [])
+        self.assertTrue(cached(napp / 'lib' / 'module_15.py').exists())
+
+    def test_invalid(self):
+        """Invalid options are rejected."""
+        for kwargs in {'optimize': ()}, {'optimize': (3,)}, \
+                {'invalidation_mode': 'hash'}:
+            with self.assertRaises(ValueError):
+                NAppsCompiler(**kwargs)
+        config = ConfigParser()
+        config.read_dict({'napps': {'compile_optimize': '0,x'}})
+        with self.assertRaises(ValueError):
+            NAppsCompiler.from_config(config)
+
+    @unittest.skipIf(compiler._pyc_modes() is None,  # pylint: disable=W0212
+                     'hash-based .pyc files require Python 3.7')
+    def test_hash(self):
+        """Hash-based bytecode is flagged as checked or not (PEP 552)."""
+        for mode, flags in ('checked-hash', 3), ('unchecked-hash', 1):
+            NAppsCompiler(invalidation_mode=mode).compile([self.napp / 'lib'])
+            pyc = cached(self.napp / 'lib' / 'module_0.py').read_bytes()
+            self.assertEqual(int.from_bytes(pyc[4:8], 'little'), flags)
+
+    def test_python36(self):
+        """Without PEP 552, only timestamp-based bytecode is written."""
+        with mock.patch.object(compiler, '_pyc_modes', return_value=None):
+            with self.assertRaisesRegex(ValueError, 'Python 3.7'):
+                NAppsCompiler(invalidation_mode='checked-hash')
+            with mock.patch('compileall.compile_file',
+                            return_value=True) as compile_file:
+                NAppsCompiler().compile([self.napp / 'lib'])
+        self.assertNotIn('invalidation_mode', compile_file.call_args[1])
+
+
+class TestPrecompile(unittest.TestCase):
+    """Precompile NApps being installed without failing the install."""
+
+    def setUp(self):
+        """Write a NApp."""
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.root))
+        make_napp(self.root, 'kytos', 'of_core', files=0, endpoints=0)
+        self.napp = self.root / 'kytos' / 'of_core'
+        self.config = ConfigParser()
+        self.config.read_dict({'napps': {'compile_workers': '1'}})
+
+    def test_precompile(self):
+        """Modules are compiled and errors only logged."""
+        (self.napp / 'broken.py').write_text('def broken(:\n')
+        with redirect_stdout(io.StringIO()), \
+                self.assertLogs('kytos.utils.compiler', 'WARNING') as logs:
+            precompile(self.config, self.napp, 'kytos/of_core')
+        self.assertEqual(logs.output, ['WARNING:kytos.utils.compiler:    '
+                                       'kytos/of_core: Could not compile '
+                                       'broken.py.'])
+        self.assertTrue(cached(self.napp / 'main.py').exists())
+
+    def test_disabled(self):
+        """Nothing is compiled if ``[napps] compile`` is off."""
+        self.config.set('napps', 'compile', 'no')
+        precompile(self.config, self.napp, 'kytos/of_core')
+        self.assertFalse((self.napp / '__pycache__').exists())
+
+    def test_failure(self):
+        """Invalid options and compiler errors are only logged."""
+        with mock.patch.object(NAppsCompiler, 'compile',
+                               side_effect=OSError('pool broken')):
+            for invalidation in 'hash', 'timestamp':
+                self.config.set('napps', 'compile_invalidation', invalidation)
+                with self.assertLogs('kytos.utils.compiler', 'WARNING') as \
+                        logs:
+                    precompile(self.config, self.napp, 'kytos/of_core')
+                self.assertIn('kytos/of_core: Not compiled', logs.output[0])
+
+
+class TestCompileCommand(NAppsTestCase):
+    """Compile installed NApps with ``kytos napps compile``."""
+
+    def setUp(self):
+        """Install two NApps."""
+        super().setUp()
+        self.install('kytos', 'of_core')
+        self.install('kytos', 'of_lldp')
+
+    @staticmethod
+    def _args(*napps, optimize=None):
+        return {'all': not napps, '<napp>': list(napps),
+                '--optimize': optimize, '--invalidation': None}
+
+    def test_all(self):
+        """All installed NApps are compiled."""
+        with self.assertLogs('kytos.cli.commands.napps.modules') as logs:
+            ModulesAPI.compile(self._args(optimize='1'))
+        self.assertEqual(logs.output, ['INFO:kytos.cli.commands.napps.modules:'
+                                       'NApps compiled.'])
+        for napp in 'of_core', 'of_lldp':
+            self.assertTrue(cached(self.installed / 'kytos' / napp /
+                                   'main.py', 1).exists())
+
+    def test_errors(self):
+        """Modules that don't compile and missing NApps fail the command."""
+        (self.installed / 'kytos' / 'of_core' / 'broken.py').write_text('(\n')
+        for args in self._args(('kytos', 'of_core', None)), \
+                self._args(('kytos', 'gone', None)), \
+                self._args(optimize='3'):
+            with redirect_stdout(io.StringIO()), \
+                    self.assertLogs('kytos.cli.commands.napps.modules',
+                                    'ERROR'), \
+                    self.assertRaises(SystemExit) as context:
+                ModulesAPI.compile(args)
+            self.assertEqual(context.exception.code, 1)
+        self.assertFalse(cached(self.installed / 'kytos' / 'of_lldp' /
+                                'main.py').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Tests of the process-wide Kytos config."""
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from configparser import ConfigParser
+from pathlib import Path
+from unittest import mock
+
+from kytos.utils.config import (KytosConfig, get_config, get_config_file,
+                                set_config_file)
+
+
+class TestConfig(unittest.TestCase):
+    """Share the config in the process and write it atomically."""
+
+    def setUp(self):
+        """Use a config file in a temporary folder."""
+        self.folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.folder))
+        self.config_file = self.folder / 'kytosrc'
+        self.config_file.write_text('[napps]\napi = http://napps/\n')
+        set_config_file(str(self.config_file))
+        self.addCleanup(set_config_file, None)
+
+    def _files(self):
+        return sorted(os.listdir(str(self.folder)))
+
+    def test_set_config_file(self):
+        """The config file of the process can be changed and reset."""
+        self.assertEqual(get_config_file(), str(self.config_file))
+        self.assertEqual(get_config().config.get('napps', 'api'),
+                         'http://napps/')
+        set_config_file(None)
+        self.assertEqual(get_config_file(), '~/.kytosrc')
+
+    def test_shared(self):
+        """The config is parsed once while the file doesn't change."""
+        config = get_config()
+        with mock.patch.object(KytosConfig, '__init__') as init:
+            self.assertIs(get_config(), config)
+        init.assert_not_called()
+
+    def test_reload(self):
+        """The config is parsed again after another process saves it."""
+        config = get_config()
+        KytosConfig(str(self.config_file)).save_token('user', 'secret')
+        self.assertTrue(config.changed())
+        self.assertEqual(get_config().config.get('auth', 'token'), 'secret')
+
+        # Our own writes don't invalidate the shared config
+        config = get_config()
+        config.clear_token()
+        self.assertFalse(config.changed())
+        self.assertIs(get_config(), config)
+        self.assertFalse(config.config.has_option('auth', 'token'))
+
+    def test_create(self):
+        """A missing config file is created readable only by its owner."""
+        self.config_file.unlink()
+        with self.assertLogs('kytos.utils.config', 'WARNING'):
+            get_config()
+        self.assertEqual(stat.S_IMODE(self.config_file.stat().st_mode),
+                         0o600)
+        sections = ConfigParser()
+        sections.read(str(self.config_file))
+        self.assertEqual(sections.sections(),
+                         ['global', 'auth', 'napps', 'kytos', 'http'])
+
+    def test_save_token(self):
+        """Tokens replace the file atomically, keeping the other options."""
+        get_config().save_token('user', 'secret')
+        saved = ConfigParser()
+        saved.read(str(self.config_file))
+        self.assertEqual(saved.get('auth', 'token'), 'secret')
+        self.assertEqual(saved.get('napps', 'api'), 'http://napps/')
+        # Defaults are not written
+        self.assertFalse(saved.has_option('napps', 'repo'))
+        self.assertEqual(stat.S_IMODE(self.config_file.stat().st_mode),
+                         0o600)
+        self.assertEqual(self._files(), ['kytosrc'])
+
+    def test_failed_write(self):
+        """A failed write leaves the config file and no temporary file."""
+        with mock.patch.object(ConfigParser, 'write',
+                               side_effect=OSError('disk full')), \
+                self.assertRaises(OSError):
+            get_config().save_token('user', 'secret')
+        self.assertEqual(self.config_file.read_text(),
+                         '[napps]\napi = http://napps/\n')
+        self.assertEqual(self._files(), ['kytosrc'])
+
+
+if __name__ == '__main__':
+    unittest.main()
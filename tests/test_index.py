@@ -0,0 +1,109 @@
+"""Tests of the persistent index of installed and enabled NApps."""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from kytos.utils.index import NAppsIndex
+
+
+class TestNAppsIndex(unittest.TestCase):
+    """Detect changes in the NApps folders from their stamps."""
+
+    def setUp(self):
+        """Install kytos/of_core and enable it."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.installed = self.tmp / 'installed'
+        self.enabled = self.tmp / 'enabled'
+        self.enabled.mkdir()
+        self._install(self.installed / 'kytos' / 'of_core', '1.0')
+        (self.enabled / 'kytos').mkdir()
+        (self.enabled / 'kytos' / 'of_core').symlink_to(
+            self.installed / 'kytos' / 'of_core')
+        self.index = NAppsIndex(self.installed, self.enabled)
+
+    @staticmethod
+    def _install(folder, version):
+        """Write a NApp folder with its kytos.json."""
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / 'kytos.json').write_text(json.dumps({
+            'username': folder.parent.name, 'name': folder.name,
+            'version': version}))
+
+    def test_scan(self):
+        """Installed and enabled NApps and their metadata are listed."""
+        self.assertEqual(self.index.installed(), {('kytos', 'of_core')})
+        self.assertEqual(self.index.enabled(), {('kytos', 'of_core')})
+        self.assertEqual(self.index.metadata('kytos', 'of_core')['version'],
+                         '1.0')
+        self.assertEqual(self.index.metadata('kytos', 'missing'), {})
+
+    def test_saved(self):
+        """Another process loads the saved index."""
+        self.index.installed()
+        self.assertTrue((self.installed / '.index' / 'napps.json').exists())
+        index = NAppsIndex(self.installed, self.enabled)
+        self.assertEqual(index.installed(), {('kytos', 'of_core')})
+
+    def test_new_napp(self):
+        """A NApp installed by another process is found on refresh."""
+        self.index.installed()
+        self._install(self.installed / 'kytos' / 'of_lldp', '1.0')
+        self._install(self.installed / 'amlight' / 'sdntrace', '1.0')
+        self.assertEqual(self.index.installed(), {('kytos', 'of_core')})
+        self.index.refresh()
+        self.assertEqual(self.index.installed(),
+                         {('kytos', 'of_core'), ('kytos', 'of_lldp'),
+                          ('amlight', 'sdntrace')})
+
+    def test_removed_napp(self):
+        """A disabled NApp is no longer listed as enabled."""
+        self.index.enabled()
+        (self.enabled / 'kytos' / 'of_core').unlink()
+        self.index.refresh()
+        self.assertEqual(self.index.enabled(), set())
+        self.assertEqual(self.index.installed(), {('kytos', 'of_core')})
+
+    def test_napp_updated_in_place(self):
+        """A NApp folder replaced by a newer version is scanned again."""
+        self.index.installed()
+        folder = self.installed / 'kytos' / 'of_core'
+        new = self.installed / 'kytos' / '.new'
+        self._install(new, '2.0')
+        shutil.rmtree(str(folder))
+        os.rename(str(new), str(folder))
+        self.index.refresh()
+        self.assertEqual(self.index.metadata('kytos', 'of_core')['version'],
+                         '2.0')
+
+    def test_local_napp_edited(self):
+        """Editing the kytos.json of a local NApp (a symlink) is seen."""
+        local = self.tmp / 'src' / 'kytos' / 'flow_manager'
+        self._install(local, '1.0')
+        (self.installed / 'kytos' / 'flow_manager').symlink_to(local)
+        self.index.refresh()
+        self.assertEqual(
+            self.index.metadata('kytos', 'flow_manager')['version'], '1.0')
+
+        self._install(local, '1.1')
+        self.index.refresh()
+        self.assertEqual(
+            self.index.metadata('kytos', 'flow_manager')['version'], '1.1')
+
+    def test_invalidate(self):
+        """Invalidated users are scanned even if their stamps match."""
+        self.index.installed()
+        kytos_json = self.installed / 'kytos' / 'of_core' / 'kytos.json'
+        stat = kytos_json.stat()
+        self._install(kytos_json.parent, '3.0')
+        os.utime(str(kytos_json), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.index.invalidate('kytos')
+        self.assertEqual(self.index.metadata('kytos', 'of_core')['version'],
+                         '3.0')
+
+
+if __name__ == '__main__':
+    unittest.main()
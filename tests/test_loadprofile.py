@@ -0,0 +1,92 @@
+"""Tests of the import profiling of enabled NApps."""
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+
+from kytos.cli.commands.napps.modules import ModulesAPI
+from kytos.utils.napps import NAppsManager
+from tests.helpers import NAppsTestCase
+
+
+class TestProfileLoad(NAppsTestCase):
+    """Import each enabled NApp in a new interpreter."""
+
+    def setUp(self):
+        """Enable two NApps and a meta-package NApp depending on them."""
+        super().setUp()
+        self._install('kytos', 'of_core', 'import colorsys\n')
+        self._install('kytos', 'of_lldp', 'import wave\n',
+                      dependencies=['kytos/of_core'])
+        self._install('kytos', 'bundle', None,
+                      dependencies=['kytos/of_lldp', 'kytos/of_core'])
+        self.mgr = NAppsManager()
+        self.mgr.enable_napps(self.mgr.get_installed())
+
+    def _install(self, user, name, main, **kwargs):
+        """Install a NApp whose main.py is ``main`` (None for no modules)."""
+        self.install(user, name, **kwargs)
+        folder = self.installed / user / name
+        if main is None:
+            (folder / 'main.py').unlink()
+            (folder / 'settings.py').unlink()
+        else:
+            (folder / 'main.py').write_text(main)
+
+    def test_profile(self):
+        """NApps are imported after their dependencies, in order."""
+        results = self.mgr.profile_load()
+        self.assertEqual([(result['napp'], result['error'])
+                          for result in results],
+                         [('kytos/of_core', None), ('kytos/of_lldp', None),
+                          ('kytos/bundle', None)])
+        imports = [[module['module'] for module in result['imports']]
+                   for result in results]
+        self.assertIn('colorsys', imports[0])
+        self.assertIn('enabled.kytos.of_lldp.main', imports[1])
+        # Dependencies are loaded before measuring
+        self.assertNotIn('colorsys', imports[1])
+        self.assertNotIn('enabled.kytos.of_core.main', imports[1])
+
+    def test_meta_package(self):
+        """A NApp without settings.py and main.py takes no time."""
+        result, = self.mgr.profile_load([('kytos', 'bundle')])
+        self.assertIsNone(result['error'])
+        self.assertEqual((round(result['seconds'] * 1000), result['imports']),
+                         (0, []))
+
+    def test_errors(self):
+        """Import errors are reported and NApps must be enabled."""
+        (self.installed / 'kytos' / 'of_lldp' / 'main.py').write_text(
+            'import missing_module\n')
+        result, = self.mgr.profile_load([('kytos', 'of_lldp')])
+        self.assertIn('missing_module', result['error'])
+        self.assertIsNone(result['seconds'])
+
+        self.mgr.disable_napps([('kytos', 'bundle')])
+        with self.assertRaises(FileNotFoundError):
+            self.mgr.profile_load([('kytos', 'bundle')])
+
+    def test_command(self):
+        """The command prints the slowest NApps first."""
+        args = {'<napp>': [], '--top': '3', '--json': True}
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            ModulesAPI.profile_load(args)
+        results = json.loads(stdout.getvalue())
+        seconds = [result['seconds'] for result in results]
+        self.assertEqual(seconds, sorted(seconds, reverse=True))
+        self.assertTrue(all(len(result['imports']) <= 3
+                            for result in results))
+
+        args['--json'] = False
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            ModulesAPI.profile_load(args)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[0].split()[:3], ['NApp', '|', 'Import'])
+        self.assertEqual(len(lines), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests of the file locks shared by kytos processes."""
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from kytos.utils.lock import FileLock, locked
+
+# Exits with 1 if the lock file given as argument is locked by another process
+TRY_LOCK = '''
+import fcntl, sys
+with open(sys.argv[1], 'a') as lock_file:
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        sys.exit(1)
+'''
+
+
+class TestFileLock(unittest.TestCase):
+    """Exclude threads and processes changing the same files."""
+
+    def setUp(self):
+        """Use a temporary folder for the lock files."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.path = self.tmp / 'locks' / 'napp.lock'
+
+    def _locked_by_us(self, path):
+        """Whether another process can't lock ``path``."""
+        return subprocess.run([sys.executable, '-c', TRY_LOCK, str(path)],
+                              check=False).returncode == 1
+
+    def test_processes(self):
+        """Other processes wait until the lock is released."""
+        with FileLock(self.path):
+            self.assertTrue(self.path.exists())
+            self.assertTrue(self._locked_by_us(self.path))
+        self.assertFalse(self._locked_by_us(self.path))
+
+    def test_threads(self):
+        """Instances on the same path exclude each other's threads."""
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with FileLock(self.path):
+                acquired.set()
+                release.wait(10)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        self.assertTrue(acquired.wait(10))
+
+        def wait():
+            with FileLock(self.path):
+                pass
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        waiter.join(0.2)
+        self.assertTrue(waiter.is_alive())
+
+        release.set()
+        waiter.join(10)
+        self.assertFalse(waiter.is_alive())
+
+    def test_locked(self):
+        """Several locks are held at once, each path only once."""
+        other = self.tmp / 'locks' / 'other.lock'
+        with locked(FileLock(other), FileLock(self.path),
+                    FileLock(self.path)):
+            self.assertTrue(self._locked_by_us(self.path))
+            self.assertTrue(self._locked_by_us(other))
+        self.assertFalse(self._locked_by_us(self.path))
+        self.assertFalse(self._locked_by_us(other))
+
+    def test_unwritable(self):
+        """Locking is skipped if the lock file can't be created."""
+        (self.tmp / 'file').touch()
+        lock = FileLock(self.tmp / 'file' / 'napp.lock')
+        with lock:
+            pass
+        # The thread lock was released
+        with lock:
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
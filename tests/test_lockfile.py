@@ -0,0 +1,105 @@
+"""Tests of the lockfile of pinned NApps."""
+import hashlib
+import json
+from unittest import mock
+
+from kytos.cli.commands.napps.lockfile import LockfileAPI
+from kytos.cli.commands.napps.parser import call
+from kytos.utils.napps import NAppsManager
+from tests.helpers import NAppsTestCase
+
+
+class TestLockfile(NAppsTestCase):
+    """Pin NApps in a lockfile and install them from it."""
+
+    def setUp(self):
+        """Publish kytos/of_lldp, which depends on kytos/of_core."""
+        super().setUp()
+        self.server = self.serve()
+        self.publish(self.server, 'kytos', 'of_core', '1.0')
+        self.publish(self.server, 'kytos', 'of_lldp', '2.0',
+                     dependencies=['kytos/of_core'])
+        self.lockfile = str(self.root / 'napps.lock')
+        with self.assertLogs('kytos.cli.commands.napps.lockfile'):
+            LockfileAPI.lock({'<napp>': [('kytos', 'of_lldp', None)],
+                              '--lockfile': self.lockfile})
+
+    def _install(self, logger='kytos'):
+        """Run "install --locked", returning the exit status and logs."""
+        args = {'<napp>': [], '--locked': True, '--lockfile': self.lockfile,
+                '--offline': False}
+        with self.assertLogs(logger) as logs:
+            try:
+                call('install', args)
+            except SystemExit as exception:
+                return exception.code, logs.output
+        return 0, logs.output
+
+    def _installed(self):
+        mgr = NAppsManager()
+        return {napp: mgr.get_version(*napp) for napp in mgr.get_installed()}
+
+    def test_lock(self):
+        """NApps are pinned with their dependencies, hashes and order."""
+        with open(self.lockfile) as lockfile:
+            data = json.load(lockfile)
+        package = self.server.packages[('kytos', 'of_lldp')]
+        self.assertEqual(data['napps']['kytos/of_lldp'], {
+            'version': '2.0', 'sha256': hashlib.sha256(package).hexdigest(),
+            'size': len(package), 'dependencies': ['kytos/of_core']})
+        self.assertEqual(data['napps']['kytos/of_core']['version'], '1.0')
+        self.assertEqual(data['levels'], [['kytos/of_core'],
+                                          ['kytos/of_lldp']])
+
+    def test_install_locked(self):
+        """Pinned NApps are installed and enabled once."""
+        self.assertEqual(self._install()[0], 0)
+        self.assertEqual(self._installed(), {('kytos', 'of_core'): '1.0',
+                                             ('kytos', 'of_lldp'): '2.0'})
+        self.assertEqual(len(NAppsManager().get_enabled()), 2)
+
+        # Published versions don't matter once pinned
+        self.publish(self.server, 'kytos', 'of_lldp', '3.0')
+        status, logs = self._install('kytos.cli.commands.napps.lockfile')
+        self.assertEqual(status, 0)
+        self.assertEqual(logs, ['INFO:kytos.cli.commands.napps.lockfile:'
+                                'All NApps of {} are installed.'.format(
+                                    self.lockfile)])
+
+    def test_hash_mismatch(self):
+        """Nothing is installed if a package doesn't match its hash."""
+        self.publish(self.server, 'kytos', 'of_lldp', '2.0', files=1)
+        # A package matching the lockfile is used without downloading it
+        NAppsManager().cache.prune(0)
+        status, logs = self._install()
+        self.assertEqual(status, 1)
+        self.assertTrue(any('kytos/of_lldp' in line and
+                            'does not match the lockfile hash' in line
+                            for line in logs), logs)
+        self.assertEqual(logs[-1], 'ERROR:kytos.cli.commands.napps.lockfile:'
+                                   'Nothing was installed.')
+        self.assertEqual(self._installed(), {})
+
+    def test_skip_dependents(self):
+        """NApps depending on one that could not be installed are skipped."""
+        install_remote = NAppsManager.install_remote
+
+        def fail_of_core(mgr):
+            if mgr.napp == 'of_core':
+                raise OSError('No space left on device')
+            install_remote(mgr)
+
+        with mock.patch.object(NAppsManager, 'install_remote', fail_of_core):
+            status, logs = self._install()
+        self.assertEqual(status, 1)
+        self.assertIn('ERROR:kytos.utils.resolver:    kytos/of_lldp: '
+                      'Skipped, depends on kytos/of_core.', logs)
+        self.assertEqual(self._installed(), {})
+
+    def test_invalid_lockfile(self):
+        """A lockfile that can't be read fails the command."""
+        with open(self.lockfile, 'w') as lockfile:
+            lockfile.write('{"version": 0}')
+        status, logs = self._install()
+        self.assertEqual(status, 1)
+        self.assertIn('Unsupported lockfile', logs[0])
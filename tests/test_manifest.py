@@ -0,0 +1,62 @@
+"""Tests of the per-file manifest of NApp packages."""
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from kytos.utils.manifest import (MMAP_THRESHOLD, build_manifest, hash_file,
+                                  unchanged_files)
+
+
+class TestManifest(unittest.TestCase):
+    """Build manifests and find the files an upgrade must write."""
+
+    def setUp(self):
+        """Create a NApp folder."""
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.root))
+        (self.root / 'ui').mkdir()
+        (self.root / 'main.py').write_text('x = 1\n')
+        (self.root / 'settings.py').write_text('A = 1\n')
+        (self.root / 'ui' / 'panel.kytos').write_text('<template/>\n')
+        (self.root / 'link.py').symlink_to('main.py')
+
+    def _files(self):
+        """Return (path, arcname) of every entry of the folder."""
+        return [(str(path), str(path.relative_to(self.root)))
+                for path in sorted(self.root.rglob('*'))]
+
+    def test_build(self):
+        """Only regular files are listed, with their hash and size."""
+        manifest = build_manifest(self._files())
+        self.assertEqual(manifest['version'], 1)
+        self.assertEqual(sorted(manifest['files']),
+                         ['main.py', 'settings.py', 'ui/panel.kytos'])
+        self.assertEqual(manifest['files']['main.py'], {
+            'sha256': hashlib.sha256(b'x = 1\n').hexdigest(), 'size': 6})
+
+    def test_hash_large_file(self):
+        """Memory-mapped large files hash as read ones."""
+        content = os.urandom(MMAP_THRESHOLD + 1)
+        path = self.root / 'big.bin'
+        path.write_bytes(content)
+        self.assertEqual(hash_file(path), hashlib.sha256(content).hexdigest())
+
+    def test_delta(self):
+        """Changed, resized and missing files are not unchanged."""
+        manifest = build_manifest(self._files())
+        (self.root / 'main.py').write_text('x = 2\n')  # Same size
+        (self.root / 'settings.py').write_text('A = 10\n')
+        (self.root / 'ui' / 'panel.kytos').unlink()
+        self.assertEqual(unchanged_files(self.root, manifest), set())
+
+        manifest['files']['new.py'] = manifest['files']['main.py']
+        (self.root / 'main.py').write_text('x = 1\n')
+        (self.root / 'new.py').symlink_to('main.py')
+        self.assertEqual(unchanged_files(self.root, manifest), {'main.py'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests of the local mirror of the NApps Server."""
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+
+from kytos.utils.mirror import NAppsMirror
+from kytos.utils.session import FileAdapter
+
+#: Catalog of the NApps Server
+NAPPS = [{'username': 'kytos', 'name': 'of_core', 'version': '1.0',
+          'napp_dependencies': []},
+         {'username': 'kytos', 'name': 'of_lldp', 'version': '2.0',
+          'napp_dependencies': ['kytos/of_core']},
+         {'username': 'amlight', 'name': 'sdntrace', 'version': '3.0',
+          'napp_dependencies': []}]
+
+
+class FakeClient:  # pylint: disable=too-few-public-methods
+    """NApps client serving ``NAPPS`` with the ETag "v1"."""
+
+    def __init__(self):
+        """Record the ETags of the requests."""
+        self.requests = []
+
+    def get_napps_if_changed(self, etag=None):
+        """Return (napps, etag), napps being None if ``etag`` is current."""
+        self.requests.append(etag)
+        return (None if etag == '"v1"' else NAPPS), '"v1"'
+
+
+class TestNAppsMirror(unittest.TestCase):
+    """Mirror the catalog and packages into a folder."""
+
+    def setUp(self):
+        """Publish the packages of ``NAPPS`` in a file:// repository."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.repo = self.tmp / 'repo'
+        for napp in NAPPS:
+            folder = self.repo / napp['username']
+            folder.mkdir(parents=True, exist_ok=True)
+            for version in 'latest', napp['version']:
+                (folder / '{}-{}.napp'.format(napp['name'], version)) \
+                    .write_text(version)
+
+        session = requests.Session()
+        self.addCleanup(session.close)
+        session.mount('file://', FileAdapter())
+        self.client = FakeClient()
+        self.mirror = NAppsMirror(self.tmp / 'mirror', self.client, session,
+                                  self.repo.as_uri())
+
+    def test_sync_all(self):
+        """Every NApp gets its latest and versioned packages."""
+        report = self.mirror.sync()
+        self.assertEqual(report, [
+            ('amlight/sdntrace-3.0.napp', 'downloaded'),
+            ('amlight/sdntrace-latest.napp', 'downloaded'),
+            ('kytos/of_core-1.0.napp', 'downloaded'),
+            ('kytos/of_core-latest.napp', 'downloaded'),
+            ('kytos/of_lldp-2.0.napp', 'downloaded'),
+            ('kytos/of_lldp-latest.napp', 'downloaded')])
+        packages = self.tmp / 'mirror' / 'repo'
+        self.assertEqual((packages / 'kytos' / 'of_lldp-2.0.napp')
+                         .read_text(), '2.0')
+
+        api = self.tmp / 'mirror' / 'api' / 'napps'
+        self.assertEqual(json.loads((api / 'index.json').read_text()),
+                         {'napps': NAPPS})
+        self.assertEqual(json.loads(
+            (api / 'kytos' / 'of_lldp' / 'index.json').read_text()), NAPPS[1])
+
+    def test_incremental(self):
+        """A second sync revalidates the catalog and latest packages."""
+        self.mirror.sync()
+        self.assertEqual({status for _, status in self.mirror.sync()},
+                         {'unchanged'})
+        self.assertEqual(self.client.requests, [None, '"v1"'])
+
+        (self.repo / 'kytos' / 'of_core-latest.napp').write_text('1.1')
+        report = dict(self.mirror.sync())
+        self.assertEqual(report['kytos/of_core-latest.napp'], 'downloaded')
+        self.assertEqual(report['kytos/of_core-1.0.napp'], 'unchanged')
+
+    def test_sync_napps(self):
+        """Selected NApps are mirrored with their dependencies."""
+        report = self.mirror.sync([('kytos', 'of_lldp', None),
+                                   ('amlight', 'sdntrace', '3.0'),
+                                   ('kytos', 'gone', None)])
+        self.assertEqual(report, [
+            ('amlight/sdntrace-3.0.napp', 'downloaded'),
+            ('kytos/gone', 'not found'),
+            ('kytos/of_core-1.0.napp', 'downloaded'),
+            ('kytos/of_core-latest.napp', 'downloaded'),
+            ('kytos/of_lldp-2.0.napp', 'downloaded'),
+            ('kytos/of_lldp-latest.napp', 'downloaded')])
+
+    def test_missing_package(self):
+        """Packages the server doesn't have are reported."""
+        (self.repo / 'kytos' / 'of_core-1.0.napp').unlink()
+        report = dict(self.mirror.sync())
+        self.assertIn('404', report['kytos/of_core-1.0.napp'])
+        self.assertEqual(report['kytos/of_core-latest.napp'], 'downloaded')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Tests of the NAppsManager."""
+import unittest
+
+from kytos.utils.napps import NAppsManager
+from tests.helpers import NAppsTestCase
+
+
+class TestEnableDisable(NAppsTestCase):
+    """Enable and disable NApps in a single pass."""
+
+    def setUp(self):
+        """Install kytos/of_core and two NApps depending on it."""
+        super().setUp()
+        self.install('kytos', 'of_core')
+        self.install('kytos', 'of_lldp', dependencies=['kytos/of_core'])
+        self.install('amlight', 'sdntrace', dependencies=['kytos/of_lldp'])
+        self.mgr = NAppsManager()
+
+    def test_enable(self):
+        """Dependencies are enabled first, each NApp once."""
+        napps = [('amlight', 'sdntrace'), ('kytos', 'of_core'),
+                 ('kytos', 'of_lldp'), ('amlight', 'sdntrace')]
+        self.assertEqual(self.mgr.enable_napps(napps),
+                         [('kytos', 'of_core'), ('kytos', 'of_lldp'),
+                          ('amlight', 'sdntrace')])
+        self.assertEqual(len(self.mgr.get_enabled()), 3)
+        self.assertTrue((self.enabled / 'amlight' / '__init__.py').is_file())
+        self.assertEqual((self.enabled / 'kytos' / 'of_core').resolve(),
+                         (self.installed / 'kytos' / 'of_core').resolve())
+        # Enabled NApps are left alone
+        self.assertEqual(self.mgr.enable_napps(napps), [])
+
+    def test_enable_not_installed(self):
+        """Nothing is enabled if a NApp is not installed."""
+        with self.assertRaises(FileNotFoundError):
+            self.mgr.enable_napps([('kytos', 'of_core'), ('kytos', 'gone')])
+        self.assertEqual(self.mgr.get_enabled(), [])
+
+    def test_enable_rollback(self):
+        """Symlinks already created are removed if one fails."""
+        (self.enabled / 'amlight').write_text('not a folder')
+        with self.assertRaises(OSError):
+            self.mgr.enable_napps([('kytos', 'of_core'), ('kytos', 'of_lldp'),
+                                   ('amlight', 'sdntrace')])
+        self.assertEqual(self.mgr.get_enabled(), [])
+        self.assertFalse((self.enabled / 'kytos' / 'of_core').is_symlink())
+
+    def test_disable(self):
+        """Dependents are disabled first."""
+        self.mgr.enable_napps(self.mgr.get_installed())
+        self.assertEqual(
+            self.mgr.disable_napps([('kytos', 'of_core'),
+                                    ('amlight', 'sdntrace'),
+                                    ('kytos', 'of_lldp')]),
+            [('amlight', 'sdntrace'), ('kytos', 'of_lldp'),
+             ('kytos', 'of_core')])
+        self.assertEqual(self.mgr.get_enabled(), [])
+        self.assertEqual(len(self.mgr.get_installed()), 3)
+        self.assertEqual(self.mgr.disable_napps([('kytos', 'of_core')]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests of the OpenAPI parsing of NApp ``@rest`` endpoints."""
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    from kytos.utils.openapi import OpenAPI
+except ImportError:  # kytos.core is not installed
+    OpenAPI = None
+
+MAIN = '''
+"""Main module of kytos/of_core."""
+from kytos.core import KytosNApp, rest
+
+from napps.kytos.of_core import settings
+from . import helpers
+from .v0x04 import utils
+
+
+class Main(KytosNApp):
+    """Main class."""
+
+    @rest('/flows/<dpid>',
+          methods=['GET',
+                   'POST'])
+    def flows(self, dpid):
+        """List flows."""
+
+    @rest(rule='switches/<dpid>')
+    @rest('switches', methods=('DELETE',))
+    async def switches(self):
+        """Delete switches."""
+
+    @rest(RULE)
+    def dynamic(self):
+        """Not a literal rule."""
+'''
+
+HELPERS = '''
+from kytos.core import rest
+
+
+@rest('helpers')
+def helper():
+    """Helper endpoint."""
+'''
+
+
+@unittest.skipIf(OpenAPI is None, 'kytos.core is not installed')
+class TestOpenAPI(unittest.TestCase):
+    """Find the endpoints of a NApp without importing it."""
+
+    def setUp(self):
+        """Write a NApp whose main module imports others."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.napp = self.tmp / 'of_core'
+        (self.napp / 'v0x04').mkdir(parents=True)
+        (self.napp / 'kytos.json').write_text(json.dumps(
+            {'username': 'kytos', 'name': 'of_core'}))
+        (self.napp / 'main.py').write_text(MAIN)
+        (self.napp / 'settings.py').write_text('from .helpers import x\n')
+        (self.napp / 'helpers.py').write_text(HELPERS)
+        (self.napp / 'v0x04' / '__init__.py').write_text('')
+        (self.napp / 'v0x04' / 'utils.py').write_text(
+            '@rest("v0x04", methods=["PUT"])\ndef utils():\n    pass\n')
+
+    def _endpoints(self):
+        """Return the endpoints parsed by a new OpenAPI object."""
+        openapi = OpenAPI(self.napp, self.tmp,
+                          cache_path=str(self.tmp / 'cache'))
+        return list(openapi._parse_module('main.py'))  # pylint: disable=W0212
+
+    def test_decorators(self):
+        """Multi-line and keyword decorators are parsed, others skipped."""
+        result = OpenAPI._parse_decorated_functions(  # pylint: disable=W0212
+            MAIN.encode())
+        self.assertEqual([list(endpoint[:2])
+                          for endpoint in result['endpoints']],
+                         [['/flows/<dpid>', ['GET', 'POST']],
+                          ['switches/<dpid>', None],
+                          ['switches', ['DELETE']]])
+        self.assertEqual(result['endpoints'][0][2], 'List flows.')
+
+    def test_imports(self):
+        """Relative and napps.* imports of NApp modules are followed."""
+        self.assertEqual([list(endpoint[:2])
+                          for endpoint in self._endpoints()],
+                         [['/flows/<dpid>', ['GET', 'POST']],
+                          ['switches/<dpid>', None],
+                          ['switches', ['DELETE']],
+                          ['helpers', None],
+                          ['v0x04', ['PUT']]])
+
+    def test_cache(self):
+        """Modules are parsed again only if their content changes."""
+        self._endpoints()
+        self.assertEqual(len(list((self.tmp / 'cache').glob('*.json'))), 5)
+        with mock.patch.object(OpenAPI, '_parse_decorated_functions',
+                               side_effect=AssertionError):
+            self.assertEqual(len(self._endpoints()), 5)
+
+        (self.napp / 'helpers.py').write_text('x = 1\n')
+        self.assertEqual(len(self._endpoints()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
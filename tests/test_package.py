@@ -0,0 +1,147 @@
+"""Tests of building, downloading and extracting .napp packages."""
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from kytos.utils.manifest import MANIFEST_FILE
+from kytos.utils.package import build_package, extract_package, package_files
+
+
+class TestBuildPackage(unittest.TestCase):
+    """Build reproducible packages."""
+
+    def setUp(self):
+        """Create a NApp folder with files that must not be packaged."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.napp = self._napp(self.tmp / 'first')
+
+    @staticmethod
+    def _napp(folder):
+        """Write a NApp into ``folder`` and return it."""
+        for subfolder in 'ui', '__pycache__', '.git', 'ui/__pycache__':
+            (folder / subfolder).mkdir(parents=True, exist_ok=True)
+        (folder / 'kytos.json').write_text('{"name": "of_core"}\n')
+        (folder / 'main.py').write_text('x = 1\n')
+        (folder / 'run.sh').write_text('#!/bin/sh\n')
+        (folder / 'run.sh').chmod(0o700)
+        (folder / 'ui' / 'panel.kytos').write_text('<template/>\n')
+        (folder / 'ui' / '__pycache__' / 'x.pyc').write_bytes(b'')
+        (folder / '.git' / 'HEAD').write_text('ref\n')
+        (folder / 'old.napp').write_bytes(b'')
+        return folder
+
+    def _build(self, folder):
+        """Return the bytes of the package of ``folder``."""
+        with build_package('of_core', str(folder)) as package:
+            return package.read()
+
+    def test_same_bytes(self):
+        """Packages only depend on the content of the files."""
+        other = self._napp(self.tmp / 'second')
+        os.utime(str(other / 'main.py'), (0, 1234567890))
+        (other / 'main.py').chmod(0o600)
+        self.assertEqual(self._build(self.napp), self._build(other))
+
+        (other / 'main.py').write_text('x = 2\n')
+        self.assertNotEqual(self._build(self.napp), self._build(other))
+
+    def test_entries(self):
+        """The manifest comes first, then the sorted files, normalized."""
+        with mock.patch.dict(os.environ, {'SOURCE_DATE_EPOCH': '1000'}), \
+                build_package('of_core', str(self.napp)) as package, \
+                tarfile.open(fileobj=package) as tar:
+            members = tar.getmembers()
+            manifest = json.load(tar.extractfile(MANIFEST_FILE))
+        self.assertEqual([member.name for member in members],
+                         [MANIFEST_FILE, 'kytos.json', 'main.py', 'run.sh',
+                          'ui', 'ui/panel.kytos'])
+        self.assertEqual(sorted(manifest['files']),
+                         ['kytos.json', 'main.py', 'run.sh',
+                          'ui/panel.kytos'])
+        self.assertEqual({(member.mtime, member.uid, member.uname)
+                          for member in members}, {(1000, 0, '')})
+        modes = {member.name: member.mode for member in members}
+        self.assertEqual((modes['main.py'], modes['run.sh'], modes['ui']),
+                         (0o644, 0o755, 0o755))
+
+    def test_package_files(self):
+        """Ignored files and folders are skipped at any depth."""
+        self.assertEqual([arcname for _, arcname in
+                          package_files(str(self.napp))],
+                         ['kytos.json', 'main.py', 'run.sh', 'ui',
+                          'ui/panel.kytos'])
+
+
+class TestExtractPackage(unittest.TestCase):
+    """Extract packages, upgrading installed NApps in place."""
+
+    def setUp(self):
+        """Install version 1.0 of a NApp."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.src = self.tmp / 'src'
+        self.src.mkdir()
+        (self.src / 'main.py').write_text('x = 1\n')
+        (self.src / 'settings.py').write_text('A = 1\n')
+        (self.src / 'old.py').write_text('old\n')
+        self.installed = self.tmp / '1.0'
+        self._extract(self.installed)
+
+    def _extract(self, folder, installed=None):
+        """Package ``self.src`` and extract it into ``folder``."""
+        with build_package('napp', str(self.src)) as package:
+            extract_package(package, folder, installed)
+
+    def test_extract(self):
+        """A new NApp gets every file but the manifest."""
+        self.assertEqual(sorted(os.listdir(str(self.installed))),
+                         ['main.py', 'old.py', 'settings.py'])
+
+    def test_upgrade(self):
+        """Only changed files are written, unchanged ones are linked."""
+        (self.src / 'main.py').write_text('x = 2\n')
+        (self.src / 'old.py').unlink()
+        (self.src / 'new.py').write_text('new\n')
+        with self.assertLogs('kytos.utils.package') as logs:
+            self._extract(self.tmp / '2.0', self.installed)
+        self.assertEqual(logs.output, ['INFO:kytos.utils.package:'
+                                       '    2 of 3 files changed.'])
+
+        upgraded = self.tmp / '2.0'
+        self.assertEqual(sorted(os.listdir(str(upgraded))),
+                         ['main.py', 'new.py', 'settings.py'])
+        self.assertEqual((upgraded / 'main.py').read_text(), 'x = 2\n')
+        self.assertTrue(os.path.samefile(str(upgraded / 'settings.py'),
+                                         str(self.installed / 'settings.py')))
+        # The installed version is left untouched
+        self.assertEqual((self.installed / 'main.py').read_text(), 'x = 1\n')
+        self.assertTrue((self.installed / 'old.py').exists())
+
+    def test_manifest_mismatch(self):
+        """A file that doesn't match the manifest fails the upgrade."""
+        (self.src / 'main.py').write_text('x = 2\n')
+        with build_package('napp', str(self.src)) as package:
+            content = package.read()
+        with tarfile.open(fileobj=io.BytesIO(content)) as tar:
+            manifest = tar.extractfile(MANIFEST_FILE).read()
+        package = io.BytesIO()
+        with tarfile.open(fileobj=package, mode='w:xz') as tar:
+            for name, data in (MANIFEST_FILE, manifest), ('main.py', b'x'):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        package.seek(0)
+        with self.assertRaisesRegex(tarfile.TarError, 'main.py'):
+            extract_package(package, self.tmp / '2.0', self.installed)
+        self.assertEqual((self.installed / 'main.py').read_text(), 'x = 1\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
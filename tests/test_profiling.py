@@ -0,0 +1,138 @@
+"""Tests of the timing of the phases of kytos commands."""
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from kytos.utils import profiling
+from kytos.utils.profiling import TimedReader, span, timed
+
+
+class TestProfiling(unittest.TestCase):
+    """Record spans only while profiling is enabled."""
+
+    def setUp(self):
+        """Start each test with profiling disabled."""
+        patcher = mock.patch.object(profiling, '_PROFILER', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_disabled(self):
+        """Spans cost nothing and record nothing by default."""
+        with span('install'):
+            pass
+        self.assertIsNone(profiling.get_profiler())
+
+    def test_phases(self):
+        """Spans are aggregated by name in order of first start."""
+        profiler = profiling.enable()
+        self.assertIs(profiling.enable(), profiler)
+
+        @timed('download')
+        def download():
+            return 'package'
+
+        with span('install', napp='kytos/of_core'):
+            self.assertEqual(download(), 'package')
+            download()
+        with self.assertRaises(ValueError), span('enable'):
+            raise ValueError
+        phases = profiler.phases()
+        self.assertEqual([(name, count) for name, count, _, _ in phases],
+                         [('install', 1), ('download', 2), ('enable', 1)])
+        _, _, total, maximum = phases[1]
+        self.assertLessEqual(maximum, total)
+        self.assertLessEqual(total, phases[0][2])
+        self.assertEqual(profiler.events[-2]['args'],
+                         {'napp': 'kytos/of_core'})
+
+        report = profiler.report().splitlines()
+        self.assertEqual(report[0].split(),
+                         ['Phase', 'Count', 'Total', 'ms', 'Max', 'ms'])
+        self.assertEqual([line.split()[0] for line in report[1:]],
+                         ['install', 'download', 'enable', 'wall'])
+
+    def test_threads(self):
+        """Spans of every thread are recorded with their thread id."""
+        profiler = profiling.enable()
+        threads = [threading.Thread(target=timed('download')(lambda: None))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(profiler.phases()[0][:2], ('download', 4))
+        self.assertNotIn(threading.get_ident(),
+                         {event['tid'] for event in profiler.events})
+
+    def test_trace(self):
+        """Spans are saved as complete events in microseconds."""
+        profiler = profiling.enable()
+        with span('install', napp='kytos/of_core'):
+            pass
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        filename = os.path.join(folder, 'trace.json')
+        profiler.write_trace(filename)
+        with open(filename) as trace:
+            events = json.load(trace)['traceEvents']
+        self.assertEqual(len(events), 1)
+        self.assertEqual((events[0]['name'], events[0]['ph'],
+                          events[0]['pid'], events[0]['args']),
+                         ('install', 'X', os.getpid(),
+                          {'napp': 'kytos/of_core'}))
+        self.assertAlmostEqual(events[0]['dur'],
+                               profiler.events[0]['duration'] * 1e6, 0)
+
+    def test_timed_reader(self):
+        """The reads of a stream are recorded as one span when closed."""
+        profiler = profiling.enable()
+        stream = io.BytesIO(b'0123456789')
+        reader = TimedReader(stream, 'download', napp='kytos/of_core')
+        self.assertEqual(reader.read(4) + reader.read(), b'0123456789')
+        self.assertEqual(profiler.events, [])
+        reader.close()
+        reader.close()
+        self.assertEqual(profiler.phases()[0][:2], ('download', 1))
+        self.assertFalse(stream.closed)
+
+        TimedReader(stream, 'unused').close()
+        self.assertEqual(len(profiler.events), 1)
+
+
+class TestProfileOption(unittest.TestCase):
+    """Report the phases of a command run with ``kytos --profile``."""
+
+    def test_profile(self):
+        """The report goes to stderr and the trace to a file."""
+        home = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(home))
+        config_file = home / 'kytosrc'
+        config_file.write_text('[napps]\ncache_dir = {}\n'.format(
+            home / 'cache'))
+        root = Path(__file__).resolve().parents[1]
+        kytos = root / 'bin' / 'kytos'
+        env = dict(os.environ, HOME=str(home), PYTHONPATH=str(root),
+                   KYTOS_AGENT_SOCKET=str(home / 'agent.sock'))
+        result = subprocess.run(
+            [sys.executable, str(kytos), '--config', str(config_file),
+             '--profile', '--trace', str(home / 'trace.json'),
+             'napps', 'cache', 'ls'], env=env, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout, 'No cached NApps found.\n')
+        self.assertTrue(result.stderr.startswith('Phase'), result.stderr)
+        self.assertIn('\nwall ', result.stderr)
+        with (home / 'trace.json').open() as trace:
+            self.assertIn('traceEvents', json.load(trace))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""Tests of the caching proxy of the NApps Server."""
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import requests
+
+from kytos.utils.proxy import CacheProxy, ProxyServer
+from kytos.utils.session import FileAdapter
+
+
+class ProxyTestCase(unittest.TestCase):
+    """Proxy a file:// NApps Server."""
+
+    def setUp(self):
+        """Create a file:// NApps Server and a proxy with no TTL."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.tmp))
+        self.upstream = self.tmp / 'upstream'
+        (self.upstream / 'api' / 'napps').mkdir(parents=True)
+        (self.upstream / 'repo' / 'kytos').mkdir(parents=True)
+        self._publish('api/napps/index.json', '{"napps": []}')
+        self._publish('repo/kytos/of_core-1.0.napp', '1.0')
+        self._publish('repo/kytos/of_core-latest.napp', '1.0')
+
+        self.session = requests.Session()
+        self.addCleanup(self.session.close)
+        self.session.mount('file://', FileAdapter())
+        self.proxy = CacheProxy((self.upstream / 'api').as_uri() + '/',
+                                (self.upstream / 'repo').as_uri(),
+                                str(self.tmp / 'cache'), self.session, ttl=0)
+
+    def _publish(self, path, content):
+        """Write ``content`` into ``path`` of the upstream folder."""
+        (self.upstream / path).write_text(content)
+
+
+class TestCacheProxy(ProxyTestCase):
+    """Cache the NApps Server API and repository on disk."""
+
+    def _get(self, path):
+        """Return (cache, content) of a request path."""
+        _, body, cache = self.proxy.get(self.proxy.upstream_url(path))
+        return cache, body.read_text()
+
+    def test_upstream_url(self):
+        """The first path segment selects the upstream."""
+        self.assertEqual(self.proxy.upstream_url('/repo/kytos/x.napp'),
+                         (self.upstream / 'repo/kytos/x.napp').as_uri())
+        self.assertEqual(self.proxy.upstream_url('/api/napps/'),
+                         (self.upstream / 'api/napps/').as_uri() + '/')
+        self.assertIsNone(self.proxy.upstream_url('/other/napps/'))
+
+    def test_versioned(self):
+        """Versioned packages are fetched once."""
+        path = '/repo/kytos/of_core-1.0.napp'
+        self.assertEqual(self._get(path), ('MISS', '1.0'))
+        self._publish('repo/kytos/of_core-1.0.napp', 'changed')
+        self.assertEqual(self._get(path), ('HIT', '1.0'))
+
+    def test_revalidate(self):
+        """Mutable content is revalidated with its ETag once stale."""
+        path = '/repo/kytos/of_core-latest.napp'
+        self.assertEqual(self._get(path), ('MISS', '1.0'))
+        self.assertEqual(self._get(path), ('REVALIDATED', '1.0'))
+        self._publish('repo/kytos/of_core-latest.napp', '1.1.0')
+        self.assertEqual(self._get(path), ('MISS', '1.1.0'))
+
+        self.proxy.ttl = 60
+        self.assertEqual(self._get(path), ('HIT', '1.1.0'))
+
+    def test_stale(self):
+        """Cached content is served while upstream is unreachable."""
+        self._get('/api/napps/')
+        with mock.patch.object(self.session, 'get', side_effect=requests
+                               .exceptions.ConnectionError('down')), \
+                self.assertLogs('kytos.utils.proxy', 'WARNING'):
+            self.assertEqual(self._get('/api/napps/'),
+                             ('STALE', '{"napps": []}'))
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self._get('/repo/kytos/of_core-latest.napp')
+
+    def test_not_found(self):
+        """Errors of upstream are passed on and not cached."""
+        entry, body, _ = self.proxy.get(
+            self.proxy.upstream_url('/repo/kytos/gone-latest.napp'))
+        self.assertEqual((entry['status'], body), (404, None))
+        self._publish('repo/kytos/gone-latest.napp', 'back')
+        self.assertEqual(self._get('/repo/kytos/gone-latest.napp'),
+                         ('MISS', 'back'))
+
+
+class TestProxyServer(ProxyTestCase):
+    """Serve a CacheProxy over HTTP."""
+
+    def setUp(self):
+        """Serve the proxy on a free port."""
+        super().setUp()
+        server = ProxyServer(('127.0.0.1', 0), self.proxy)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = 'http://127.0.0.1:{}'.format(server.server_port)
+        self.client = requests.Session()
+        self.addCleanup(self.client.close)
+
+    def test_http(self):
+        """Responses carry the upstream headers and the cache status."""
+        with self.assertLogs('kytos.utils.proxy'):
+            response = self.client.get(self.url + '/api/napps/')
+            self.assertEqual((response.status_code, response.text,
+                              response.headers['X-Cache']),
+                             (200, '{"napps": []}', 'MISS'))
+            self.assertEqual(response.headers['Content-Type'],
+                             'application/json')
+
+            etag = response.headers['ETag']
+            response = self.client.get(self.url + '/api/napps/',
+                                       headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.head(
+                self.url + '/repo/kytos/of_core-1.0.napp')
+            self.assertEqual((response.status_code,
+                              response.headers['Content-Length']),
+                             (200, '3'))
+
+            # Unknown upstream and upstream error
+            for path in '/other/', '/repo/kytos/gone':
+                self.assertEqual(self.client.get(self.url + path).status_code,
+                                 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
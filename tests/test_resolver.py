@@ -0,0 +1,135 @@
+"""Tests of the dependency resolution of NApps."""
+import unittest
+
+from kytos.utils.exceptions import KytosException
+from kytos.utils.resolver import (DependencyResolver, dependency_order,
+                                  installable)
+
+
+def metadata(graph, calls=None):
+    """Return a ``get_metadata`` function of {napp_id: [dependencies]}.
+
+    Requested NApp ids are appended to ``calls``, if given.
+    """
+    def get_metadata(user, napp):
+        napp_id = '{}/{}'.format(user, napp)
+        if calls is not None:
+            calls.append(napp_id)
+        if napp_id not in graph:
+            return None
+        return {'username': user, 'name': napp,
+                'napp_dependencies': graph[napp_id]}
+    return get_metadata
+
+
+class TestDependencyResolver(unittest.TestCase):
+    """Resolve dependency graphs into install levels."""
+
+    graph = {'kytos/root': ['kytos/mid_a', 'kytos/mid_b'],
+             'kytos/mid_a': ['kytos/base'],
+             'kytos/mid_b': ['kytos/base'],
+             'kytos/base': [],
+             'kytos/other': []}
+
+    def test_levels(self):
+        """Dependencies come in earlier levels than their dependents."""
+        resolver = DependencyResolver(metadata(self.graph))
+        levels = resolver.resolve([('kytos', 'root', '2.0'),
+                                   ('kytos', 'other', None)])
+        self.assertEqual(levels, [[('kytos', 'base', None),
+                                   ('kytos', 'other', None)],
+                                  [('kytos', 'mid_a', None),
+                                   ('kytos', 'mid_b', None)],
+                                  [('kytos', 'root', '2.0')]])
+        self.assertEqual(resolver.graph[('kytos', 'root')],
+                         {('kytos', 'mid_a'), ('kytos', 'mid_b')})
+        self.assertEqual(resolver.missing, set())
+
+    def test_fetched_once(self):
+        """Shared dependencies and requested ones are fetched once."""
+        calls = []
+        resolver = DependencyResolver(metadata(self.graph, calls))
+        resolver.resolve([('kytos', 'root', None), ('kytos', 'mid_a', None)])
+        self.assertEqual(sorted(calls), ['kytos/base', 'kytos/mid_a',
+                                         'kytos/mid_b', 'kytos/root'])
+
+    def test_exclude(self):
+        """Excluded NApps, e.g. installed ones, are left out."""
+        resolver = DependencyResolver(metadata(self.graph),
+                                      exclude={('kytos', 'base'),
+                                               ('kytos', 'mid_b')})
+        levels = resolver.resolve([('kytos', 'root', None)])
+        self.assertEqual(levels, [[('kytos', 'mid_a', None)],
+                                  [('kytos', 'root', None)]])
+
+    def test_missing(self):
+        """NApps not found are reported and left out of the levels."""
+        graph = {'kytos/root': ['kytos/gone']}
+        resolver = DependencyResolver(metadata(graph))
+        levels = resolver.resolve([('kytos', 'root', None)])
+        self.assertEqual(levels, [[('kytos', 'root', None)]])
+        self.assertEqual(resolver.missing, {('kytos', 'gone')})
+
+    def test_cycle(self):
+        """A dependency cycle is an error naming the cycle."""
+        graph = {'kytos/aaa': ['kytos/bbb'], 'kytos/bbb': ['kytos/aaa']}
+        resolver = DependencyResolver(metadata(graph))
+        with self.assertRaisesRegex(KytosException, 'kytos/aaa -> kytos/bbb'):
+            resolver.resolve([('kytos', 'aaa', None)])
+
+    def test_version_conflict(self):
+        """A NApp can't be requested with two versions."""
+        resolver = DependencyResolver(metadata(self.graph))
+        with self.assertRaises(KytosException):
+            resolver.resolve([('kytos', 'base', '1.0'),
+                              ('kytos', 'base', '2.0')])
+
+
+class TestInstallable(unittest.TestCase):
+    """Skip the dependents of NApps that could not be installed."""
+
+    def test_dependents_skipped(self):
+        """Direct and indirect dependents of a failed NApp are skipped."""
+        graph = {key: {tuple(dep.split('/')) for dep in deps} for key, deps in
+                 ((tuple(napp_id.split('/')), deps) for napp_id, deps in
+                  TestDependencyResolver.graph.items())}
+        failed = {('kytos', 'base')}
+        with self.assertLogs('kytos.utils.resolver', 'ERROR'):
+            level = installable([('kytos', 'mid_a', None),
+                                 ('kytos', 'other', None)], graph, failed)
+        self.assertEqual(level, [('kytos', 'other', None)])
+        self.assertEqual(installable([('kytos', 'root', '2.0')], graph,
+                                     failed), [])
+        self.assertEqual(failed, {('kytos', 'base'), ('kytos', 'mid_a'),
+                                  ('kytos', 'root')})
+
+
+class TestDependencyOrder(unittest.TestCase):
+    """Sort NApps already installed by their dependencies."""
+
+    def setUp(self):
+        """Use the graph of the resolver tests."""
+        graph = TestDependencyResolver.graph
+        self.dependencies = lambda user, napp: [
+            tuple(dependency.split('/'))
+            for dependency in graph['{}/{}'.format(user, napp)]]
+
+    def test_order(self):
+        """Dependencies among the given NApps come first, once."""
+        napps = [('kytos', 'root'), ('kytos', 'other'), ('kytos', 'mid_a'),
+                 ('kytos', 'base'), ('kytos', 'root')]
+        self.assertEqual(dependency_order(napps, self.dependencies),
+                         [('kytos', 'other'), ('kytos', 'base'),
+                          ('kytos', 'mid_a'), ('kytos', 'root')])
+
+    def test_cycle(self):
+        """NApps in a cycle keep the given order."""
+        def dependencies(user, napp):
+            return [(user, 'bbb' if napp == 'aaa' else 'aaa')]
+
+        napps = [('kytos', 'bbb'), ('kytos', 'aaa')]
+        self.assertEqual(dependency_order(napps, dependencies), napps)
+
+
+if __name__ == '__main__':
+    unittest.main()
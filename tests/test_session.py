@@ -0,0 +1,139 @@
+"""Tests of the shared HTTP session and its ``file://`` adapter."""
+import json
+import shutil
+import tempfile
+import unittest
+from configparser import ConfigParser
+from pathlib import Path
+
+import requests
+
+from kytos.utils.session import (FileAdapter, close_session, create_session,
+                                 get_session)
+
+
+def config(**http):
+    """Return a config with the given ``[http]`` options."""
+    parser = ConfigParser()
+    parser.read_dict({'http': http,
+                      'kytos': {'api': 'http://localhost:8181/'}})
+    return parser
+
+
+class TestSession(unittest.TestCase):
+    """Share one pooled session per process."""
+
+    def setUp(self):
+        """Start and end without a shared session."""
+        close_session()
+        self.addCleanup(close_session)
+
+    def test_shared(self):
+        """The session is created once, until it is closed."""
+        session = get_session(config())
+        self.assertIs(get_session(), session)
+        close_session()
+        self.assertIsNot(get_session(config()), session)
+
+    def test_options(self):
+        """Pool size, retries and timeout come from the config."""
+        session = create_session(config(pool_size='3', retries='5',
+                                        timeout='2.5'))
+        self.addCleanup(session.close)
+        adapter = session.get_adapter('https://napps.kytos.io/api/')
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 3)
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertEqual(session.timeout, 2.5)
+        self.assertEqual(session.headers['Connection'], 'keep-alive')
+
+    def test_kytosd_not_retried(self):
+        """Requests to the local controller fail fast."""
+        session = create_session(config(retries='5'))
+        self.addCleanup(session.close)
+        adapter = session.get_adapter('http://localhost:8181/api/kytos/')
+        self.assertEqual(adapter.max_retries.total, 0)
+
+
+class TestFileAdapter(unittest.TestCase):
+    """Serve a local mirror as the NApps Server would."""
+
+    def setUp(self):
+        """Create a mirror folder and a session reading it."""
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.root))
+        (self.root / 'api' / 'napps').mkdir(parents=True)
+        (self.root / 'api' / 'napps' / 'index.json').write_text(
+            json.dumps({'napps': []}))
+        self.package = self.root / 'repo' / 'kytos' / 'napp-1.0.napp'
+        self.package.parent.mkdir(parents=True)
+        self.package.write_bytes(b'package')
+
+        self.session = requests.Session()
+        self.addCleanup(self.session.close)
+        self.session.mount('file://', FileAdapter())
+
+    def test_get(self):
+        """Files are returned with their size and an ETag."""
+        response = self.session.get(self.package.as_uri())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'package')
+        self.assertEqual(response.headers['Content-Length'], '7')
+        self.assertEqual(response.headers['Content-Type'],
+                         'application/octet-stream')
+        self.assertTrue(response.headers['ETag'])
+
+    def test_stream(self):
+        """Streamed responses are read from the file."""
+        response = self.session.get(self.package.as_uri(), stream=True)
+        self.assertEqual(response.raw.read(), b'package')
+        response.close()
+
+    def test_not_modified(self):
+        """A request with the current ETag gets 304 Not Modified."""
+        etag = self.session.head(self.package.as_uri()).headers['ETag']
+        response = self.session.get(self.package.as_uri(),
+                                    headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.package.write_bytes(b'new package')
+        response = self.session.get(self.package.as_uri(),
+                                    headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_head(self):
+        """HEAD returns the headers without the content."""
+        response = self.session.head(self.package.as_uri())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Length'], '7')
+        self.assertEqual(response.content, b'')
+
+    def test_folder_index(self):
+        """The URL of a folder returns its index.json."""
+        for url in ((self.root / 'api' / 'napps').as_uri(),
+                    (self.root / 'api' / 'napps').as_uri() + '/'):
+            response = self.session.get(url)
+            self.assertEqual(response.json(), {'napps': []})
+            self.assertEqual(response.headers['Content-Type'],
+                             'application/json')
+
+    def test_not_found(self):
+        """Missing files are 404 Not Found."""
+        response = self.session.get((self.root / 'missing.napp').as_uri())
+        self.assertEqual(response.status_code, 404)
+        with self.assertRaises(requests.HTTPError):
+            response.raise_for_status()
+        response = self.session.get(
+            (self.package / 'not_a_folder').as_uri())
+        self.assertEqual(response.status_code, 404)
+
+    def test_method_not_allowed(self):
+        """Only GET and HEAD are supported."""
+        response = self.session.post(self.package.as_uri(), data=b'x')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(self.package.read_bytes(), b'package')
+
+
+if __name__ == '__main__':
+    unittest.main()
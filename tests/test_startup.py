@@ -0,0 +1,60 @@
+"""Startup time regression test of the kytos command line."""
+import os
+import subprocess
+import sys
+import unittest
+
+#: Imported to parse "kytos napps" command lines
+MODULE = 'kytos.cli.commands.napps.parser'
+#: Modules that must be imported only by the commands that need them
+HEAVY_MODULES = ['requests', 'jinja2', 'ruamel.yaml', 'kytos.core']
+#: Maximum import time in milliseconds, unless KYTOS_STARTUP_BUDGET is set
+BUDGET = 150
+
+
+def import_times(module):
+    """Return {module: cumulative import time in ms} of importing a module.
+
+    Measured with ``-X importtime`` in a new interpreter.
+    """
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                             'import ' + module], stderr=subprocess.PIPE,
+                            check=True, universal_newlines=True).stderr
+    imports = {}
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line.split('|')
+            if cumulative.strip().isdigit():
+                imports[name.strip()] = int(cumulative) / 1000
+    return imports
+
+
+@unittest.skipIf(sys.version_info < (3, 7), '-X importtime needs Python 3.7+')
+class TestStartup(unittest.TestCase):
+    """Check what the command line imports and how long it takes."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Import once to write bytecode caches, then measure."""
+        import_times(MODULE)
+        # The fastest run is the least disturbed by other processes
+        cls.runs = [import_times(MODULE) for _ in range(3)]
+
+    def test_budget(self):
+        """The command line is imported within the budget."""
+        budget = float(os.environ.get('KYTOS_STARTUP_BUDGET', BUDGET))
+        total = min(imports[MODULE] for imports in self.runs)
+        print('\n{} imported in {:.1f} ms (budget: {:g} ms).'.format(
+            MODULE, total, budget), file=sys.stderr)
+        self.assertLessEqual(total, budget)
+
+    def test_no_heavy_modules(self):
+        """Heavy modules are only imported by the commands using them."""
+        heavy = sorted(name for name in self.runs[0] for module in
+                       HEAVY_MODULES
+                       if name == module or name.startswith(module + '.'))
+        self.assertEqual(heavy, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+"""Tests of streaming and resumable uploads against a local server."""
+import email
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+
+import requests
+
+from kytos.utils.upload import (MultipartStream, ResumableUpload,
+                                UploadState)
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    """Minimal NApps Server: tus uploads and multipart NApp uploads."""
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep test output clean."""
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def _reply(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Create an upload or receive a multipart upload."""
+        body = self._body()
+        if self.path == '/api/napps/uploads/':
+            if self.server.create_status:
+                self._reply(self.server.create_status,
+                            {'Location': '/api/napps/'})
+                return
+            url = '/api/napps/uploads/{}'.format(len(self.server.uploads))
+            self.server.uploads[url] = bytearray()
+            self.server.metadata = json.loads(body.decode('utf-8'))
+            self._reply(201, {'Location': url})
+        else:
+            self.server.multipart = (self.headers['Content-Type'], body)
+            self._reply(201)
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        """Return the offset of an upload."""
+        if self.path not in self.server.uploads:
+            self._reply(404)
+            return
+        self._reply(200, {'Upload-Offset':
+                          str(len(self.server.uploads[self.path]))})
+
+    def do_PATCH(self):  # pylint: disable=invalid-name
+        """Append a chunk at the upload offset."""
+        chunk = self._body()
+        offset = int(self.headers['Upload-Offset'])
+        data = self.server.uploads[self.path]
+        rejected = len(self.server.patches) in self.server.conflicts
+        self.server.patches.append((offset, len(chunk)))
+        if rejected or offset != len(data):
+            if rejected:
+                del data[:]
+            self._reply(409)
+            return
+        data.extend(chunk)
+        self._reply(204, {'Upload-Offset': str(len(data))})
+
+
+class UploadServer(ThreadingMixIn, HTTPServer):
+    """Server keeping what it received, for the tests to check."""
+
+    def __init__(self):
+        """Listen on a free local port."""
+        super().__init__(('127.0.0.1', 0), UploadHandler)
+        self.uploads = {}
+        self.patches = []
+        self.metadata = {}
+        self.multipart = (None, b'')
+        # Status of the answer to upload creations, if not supported
+        self.create_status = None
+        # Indexes of the PATCH requests answered with 409 after losing the
+        # received data, as a server restored from a backup would
+        self.conflicts = set()
+
+
+class TestUpload(unittest.TestCase):
+    """Upload packages to a local stand-in of the NApps Server."""
+
+    def setUp(self):
+        """Start the server and create an uploader."""
+        self.server = UploadServer()
+        thread = threading.Thread(target=self.server.serve_forever,
+                                  kwargs={'poll_interval': 0.05})
+        thread.daemon = True
+        thread.start()
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.state = UploadState(Path(tmp) / 'uploads.json')
+        session = requests.Session()
+        self.addCleanup(session.close)
+        self.base = 'http://127.0.0.1:{}'.format(self.server.server_port)
+        self.uploader = ResumableUpload(
+            session, self.base + '/api/napps/uploads/', retries=2,
+            chunk_size=1000, state=self.state)
+        self.package = bytes(range(256)) * 14  # 3584 bytes
+        self.sha256 = hashlib.sha256(self.package).hexdigest()
+
+    def tearDown(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _upload(self):
+        return self.uploader.upload({'name': 'napp'},
+                                    io.BytesIO(self.package))
+
+    def test_chunks(self):
+        """The package is sent in chunks and the state is cleared."""
+        progress = []
+        response = self.uploader.upload({'name': 'napp'},
+                                        io.BytesIO(self.package),
+                                        lambda sent, _: progress.append(sent))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.server.patches, [(0, 1000), (1000, 1000),
+                                               (2000, 1000), (3000, 584)])
+        self.assertEqual(progress, [1000, 2000, 3000, 3584])
+        self.assertEqual(bytes(self.server.uploads['/api/napps/uploads/0']),
+                         self.package)
+        self.assertEqual(self.server.metadata['size'], len(self.package))
+        self.assertIsNone(self.state.get(self.sha256))
+
+    def test_resume_from_server_offset(self):
+        """An unfinished upload continues at the offset of the server."""
+        url = '/api/napps/uploads/0'
+        self.server.uploads[url] = bytearray(self.package[:2000])
+        self.state.set(self.sha256, self.base + url)
+
+        response = self._upload()
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.server.patches, [(2000, 1000), (3000, 584)])
+        self.assertEqual(len(self.server.uploads), 1)
+        self.assertEqual(bytes(self.server.uploads[url]), self.package)
+
+    def test_resume_from_zero(self):
+        """An upload the server has no bytes of is resumed, not recreated."""
+        url = '/api/napps/uploads/0'
+        self.server.uploads[url] = bytearray()
+        self.state.set(self.sha256, self.base + url)
+
+        self.assertEqual(self._upload().status_code, 204)
+        self.assertEqual(len(self.server.uploads), 1)
+        self.assertEqual(bytes(self.server.uploads[url]), self.package)
+
+    def test_conflict_restarts_at_offset_zero(self):
+        """After a 409, a server offset of 0 is used, not the local one."""
+        self.server.conflicts = {1}
+
+        self.assertEqual(self._upload().status_code, 204)
+        self.assertEqual(self.server.patches, [(0, 1000), (1000, 1000),
+                                               (0, 1000), (1000, 1000),
+                                               (2000, 1000), (3000, 584)])
+        self.assertEqual(bytes(self.server.uploads['/api/napps/uploads/0']),
+                         self.package)
+
+    def test_conflicts_give_up(self):
+        """Repeated offset conflicts end the upload with the 409."""
+        self.server.conflicts = set(range(100))
+
+        response = self._upload()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(len(self.server.patches), 3)
+
+    def test_not_supported(self):
+        """Errors and redirects, but authentication, mean no support."""
+        for status in 400, 302, 405, 500:
+            self.server.create_status = status
+            self.assertIsNone(self._upload())
+        for status in 401, 403:
+            self.server.create_status = status
+            self.assertEqual(self._upload().status_code, status)
+        self.assertEqual(self.server.patches, [])
+
+    def test_multipart_fallback(self):
+        """Without resumable uploads, the package is sent as a form."""
+        self.server.create_status = 404
+        self.assertIsNone(self._upload())
+
+        body = MultipartStream({'name': 'napp', 'tags': ['a', 'b'],
+                                'skip': None}, 'napp.napp',
+                               io.BytesIO(self.package))
+        response = requests.post(
+            self.base + '/api/napps/', data=body,
+            headers={'Content-Type': body.content_type}, timeout=10)
+        self.assertEqual(response.status_code, 201)
+
+        content_type, raw = self.server.multipart
+        self.assertEqual(len(raw), len(body))
+        message = email.message_from_bytes(
+            'Content-Type: {}\r\n\r\n'.format(content_type).encode() + raw)
+        fields = [(part.get_param('name', header='content-disposition'),
+                   part.get_payload(decode=True))
+                  for part in message.get_payload()]
+        self.assertEqual(fields, [('name', b'napp'), ('tags', b'a'),
+                                  ('tags', b'b'), ('file', self.package)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+"""Tests of the side-by-side versions of installed NApps."""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.napps import make_napp
+from kytos.cli.commands.napps.versions import VersionsAPI
+from kytos.utils.napps import NAppsManager
+from kytos.utils.versions import NAppVersions, same_content, version_key
+from tests.helpers import NAppsTestCase
+
+
+class TestNAppVersions(unittest.TestCase):
+    """Store, activate and prune NApp versions."""
+
+    def setUp(self):
+        """Describe the versions of kytos/of_core."""
+        self.installed = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.installed))
+        (self.installed / 'kytos').mkdir()
+        self.versions = NAppVersions(self.installed, 'kytos', 'of_core')
+        self.staged = 0
+
+    def _stage(self, version, main='x = 1\n'):
+        """Return a new NApp folder to be added."""
+        self.staged += 1
+        folder = self.installed / '.staging' / str(self.staged)
+        folder.mkdir(parents=True)
+        (folder / 'kytos.json').write_text(json.dumps({'version': version}))
+        (folder / 'main.py').write_text(main)
+        return folder
+
+    def _add(self, version, main='x = 1\n'):
+        """Add and activate a version."""
+        name = self.versions.add(self._stage(version, main), version)
+        self.versions.activate(name)
+        return name
+
+    def test_activate(self):
+        """The NApp is a relative symlink to the active version."""
+        self._add('1.0')
+        self._add('2.0')
+        link = self.installed / 'kytos' / 'of_core'
+        self.assertEqual(os.readlink(str(link)),
+                         os.path.join('..', '.versions', 'kytos', 'of_core',
+                                      '2.0'))
+        self.assertEqual(self.versions.active(), '2.0')
+        self.assertEqual(self.versions.versions(), ['2.0', '1.0'])
+        self.assertEqual(self.versions.previous(), '1.0')
+        self.assertEqual([name for name in os.listdir(str(link.parent))
+                          if name.startswith('.')], [])
+
+    def test_rollback(self):
+        """Activating the previous version swaps the history."""
+        self._add('1.0')
+        self._add('2.0')
+        self.versions.activate(self.versions.previous())
+        self.assertEqual(self.versions.active(), '1.0')
+        self.assertEqual(self.versions.versions(), ['1.0', '2.0'])
+        with self.assertRaises(FileNotFoundError):
+            self.versions.activate('3.0')
+
+    def test_prune(self):
+        """The oldest versions are removed, never the active one."""
+        for version in '1.0', '2.0', '3.0':
+            self._add(version)
+        self.versions.activate('1.0')
+        self.assertEqual(self.versions.prune(1), ['3.0', '2.0'])
+        self.assertEqual(self.versions.versions(), ['1.0'])
+
+    def test_same_content_reused(self):
+        """Adding a stored version again keeps the stored files."""
+        self._add('1.0')
+        main = self.versions.path('1.0') / 'main.py'
+        inode = main.stat().st_ino
+        folder = self._stage('1.0')
+        self.assertEqual(self.versions.add(folder, '1.0'), '1.0')
+        self.assertFalse(folder.exists())
+        self.assertEqual(main.stat().st_ino, inode)
+
+    def test_changed_content_replaced(self):
+        """A stored version with other content is replaced in place."""
+        self._add('1.0')
+        self.versions.add(self._stage('1.0', 'x = 2\n'), '1.0')
+        link = self.installed / 'kytos' / 'of_core'
+        self.assertEqual((link / 'main.py').read_text(), 'x = 2\n')
+        self.assertEqual(self.versions.active(), '1.0')
+        self.assertEqual(sorted(os.listdir(str(self.versions.root))),
+                         ['1.0', 'history.json'])
+
+    def test_version_name(self):
+        """Versions can't name folders outside the NApp versions."""
+        name = self._add('../../1.0')
+        self.assertEqual(self.versions.path(name).parent, self.versions.root)
+
+    def test_legacy_install(self):
+        """A NApp installed before versions were stored becomes one."""
+        legacy = self.installed / 'kytos' / 'of_core'
+        legacy.mkdir()
+        (legacy / 'kytos.json').write_text(json.dumps({'version': '0.9'}))
+        self._add('1.0')
+        self.assertEqual(self.versions.versions(), ['1.0', '0.9'])
+        self.assertTrue(legacy.is_symlink())
+
+
+class TestSwitchCommands(NAppsTestCase):
+    """Switch the versions of installed NApps and reload them."""
+
+    def setUp(self):
+        """Store versions 1.0 and 2.0 of kytos/of_core and enable it."""
+        super().setUp()
+        (self.installed / 'kytos').mkdir()
+        (self.installed / 'kytos' / '__init__.py').touch()
+        versions = NAppVersions(self.installed, 'kytos', 'of_core')
+        for version in '1.0', '2.0':
+            staging = self.root / 'staging' / version
+            make_napp(staging, 'kytos', 'of_core', version, files=0,
+                      endpoints=0)
+            versions.activate(versions.add(staging / 'kytos' / 'of_core',
+                                           version))
+        NAppsManager().enable_napps([('kytos', 'of_core')])
+        patcher = mock.patch('kytos.cli.commands.napps.api.NAppsAPI.'
+                             'reload_napps')
+        self.reload_napps = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _active(self):
+        return NAppVersions(self.installed, 'kytos', 'of_core').active()
+
+    def test_versions(self):
+        """Stored versions are listed, the active one marked."""
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            VersionsAPI.versions({'<napp>': [('kytos', 'of_core', None)]})
+        self.assertEqual(stdout.getvalue(),
+                         'kytos/of_core:\n  * 2.0\n    1.0\n')
+
+    def test_switch(self):
+        """Versions are activated and enabled NApps reloaded."""
+        with self.assertLogs('kytos.cli.commands.napps.versions'):
+            VersionsAPI.switch({'<napp>': [('kytos', 'of_core', '1.0')]})
+        self.assertEqual(self._active(), '1.0')
+        self.assertEqual(self.reload_napps.call_args[0][1],
+                         [('kytos', 'of_core')])
+
+        with self.assertLogs('kytos.cli.commands.napps.versions'):
+            VersionsAPI.rollback({'<napp>': [('kytos', 'of_core', None)]})
+        self.assertEqual(self._active(), '2.0')
+
+    def test_errors(self):
+        """Missing and unknown versions fail without reloading."""
+        for napp in ('kytos', 'of_core', None), ('kytos', 'of_core', '3.0'):
+            with self.assertLogs('kytos.cli.commands.napps.versions',
+                                 'ERROR'), \
+                    self.assertRaises(SystemExit) as context:
+                VersionsAPI.switch({'<napp>': [napp]})
+            self.assertEqual(context.exception.code, 1)
+        self.assertEqual(self._active(), '2.0')
+        self.reload_napps.assert_not_called()
+
+
+class TestUpgrade(NAppsTestCase):
+    """Upgrade installed NApps from the NApps Server."""
+
+    def setUp(self):
+        """Install and enable version 1.0 of two NApps, publish 2.0."""
+        super().setUp()
+        self.server = self.serve()
+        self.install('kytos', 'of_core')
+        self.install('kytos', 'of_lldp', dependencies=['kytos/of_core'])
+        self.publish(self.server, 'kytos', 'of_core', '2.0')
+        self.publish(self.server, 'kytos', 'topology', '1.0')
+        self.publish(self.server, 'kytos', 'of_lldp', '2.0',
+                     dependencies=['kytos/of_core', 'kytos/topology'])
+        self.mgr = NAppsManager()
+        self.mgr.enable_napps(self.mgr.get_installed())
+
+    def _version(self, name):
+        return self.mgr.get_version('kytos', name)
+
+    def _upgrade(self):
+        """Upgrade all NApps, returning the exit status."""
+        args = {'all': True, '<napp>': [], '--offline': False}
+        try:
+            VersionsAPI.upgrade(args)
+        except SystemExit as exception:
+            return exception.code
+        return 0
+
+    def test_outdated(self):
+        """Installed NApps with a newer version are listed."""
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            VersionsAPI.outdated({'--offline': False})
+        self.assertEqual(stdout.getvalue().splitlines()[1:],
+                         ['kytos/of_core | 1.0          | 2.0',
+                          'kytos/of_lldp | 1.0          | 2.0'])
+
+    def test_upgrade(self):
+        """NApps are upgraded and new dependencies enabled."""
+        with self.assertLogs('kytos.cli.commands.napps') as logs:
+            self.assertEqual(self._upgrade(), 0)
+        self.assertEqual([self._version(name) for name in
+                          ('of_core', 'of_lldp', 'topology')],
+                         ['2.0', '2.0', '1.0'])
+        self.assertIn(('kytos', 'topology'), self.mgr.get_enabled())
+        self.assertIn('INFO:kytos.cli.commands.napps.versions:'
+                      'Reloading NApps...', logs.output)
+
+    def test_skip_dependents(self):
+        """NApps depending on one that failed are skipped."""
+        self.server.packages[('kytos', 'of_core')] = b'not a package'
+        with self.assertLogs('kytos') as logs:
+            self.assertEqual(self._upgrade(), 1)
+        self.assertEqual([self._version(name) for name in
+                          ('of_core', 'of_lldp', 'topology')],
+                         ['1.0', '1.0', '1.0'])
+        self.assertIn('ERROR:kytos.utils.resolver:    kytos/of_lldp: '
+                      'Skipped, depends on kytos/of_core.', logs.output)
+        self.assertIn('ERROR:kytos.cli.commands.napps.versions:'
+                      '2 NApp(s) could not be upgraded.', logs.output)
+
+
+class TestHelpers(unittest.TestCase):
+    """Compare versions and NApp folders."""
+
+    def test_version_key(self):
+        """Numbers are compared as numbers, releases after pre-releases."""
+        versions = ['1.10', '1.9', '1.9rc1', '1.9.dev0', '1.8', '']
+        self.assertEqual(sorted(versions, key=version_key, reverse=True),
+                         versions)
+
+    def test_same_content(self):
+        """Compiled modules are ignored, other files compared."""
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(tmp))
+        for name in 'first', 'second':
+            (tmp / name / '__pycache__').mkdir(parents=True)
+            (tmp / name / 'main.py').write_text('x = 1\n')
+        (tmp / 'first' / '__pycache__' / 'main.pyc').write_text('')
+        self.assertTrue(same_content(tmp / 'first', tmp / 'second'))
+
+        (tmp / 'second' / 'main.py').write_text('x = 2\n')
+        self.assertFalse(same_content(tmp / 'first', tmp / 'second'))
+        (tmp / 'second' / 'main.py').write_text('x = 1\n')
+        (tmp / 'second' / 'link.py').symlink_to('main.py')
+        self.assertFalse(same_content(tmp / 'first', tmp / 'second'))
+
+
+if __name__ == '__main__':
+    unittest.main()